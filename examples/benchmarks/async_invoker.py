@@ -0,0 +1,164 @@
+"""
+Benchmark of the threaded FaaS invoker against the asyncio invoker.
+
+Both invokers launch the same number of activations against a local mock
+HTTP server that emulates a FaaS invoke endpoint (it answers 202 with an
+activation ID). The mock server runs in a separate process, so the CPU
+time reported is the one consumed by the invoker itself.
+
+Requires: pip3 install lithops[async]
+
+Usage:
+    python async_invoker.py --calls 10000 --delay 0.01
+"""
+
+import json
+import time
+import argparse
+import threading
+import http.client
+import multiprocessing as mp
+from types import SimpleNamespace
+from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from lithops.utils import create_executor_id
+from lithops.serverless import ServerlessHandler
+from lithops.invokers import FaaSInvoker, AsyncFaaSInvoker
+
+
+def run_mock_server(port, delay, ready):
+    """ Mock FaaS endpoint. Every invocation takes `delay` seconds """
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            time.sleep(delay)
+            body = json.dumps({'activationId': 'mock'}).encode()
+            self.send_response(202)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 4096
+
+    server = Server(('127.0.0.1', port), Handler)
+    ready.set()
+    server.serve_forever()
+
+
+class MockBackend:
+    """ HTTP-based serverless backend pointing to the mock server """
+
+    def __init__(self, url, max_workers):
+        self.url = url
+        self.max_workers = max_workers
+        self.type = 'faas'
+        self.invocations = 0
+        self.lock = threading.Lock()
+
+    def _count(self):
+        with self.lock:
+            self.invocations += 1
+
+    def invoke(self, runtime_name, runtime_memory, payload):
+        parsed_url = urlparse(self.url)
+        try:
+            conn = http.client.HTTPConnection(parsed_url.netloc)
+            conn.request('POST', '/', body=json.dumps(payload, default=str))
+            resp = conn.getresponse()
+            data = json.loads(resp.read().decode('utf-8'))
+            conn.close()
+        except Exception:
+            return None  # the invoker retries it
+        self._count()
+        return data['activationId']
+
+    async def invoke_async(self, http_client, runtime_name, runtime_memory, payload):
+        try:
+            resp = await http_client.post(self.url, content=json.dumps(payload, default=str))
+        except Exception:
+            return None  # the invoker retries it
+        self._count()
+        return resp.json()['activationId']
+
+    def get_runtime_info(self):
+        return {'runtime_name': 'mock-runtime', 'runtime_memory': 256,
+                'runtime_timeout': 600, 'max_workers': self.max_workers}
+
+
+class NoMonitor:
+    def start(self, *args, **kwargs):
+        pass
+
+
+class NoStorage:
+    def put_job_manifest(self, key, manifest):
+        pass
+
+
+def run_benchmark(invoker_class, url, calls, pool_threads):
+    backend = MockBackend(url, max_workers=calls)
+    compute_handler = ServerlessHandler.__new__(ServerlessHandler)
+    compute_handler.backend = backend
+
+    config = {
+        'lithops': {'mode': 'serverless', 'backend': 'mock', 'storage': 'localhost'},
+        'mock': {'invoke_pool_threads': pool_threads, 'async_max_connections': pool_threads}
+    }
+    executor_id = create_executor_id()
+    invoker = invoker_class(config, executor_id, NoStorage(), compute_handler, NoMonitor())
+
+    job = SimpleNamespace(
+        executor_id=executor_id, job_id='M000', job_key=f'{executor_id}-M000',
+        function_name='noop', func_key='func.pickle', data_key=None,
+        data_byte_ranges=None, data_byte_strs=['{}'] * calls, extra_env={},
+        total_calls=calls, chunksize=1, execution_timeout=600,
+        runtime_name='mock-runtime', runtime_memory=256, worker_processes=1
+    )
+
+    cpu_start = time.process_time()
+    start = time.time()
+    invoker._invoke_job(job)
+    while backend.invocations < calls:
+        time.sleep(0.005)
+    elapsed = time.time() - start
+    cpu_time = time.process_time() - cpu_start
+    invoker.stop()
+
+    return {
+        'invoker': invoker_class.__name__,
+        'calls': calls,
+        'elapsed': round(elapsed, 3),
+        'invocations_per_sec': round(calls / elapsed, 1),
+        'invoker_cpu_time': round(cpu_time, 3),
+        'threads_peak': threading.active_count()
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=5000)
+    parser.add_argument('--delay', type=float, default=0.01, help='Invoke latency of the mock server')
+    parser.add_argument('--threads', type=int, default=128, help='Invoke pool threads / max connections')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    ready = mp.Event()
+    server = mp.Process(target=run_mock_server, args=(args.port, args.delay, ready), daemon=True)
+    server.start()
+    ready.wait()
+    url = f'http://127.0.0.1:{args.port}/'
+
+    for invoker_class in (FaaSInvoker, AsyncFaaSInvoker):
+        print(json.dumps(run_benchmark(invoker_class, url, args.calls, args.threads)))
+
+    server.terminate()
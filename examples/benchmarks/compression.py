@@ -0,0 +1,134 @@
+"""
+Benchmark of the compression codecs of the Lithops-internal objects.
+
+Compresses payloads like the ones Lithops stores: text results, pickled
+results, the function-and-modules pickle of a job (the lithops package
+itself, base64-encoded as Lithops ships the modules) and incompressible
+random bytes. For every codec (zstd and lz4 only if installed) and payload
+type, it reports the stored size, the ratio and the compression and
+decompression throughput. With --end-to-end it also runs a map job that
+returns the text payload with every codec, and reports the result upload
+and download times.
+
+Usage:
+    python compression.py --size-mb 8
+    python compression.py --end-to-end --backend aws_lambda --storage aws_s3
+"""
+
+import os
+import json
+import time
+import base64
+import pickle
+import random
+import argparse
+
+import lithops
+from lithops.storage import compression
+
+MiB = 1024 ** 2
+
+
+def text_payload(size):
+    rand = random.Random(42)
+    words = [f'word{i}' for i in range(5000)]
+    text = ' '.join(rand.choice(words) for _ in range(size // 8))
+    return text.encode()[:size]
+
+
+def pickle_payload(size):
+    rand = random.Random(42)
+    rows = []
+    while len(rows) * 40 < size:
+        rows.append({'id': len(rows), 'value': rand.random(), 'label': rand.choice('abcdef')})
+    return pickle.dumps(rows)
+
+
+def modules_payload(size):
+    module_data = {}
+    lithops_dir = os.path.dirname(lithops.__file__)
+    for root, _, files in os.walk(lithops_dir):
+        for name in files:
+            if name.endswith('.py'):
+                with open(os.path.join(root, name), 'rb') as f:
+                    module_data[os.path.join(root, name)] = base64.b64encode(f.read()).decode()
+    return pickle.dumps({'func': b'\x00' * 1024, 'module_data': module_data})
+
+
+def random_payload(size):
+    return os.urandom(size)
+
+
+PAYLOADS = {
+    'text': text_payload,
+    'pickle': pickle_payload,
+    'modules': modules_payload,
+    'random': random_payload
+}
+
+
+def available_codecs():
+    codecs = ['none']
+    for codec in compression.CODECS:
+        try:
+            compression.check_codec(codec)
+            codecs.append(codec)
+        except ModuleNotFoundError:
+            pass
+    return codecs
+
+
+def run_codec(codec, data):
+    start = time.time()
+    compressed = compression.compress(data, codec)
+    compress_time = time.time() - start
+    start = time.time()
+    assert compression.decompress(compressed) == data
+    decompress_time = time.time() - start
+    size_mb = len(data) / MiB
+    return {
+        'size': len(data),
+        'stored_size': len(compressed),
+        'ratio': round(len(data) / len(compressed), 2),
+        'compress_mb_per_sec': round(size_mb / compress_time, 1) if compress_time else None,
+        'decompress_mb_per_sec': round(size_mb / decompress_time, 1) if decompress_time else None
+    }
+
+
+def get_text(size):
+    return text_payload(size).decode()
+
+
+def run_end_to_end(args, codec):
+    config = {'lithops': {'backend': args.backend, 'storage': args.storage, 'compression': codec}}
+    with lithops.FunctionExecutor(config=config, log_level=None) as fexec:
+        fs = fexec.map(get_text, [args.size_mb * MiB] * args.calls)
+        start = time.time()
+        fexec.get_result(fs, show_progressbar=False)
+        download_time = time.time() - start
+        upload_times = [f.stats['worker_result_upload_time'] for f in fs]
+        return {
+            'avg_result_upload_time': round(sum(upload_times) / len(upload_times), 3),
+            'result_download_time': round(download_time, 3)
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size-mb', type=int, default=8)
+    parser.add_argument('--end-to-end', action='store_true')
+    parser.add_argument('--backend', default='localhost')
+    parser.add_argument('--storage', default='localhost')
+    parser.add_argument('--calls', type=int, default=4)
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    results = {}
+    for payload, generate in PAYLOADS.items():
+        data = generate(args.size_mb * MiB)
+        results[payload] = {codec: run_codec(codec, data) for codec in codecs}
+
+    if args.end_to_end:
+        results['end_to_end'] = {codec: run_end_to_end(args, codec) for codec in codecs}
+
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,131 @@
+"""
+Benchmark of the activation payloads sent by the FaaS invoker.
+
+Compares the legacy payload, which embeds the whole lithops config and
+the job metadata in every activation, against the slim payload, which
+only carries the job manifest key and the per-call information. The
+compute backend is emulated: every invocation JSON-encodes the payload
+(as the HTTP backends do) and decodes it (as the worker does), so the
+reported throughput reflects the serialization cost on both sides.
+
+Usage:
+    python invocation_payload.py --calls 10000 --backends 6
+"""
+
+import json
+import time
+import argparse
+import threading
+from types import SimpleNamespace
+
+from lithops.utils import create_executor_id
+from lithops.serverless import ServerlessHandler
+from lithops.invokers import FaaSInvoker
+
+
+class LegacyPayloadInvoker(FaaSInvoker):
+    """ FaaS invoker that sends the full job payload in every activation """
+
+    def _create_task_payload(self, job, call_ids_range):
+        payload = self._create_payload(job)
+        call_ids = ["{:05d}".format(i) for i in call_ids_range]
+        payload['call_ids'] = call_ids
+        payload['data_byte_ranges'] = [job.data_byte_ranges[int(call_id)] for call_id in call_ids]
+        return payload
+
+
+class MockBackend:
+    """ Serverless backend that serializes and parses every payload """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.type = 'faas'
+        self.invocations = 0
+        self.payload_bytes = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, runtime_name, runtime_memory, payload):
+        body = json.dumps(payload)
+        json.loads(body)
+        with self.lock:
+            self.invocations += 1
+            self.payload_bytes += len(body)
+        return 'mock'
+
+    def get_runtime_info(self):
+        return {'runtime_name': 'mock-runtime', 'runtime_memory': 256,
+                'runtime_timeout': 600, 'max_workers': self.max_workers}
+
+
+class NoMonitor:
+    def start(self, *args, **kwargs):
+        pass
+
+
+class ManifestStorage:
+    def __init__(self):
+        self.manifest_bytes = 0
+
+    def put_job_manifest(self, key, manifest):
+        self.manifest_bytes += len(manifest)
+
+
+def create_config(num_backends):
+    """ A config with several backend sections, as a typical ~/.lithops/config """
+    config = {
+        'lithops': {'mode': 'serverless', 'backend': 'mock', 'storage': 'mock_storage'},
+        'mock': {'invoke_pool_threads': 64},
+        'mock_storage': {'storage_bucket': 'lithops-bucket', 'region': 'us-east',
+                         'access_key_id': 'A' * 20, 'secret_access_key': 'S' * 40}
+    }
+    for i in range(num_backends):
+        config[f'backend_{i}'] = {
+            'region': 'us-east', 'namespace': f'namespace-{i}', 'api_key': 'K' * 64,
+            'endpoint': f'https://backend-{i}.cloud.example.com', 'runtime': 'lithops-runtime:latest',
+            'runtime_memory': 256, 'runtime_timeout': 600, 'max_workers': 1000
+        }
+    return config
+
+
+def run_benchmark(invoker_class, calls, num_backends):
+    backend = MockBackend(max_workers=calls)
+    compute_handler = ServerlessHandler.__new__(ServerlessHandler)
+    compute_handler.backend = backend
+    storage = ManifestStorage()
+
+    executor_id = create_executor_id()
+    invoker = invoker_class(create_config(num_backends), executor_id, storage, compute_handler, NoMonitor())
+
+    job = SimpleNamespace(
+        executor_id=executor_id, job_id='M000', job_key=f'{executor_id}-M000',
+        function_name='noop', func_key='lithops.jobs/func.pickle', data_key='lithops.jobs/aggdata.pickle',
+        data_byte_ranges=[(i * 32, i * 32 + 31) for i in range(calls)], extra_env={},
+        total_calls=calls, chunksize=1, execution_timeout=600,
+        runtime_name='mock-runtime', runtime_memory=256, worker_processes=1
+    )
+
+    start = time.time()
+    invoker._invoke_job(job)
+    while backend.invocations < calls:
+        time.sleep(0.005)
+    elapsed = time.time() - start
+    invoker.stop()
+
+    return {
+        'invoker': invoker_class.__name__,
+        'calls': calls,
+        'payload_bytes_avg': round(backend.payload_bytes / calls),
+        'total_bytes': backend.payload_bytes + storage.manifest_bytes,
+        'elapsed': round(elapsed, 3),
+        'invocations_per_sec': round(calls / elapsed, 1)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=10000)
+    parser.add_argument('--backends', type=int, default=6, help='Backend sections in the config')
+    args = parser.parse_args()
+
+    for invoker_class in (LegacyPayloadInvoker, FaaSInvoker):
+        print(json.dumps(run_benchmark(invoker_class, args.calls, args.backends)))
@@ -0,0 +1,82 @@
+"""
+Benchmark of the Lithops joblib backend with scikit-learn grid searches.
+
+Runs the grid search of an SVC over the digits dataset, replicated to
+--samples samples, with the Lithops joblib backend and, for reference, with
+the local loky backend. It repeats every search --repeats times in the same
+backend context, so that the later searches use the batch size computed
+from the measured task duration, and reports the time of every search and
+the measured task duration and batch size.
+
+Usage:
+    python joblib_gridsearch.py --samples 5000 --repeats 3
+    python joblib_gridsearch.py --backend aws_lambda --storage aws_s3 --n-jobs 100
+"""
+
+import json
+import time
+import argparse
+
+import joblib
+import numpy as np
+from sklearn.datasets import load_digits
+from sklearn.model_selection import GridSearchCV
+from sklearn.svm import SVC
+
+from lithops.multiprocessing import config as mp_config
+from lithops.util.joblib import register_lithops
+
+
+def get_dataset(samples):
+    digits = load_digits()
+    reps = -(-samples // len(digits.target))
+    X = np.tile(digits.data, (reps, 1))[:samples]
+    y = np.tile(digits.target, reps)[:samples]
+    return X, y
+
+
+def get_search():
+    param_grid = {
+        'C': np.logspace(-2, 2, 5),
+        'gamma': np.logspace(-4, -2, 4),
+        'class_weight': [None, 'balanced'],
+    }
+    return GridSearchCV(SVC(kernel='rbf'), param_grid, cv=3)
+
+
+def run_searches(args, backend_name, X, y, **backend_args):
+    results = []
+    with joblib.parallel_backend(backend_name, n_jobs=args.n_jobs, **backend_args) as (backend, _):
+        for _ in range(args.repeats):
+            search = get_search()
+            start = time.time()
+            search.fit(X, y)
+            result = {'time': round(time.time() - start, 3), 'best_score': round(search.best_score_, 4)}
+            if backend_name == 'lithops':
+                result['task_duration'] = backend._task_duration
+                result['next_batch_size'] = backend.get_batch_size(len(search.cv_results_['params']) * 3)
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--n-jobs', type=int, default=8)
+    parser.add_argument('--target-batch-duration', type=float, default=5)
+    parser.add_argument('--backend', default='localhost')
+    parser.add_argument('--storage', default='localhost')
+    parser.add_argument('--skip-loky', action='store_true')
+    args = parser.parse_args()
+
+    register_lithops()
+    lithops_config = {'lithops': {'backend': args.backend, 'storage': args.storage, 'log_level': None}}
+    mp_config.set_parameter(mp_config.LITHOPS_CONFIG, {'config': lithops_config})
+
+    X, y = get_dataset(args.samples)
+    results = {'lithops': run_searches(args, 'lithops', X, y, target_batch_duration=args.target_batch_duration)}
+    if not args.skip_loky:
+        results['loky'] = run_searches(args, 'loky', X, y)
+
+    print(json.dumps(results, indent=2))
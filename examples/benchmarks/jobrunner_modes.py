@@ -0,0 +1,85 @@
+"""
+Microbenchmark of the worker JobRunner modes (`jobrunner_mode` config key).
+
+Runs a chunk of very short calls through the worker function handler, as
+a single activation of a serverless backend would, using the localhost
+storage backend. Reports the calls/sec of each mode:
+
+    process: a new JobRunner process forked for every call (default)
+    reuse:   one JobRunner process kept alive for the whole chunk
+    thread:  the function runs in a thread of the handler process
+
+Usage:
+    python jobrunner_modes.py --calls 200
+"""
+
+import json
+import time
+import pickle
+import argparse
+import cloudpickle
+
+from lithops.config import extract_storage_config
+from lithops.storage import InternalStorage
+from lithops.utils import create_executor_id
+from lithops.worker import function_handler
+
+
+def noop(x):
+    return x
+
+
+def create_payload(config, calls):
+    internal_storage = InternalStorage(extract_storage_config(config))
+    executor_id = create_executor_id()
+    job_key = f'{executor_id}-M000'
+
+    func_key = f'lithops.jobs/{executor_id}/noop.func.pickle'
+    internal_storage.put_func(func_key, pickle.dumps({'func': cloudpickle.dumps(noop)}))
+
+    data_key = f'lithops.jobs/{job_key}/aggdata.pickle'
+    data = [pickle.dumps({'x': i}) for i in range(calls)]
+    data_byte_ranges, offset = [], 0
+    for d in data:
+        data_byte_ranges.append((offset, offset + len(d) - 1))
+        offset += len(d)
+    internal_storage.put_data(data_key, b''.join(data))
+
+    return {
+        'config': config, 'log_level': 'WARNING', 'func_name': 'noop',
+        'func_key': func_key, 'data_key': data_key, 'data_byte_ranges': data_byte_ranges,
+        'extra_env': {}, 'total_calls': calls, 'chunksize': calls, 'execution_timeout': 60,
+        'executor_id': executor_id, 'job_id': 'M000', 'job_key': job_key, 'max_workers': 1,
+        'call_ids': ["{:05d}".format(i) for i in range(calls)], 'host_submit_tstamp': time.time(),
+        'lithops_version': None, 'runtime_name': 'python3', 'runtime_memory': None,
+        'worker_processes': 1
+    }
+
+
+def run_benchmark(mode, calls):
+    config = {
+        'lithops': {'backend': 'localhost', 'storage': 'localhost', 'monitoring': 'storage',
+                    'jobrunner_mode': mode},
+        'localhost': {'storage_bucket': 'storage'}
+    }
+    payload = create_payload(config, calls)
+
+    start = time.time()
+    function_handler(payload)
+    elapsed = time.time() - start
+
+    return {
+        'jobrunner_mode': mode,
+        'calls': calls,
+        'elapsed': round(elapsed, 3),
+        'calls_per_sec': round(calls / elapsed, 1)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    for mode in ('process', 'reuse', 'thread'):
+        print(json.dumps(run_benchmark(mode, args.calls)))
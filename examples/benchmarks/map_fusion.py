@@ -0,0 +1,59 @@
+"""
+Benchmark of the fusion of chained map() stages (`lazy=True`).
+
+Runs a pipeline of 3 element-wise map() stages on the localhost backend,
+unfused (3 jobs, every intermediate result stored and downloaded by the
+next stage) and fused (a single job running the 3 functions in every
+activation), and reports the makespan, the jobs and the function
+activations of each mode.
+
+Usage:
+    python map_fusion.py --calls 50 --result-kb 512
+"""
+
+import json
+import time
+import argparse
+
+import lithops
+
+
+def generate(size):
+    return b'x' * size
+
+
+def transform(data):
+    return data.upper()
+
+
+def checksum(data):
+    return sum(data[::4096])
+
+
+def run_pipeline(calls, result_kb, lazy):
+    config = {'lithops': {'backend': 'localhost', 'storage': 'localhost'}}
+    with lithops.FunctionExecutor(config=config, log_level=None) as fexec:
+        start = time.time()
+        fs = fexec.map(generate, [result_kb * 1024] * calls, lazy=lazy).map(transform).map(checksum)
+        result = fs.get_result(show_progressbar=False)
+        elapsed = time.time() - start
+
+        return {
+            'mode': 'fused' if lazy else 'unfused',
+            'calls': calls,
+            'stages': 3,
+            'jobs': len({f.job_key for f in fexec.futures}),
+            'activations': len(fexec.futures),
+            'makespan': round(elapsed, 3),
+            'results_ok': result == [checksum(transform(generate(result_kb * 1024)))] * calls
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--result-kb', type=int, default=512, help='Size of the intermediate results, in KiB')
+    args = parser.parse_args()
+
+    for lazy in (False, True):
+        print(json.dumps(run_pipeline(args.calls, args.result_kb, lazy)))
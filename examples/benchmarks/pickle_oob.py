@@ -0,0 +1,104 @@
+"""
+Benchmark of the serialization of large NumPy arrays with out-of-band buffers.
+
+For every array size, it serializes and deserializes an array like Lithops
+does with the call data and results, with a plain pickle (in-band) and with
+the protocol 5 out-of-band buffers, and reports the time and the peak RSS of
+each. Every case runs in a new process, so that the peak RSS is its own.
+With --end-to-end it also runs a map job that returns the arrays, and
+reports its time and the peak RSS of the host.
+
+Usage:
+    python pickle_oob.py --sizes-mb 100 500 1000
+    python pickle_oob.py --sizes-mb 100 --end-to-end --backend aws_lambda --storage aws_s3
+"""
+
+import json
+import time
+import pickle
+import resource
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+import lithops
+from lithops.utils import dumps_oob, loads_oob
+
+MiB = 1024 ** 2
+
+
+def peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def run_case(size_mb, out_of_band, conn):
+    array = np.ones(size_mb * MiB // 8)
+    base_rss = peak_rss_mb()
+
+    start = time.time()
+    if out_of_band:
+        data = b''.join(dumps_oob(array))
+    else:
+        data = pickle.dumps(array)
+    dumps_time = time.time() - start
+
+    # The workers and the host read the data into a writable buffer
+    data = bytearray(data)
+    start = time.time()
+    result = loads_oob(data) if out_of_band else pickle.loads(data)
+    loads_time = time.time() - start
+    assert result.shape == array.shape
+
+    conn.send({
+        'dumps_time': round(dumps_time, 3),
+        'loads_time': round(loads_time, 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'peak_rss_increase_mb': round(peak_rss_mb() - base_rss, 1)
+    })
+
+
+def run_in_process(target, *args):
+    parent_conn, child_conn = mp.Pipe()
+    p = mp.Process(target=target, args=args + (child_conn,))
+    p.start()
+    result = parent_conn.recv()
+    p.join()
+    return result
+
+
+def get_array(size_mb):
+    return np.ones(size_mb * MiB // 8)
+
+
+def run_end_to_end(args, size_mb, conn):
+    config = {'lithops': {'backend': args.backend, 'storage': args.storage}}
+    with lithops.FunctionExecutor(config=config, log_level=None) as fexec:
+        start = time.time()
+        fs = fexec.map(get_array, [size_mb] * args.calls)
+        fexec.get_result(fs, show_progressbar=False)
+        conn.send({
+            'total_time': round(time.time() - start, 3),
+            'host_peak_rss_mb': peak_rss_mb()
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes-mb', type=int, nargs='+', default=[100, 500, 1000])
+    parser.add_argument('--end-to-end', action='store_true')
+    parser.add_argument('--backend', default='localhost')
+    parser.add_argument('--storage', default='localhost')
+    parser.add_argument('--calls', type=int, default=2)
+    args = parser.parse_args()
+
+    results = {}
+    for size_mb in args.sizes_mb:
+        results[size_mb] = {
+            'in_band': run_in_process(run_case, size_mb, False),
+            'out_of_band': run_in_process(run_case, size_mb, True)
+        }
+        if args.end_to_end:
+            results[size_mb]['end_to_end'] = run_in_process(run_end_to_end, args, size_mb)
+
+    print(json.dumps(results, indent=2))
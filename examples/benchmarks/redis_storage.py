@@ -0,0 +1,93 @@
+"""
+Benchmark of the Redis storage backend.
+
+Fills a bucket of a local redis-server with many small objects, and
+times their upload, the listing of the whole bucket and of a prefix,
+and the deletion of all of them. Then it uploads a large object, which
+is stored in chunks, and times its download, a streamed download and a
+ranged read in the middle of it.
+
+Usage:
+    redis-server --save '' &
+    python redis_storage.py --keys 100000 --large-mb 512
+"""
+
+import io
+import json
+import time
+import argparse
+
+from lithops.storage.backends.redis.redis import RedisBackend
+
+BUCKET = 'lithops-benchmark'
+MiB = 1024 ** 2
+
+
+def timed(results, name, func, *args, **kwargs):
+    start = time.time()
+    result = func(*args, **kwargs)
+    results[name] = round(time.time() - start, 3)
+    return result
+
+
+def bench_keys(backend, num_keys, object_size):
+    results = {'keys': num_keys}
+    data = b'x' * object_size
+    keys = [f'bench/dir-{i % 100:03d}/obj-{i:07d}' for i in range(num_keys)]
+
+    start = time.time()
+    for key in keys:
+        backend.put_object(BUCKET, key, data)
+    results['put_objects'] = round(time.time() - start, 3)
+    results['puts_per_sec'] = round(num_keys / results['put_objects'], 1)
+
+    listed = timed(results, 'list_keys', backend.list_keys, BUCKET, 'bench/')
+    assert len(listed) == num_keys
+    timed(results, 'list_keys_prefix', backend.list_keys, BUCKET, 'bench/dir-042/')
+    objects = timed(results, 'list_objects', backend.list_objects, BUCKET, 'bench/')
+    assert sum(obj['Size'] for obj in objects) == num_keys * object_size
+    timed(results, 'delete_objects', backend.delete_objects, BUCKET, keys)
+
+    return results
+
+
+def bench_large_object(backend, size_mb):
+    results = {'large_object_mb': size_mb, 'chunk_size_mb': backend.chunk_size // MiB}
+    key = 'bench/large-object'
+    data = io.BytesIO(b'0123456789abcdef' * (size_mb * MiB // 16))
+
+    timed(results, 'put_large_object', backend.put_object, BUCKET, key, data)
+    body = timed(results, 'get_large_object', backend.get_object, BUCKET, key)
+    assert len(body) == size_mb * MiB
+    del body
+
+    stream = backend.get_object(BUCKET, key, stream=True)
+    read = timed(results, 'get_large_object_stream', lambda: sum(len(b) for b in iter(lambda: stream.read(MiB), b'')))
+    assert read == size_mb * MiB
+
+    middle = size_mb * MiB // 2
+    extra_get_args = {'Range': f'bytes={middle - MiB}-{middle + MiB - 1}'}
+    part = timed(results, 'get_range_2mb', backend.get_object, BUCKET, key, extra_get_args=extra_get_args)
+    assert len(part) == 2 * MiB
+
+    for name in ('put_large_object', 'get_large_object', 'get_large_object_stream'):
+        results[name.replace('large_object', 'mb_per_sec')] = round(size_mb / results[name], 1)
+
+    backend.delete_object(BUCKET, key)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=6379)
+    parser.add_argument('--keys', type=int, default=100000)
+    parser.add_argument('--object-size', type=int, default=100, help='Size of the small objects, in bytes')
+    parser.add_argument('--large-mb', type=int, default=512)
+    parser.add_argument('--chunk-mb', type=int, default=64)
+    args = parser.parse_args()
+
+    backend = RedisBackend({'host': args.host, 'port': args.port, 'chunk_size': args.chunk_mb,
+                            'storage_bucket': BUCKET, 'user_agent': 'lithops-benchmark'})
+    print(json.dumps(bench_keys(backend, args.keys, args.object_size)))
+    print(json.dumps(bench_large_object(backend, args.large_mb)))
@@ -0,0 +1,92 @@
+"""
+Word count benchmark of map_shuffle_reduce().
+
+Generates random texts with a Zipf-like word distribution, counts the
+words with map_shuffle_reduce() and with map_reduce() (all the map
+outputs funneled through a single reducer), and reports the makespan of
+both and the bytes read by every reducer of the shuffle.
+
+Usage:
+    python shuffle_wordcount.py --maps 20 --partitions 4 --words 200000
+    python shuffle_wordcount.py --storage redis
+"""
+
+import json
+import time
+import random
+import argparse
+
+import lithops
+from lithops.job.shuffle import shuffle_partition_sizes
+
+VOCABULARY = 50000
+
+
+def generate_text(seed, words):
+    rand = random.Random(seed)
+    return ' '.join(f'w{int(rand.paretovariate(1.0)) % VOCABULARY}' for _ in range(words))
+
+
+def count_words(seed, words):
+    counts = {}
+    for word in generate_text(seed, words).split():
+        counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def sum_counts(word, counts):
+    return sum(counts)
+
+
+def merge_counts(results):
+    total = {}
+    for counts in results:
+        for word, count in counts.items():
+            total[word] = total.get(word, 0) + count
+    return total
+
+
+def run(fexec, maps, partitions, words):
+    iterdata = [(seed, words // maps) for seed in range(maps)]
+
+    start = time.time()
+    fs = fexec.map_shuffle_reduce(count_words, iterdata, sum_counts, partitions)
+    shuffle_results = fexec.get_result(fs, show_progressbar=False)
+    shuffle_time = time.time() - start
+
+    map_results = [f.result() for f in fs[:maps]]
+    partition_bytes = shuffle_partition_sizes(map_results, partitions)
+
+    start = time.time()
+    fs = fexec.map_reduce(count_words, iterdata, merge_counts)
+    single_result = fexec.get_result(fs, show_progressbar=False)
+    single_time = time.time() - start
+
+    shuffle_counts = {}
+    for counts in shuffle_results:
+        shuffle_counts.update(counts)
+
+    return {
+        'maps': maps,
+        'partitions': partitions,
+        'words': words,
+        'distinct_words': len(shuffle_counts),
+        'shuffle_makespan': round(shuffle_time, 3),
+        'single_reducer_makespan': round(single_time, 3),
+        'bytes_per_reducer': partition_bytes,
+        'total_shuffle_bytes': sum(partition_bytes),
+        'results_ok': shuffle_counts == single_result
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', default='localhost')
+    parser.add_argument('--storage', default='localhost')
+    parser.add_argument('--maps', type=int, default=20)
+    parser.add_argument('--partitions', type=int, default=4)
+    parser.add_argument('--words', type=int, default=200000)
+    args = parser.parse_args()
+
+    with lithops.FunctionExecutor(backend=args.backend, storage=args.storage, log_level=None) as fexec:
+        print(json.dumps(run(fexec, args.maps, args.partitions, args.words)))
@@ -0,0 +1,121 @@
+"""
+TeraSort-style benchmark of FunctionExecutor.sort().
+
+Generates an object of 100-byte records with a random 10-byte key (as
+teragen does), sorts it with sort() into `--partitions` output objects,
+validates that the output is globally sorted (as teravalidate does), and
+reports the timings of each phase: sample, map (sort and range partition
+of each chunk) and merge.
+
+Usage:
+    python terasort.py --size-mb 256 --chunk-mb 16 --partitions 8
+    python terasort.py --backend aws_lambda --storage aws_s3 --size-mb 10240 --chunk-mb 128
+"""
+
+import json
+import time
+import random
+import argparse
+import tempfile
+
+import lithops
+
+RECORD_SIZE = 100
+KEY_SIZE = 10
+MiB = 1024 ** 2
+PREFIX = 'lithops.benchmark/terasort'
+
+
+def record_key(record):
+    return record[:KEY_SIZE]
+
+
+def teragen(storage, bucket, key, size_mb):
+    rand = random.Random(42)
+    records_per_block = MiB // RECORD_SIZE
+    total_records = size_mb * MiB // RECORD_SIZE
+    with tempfile.TemporaryFile() as tmp:
+        written = 0
+        while written < total_records:
+            n = min(records_per_block, total_records - written)
+            block = bytearray()
+            for i in range(n):
+                block += rand.getrandbits(8 * KEY_SIZE).to_bytes(KEY_SIZE, 'little')
+                block += b'%010d' % (written + i) + b'x' * (RECORD_SIZE - KEY_SIZE - 12) + b'\r\n'
+            tmp.write(block)
+            written += n
+        tmp.seek(0)
+        storage.put_object(bucket, key, tmp)
+    return total_records
+
+
+def teravalidate(storage, outputs):
+    records = 0
+    last_key = b''
+    for output in outputs:
+        data = storage.get_object(output['bucket'], output['key'])
+        keys = [data[i:i + KEY_SIZE] for i in range(0, len(data), RECORD_SIZE)]
+        if keys and (keys[0] < last_key or keys != sorted(keys)):
+            return False, records
+        if keys:
+            last_key = keys[-1]
+        records += len(keys)
+    return True, records
+
+
+def phase_times(futures):
+    """ Wall time of every job, from the first submit to the last worker end """
+    jobs = {}
+    for f in futures:
+        start, end = jobs.get(f.job_key, (float('inf'), 0))
+        jobs[f.job_key] = (min(start, f.stats['host_submit_tstamp']), max(end, f.stats['worker_end_tstamp']))
+    return [round(end - start, 3) for start, end in jobs.values()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', default='localhost')
+    parser.add_argument('--storage', default='localhost')
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--chunk-mb', type=int, default=16)
+    parser.add_argument('--partitions', type=int, default=8)
+    args = parser.parse_args()
+
+    with lithops.FunctionExecutor(backend=args.backend, storage=args.storage, log_level=None) as fexec:
+        storage = fexec.storage
+        bucket = storage.bucket
+        input_key = f'{PREFIX}/{fexec.executor_id}/input'
+
+        start = time.time()
+        total_records = teragen(storage, bucket, input_key, args.size_mb)
+        teragen_time = time.time() - start
+
+        start = time.time()
+        fs = fexec.sort([f'{bucket}/{input_key}'], args.partitions, key=record_key, record_size=RECORD_SIZE,
+                        output_prefix=f'{PREFIX}/{fexec.executor_id}/output', obj_chunk_size=args.chunk_mb * MiB)
+        outputs = fexec.get_result(fs, show_progressbar=False)
+        sort_time = time.time() - start
+
+        outputs = outputs if isinstance(outputs, list) else [outputs]
+        start = time.time()
+        valid, output_records = teravalidate(storage, outputs)
+        validate_time = time.time() - start
+
+        sample_time, map_time, merge_time = phase_times(fexec.futures)
+
+        print(json.dumps({
+            'size_mb': args.size_mb,
+            'records': total_records,
+            'chunk_mb': args.chunk_mb,
+            'partitions': args.partitions,
+            'teragen': round(teragen_time, 3),
+            'sample': sample_time,
+            'map': map_time,
+            'merge': merge_time,
+            'sort_total': round(sort_time, 3),
+            'sort_mb_per_sec': round(args.size_mb / sort_time, 2),
+            'teravalidate': round(validate_time, 3),
+            'valid': valid and output_records == total_records
+        }))
+
+        storage.delete_objects(bucket, [input_key] + [o['key'] for o in outputs])
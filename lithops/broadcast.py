@@ -0,0 +1,147 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+
+import cloudpickle
+
+from lithops.constants import BROADCAST_DIR
+from lithops.utils import dumps_oob, loads_oob, read_into_buffer
+from lithops.storage.utils import create_broadcast_key
+
+logger = logging.getLogger(__name__)
+
+# Serialized objects already resolved in this process, by content hash
+BROADCAST_CACHE = {}
+# Keys of the objects already uploaded by this process
+UPLOADED_BROADCASTS = set()
+
+_cache_lock = threading.Lock()
+_storage = None
+
+
+def set_broadcast_storage(storage):
+    """
+    Sets the storage client used to download the broadcast objects in
+    this process. The worker sets its internal storage before running a
+    function.
+    """
+    global _storage
+    _storage = storage
+
+
+class Broadcast:
+    """
+    Handle of an object serialized and uploaded once to the storage backend,
+    to share it across all the calls of one or many jobs. Only the handle
+    is pickled with the call data, and the object is resolved the first time
+    `value` is accessed within a worker. The serialized objects are cached
+    in memory by the content hash, and on the local disk, so the calls that
+    run in the same container, and the warm invocations of it, download
+    them only once. Each handle deserializes its own copy of the object, so
+    a call that modifies it does not affect the other calls.
+
+    Create it with `FunctionExecutor.broadcast()`.
+    """
+
+    def __init__(self, backend, bucket, key, digest, size, value=None):
+        self.backend = backend
+        self.bucket = bucket
+        self.key = key
+        self.digest = digest
+        self.size = size
+        self._value = value
+
+    @classmethod
+    def create(cls, internal_storage, executor_id, obj):
+        """
+        Serializes and uploads obj, and returns its handle. An object with
+        the same content is only uploaded once per executor.
+        """
+        data = b''.join(dumps_oob(obj, cloudpickle.dumps))
+        digest = hashlib.sha256(data).hexdigest()
+        key = create_broadcast_key(executor_id, digest)
+        if key not in UPLOADED_BROADCASTS:
+            internal_storage.put_data(key, data)
+            UPLOADED_BROADCASTS.add(key)
+            logger.debug(f'Broadcast object uploaded to {key} ({len(data)} bytes)')
+        return cls(internal_storage.backend, internal_storage.bucket, key, digest, len(data), obj)
+
+    @property
+    def value(self):
+        """
+        The broadcast object
+        """
+        if self._value is None:
+            self._value = self.load()
+        return self._value
+
+    def load(self):
+        """
+        Returns a new copy of the broadcast object, deserialized from the
+        cached data
+        """
+        return loads_oob(self._resolve())
+
+    def _resolve(self):
+        with _cache_lock:
+            if self.digest in BROADCAST_CACHE:
+                return BROADCAST_CACHE[self.digest]
+
+            cache_path = os.path.join(BROADCAST_DIR, self.digest)
+            if os.path.isfile(cache_path):
+                logger.debug(f'Loading broadcast object {self.digest} from {cache_path}')
+                with open(cache_path, 'rb') as f:
+                    data = read_into_buffer(f, os.path.getsize(cache_path))
+            else:
+                logger.debug(f'Downloading broadcast object from {self.bucket}/{self.key}')
+                stream = self._get_storage().get_object(self.bucket, self.key, stream=True)
+                data = read_into_buffer(stream)
+                self._save(cache_path, data)
+
+            # Read-only, so that loads_oob() copies the buffers of every object it rebuilds
+            data = memoryview(data).toreadonly()
+            BROADCAST_CACHE[self.digest] = data
+            return data
+
+    def _get_storage(self):
+        if _storage is not None and _storage.backend == self.backend:
+            return _storage
+        from lithops.storage import Storage
+        return Storage(backend=self.backend, reuse_client=True)
+
+    @staticmethod
+    def _save(cache_path, data):
+        # Written to a temp file first, so other processes never read a partial object
+        try:
+            os.makedirs(BROADCAST_DIR, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=BROADCAST_DIR, delete=False) as tmp:
+                tmp.write(data)
+            os.replace(tmp.name, cache_path)
+        except OSError as e:
+            logger.debug(f'Cannot cache the broadcast object on disk: {e}')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_value'] = None
+        return state
+
+    def __repr__(self):
+        return f'<Broadcast {self.digest[:12]} ({self.size} bytes) at {self.backend}://{self.bucket}/{self.key}>'
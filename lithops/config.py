@@ -228,6 +228,8 @@ def extract_storage_config(config):
     s_config['monitoring_interval'] = config['lithops'].get(
         'monitoring_interval', c.LITHOPS_DEFAULT_CONFIG_KEYS['monitoring_interval']
     )
+    for key in ('compression', 'compression_threshold'):
+        s_config[key] = config['lithops'].get(key, c.LITHOPS_DEFAULT_CONFIG_KEYS[key])
     backend = config['lithops']['storage']
     s_config['backend'] = backend
     s_config[backend] = config[backend] if backend in config and config[backend] else {}
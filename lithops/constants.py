@@ -44,6 +44,7 @@ LOGS_PREFIX = "lithops.logs"
 RUNTIMES_PREFIX = "lithops.runtimes"
 
 MAX_AGG_DATA_SIZE = 4  # 4MiB
+MAX_LOG_SIZE = 1  # 1MiB
 
 WORKER_PROCESSES_DEFAULT = 1
 
@@ -54,6 +55,7 @@ JOBS_DIR = os.path.join(LITHOPS_TEMP_DIR, 'jobs')
 LOGS_DIR = os.path.join(LITHOPS_TEMP_DIR, 'logs')
 MODULES_DIR = os.path.join(LITHOPS_TEMP_DIR, 'modules')
 CUSTOM_RUNTIME_DIR = os.path.join(LITHOPS_TEMP_DIR, 'custom-runtime')
+BROADCAST_DIR = os.path.join(LITHOPS_TEMP_DIR, 'broadcast')
 
 RN_LOG_FILE = os.path.join(LITHOPS_TEMP_DIR, 'localhost-runner.log')
 SV_LOG_FILE = os.path.join(LITHOPS_TEMP_DIR, 'localhost-service.log')
@@ -72,7 +74,10 @@ CONFIG_FILE_GLOBAL = os.path.join("/etc", "lithops", "config")
 LITHOPS_DEFAULT_CONFIG_KEYS = {
     'monitoring': 'storage',
     'monitoring_interval': 2,
-    'execution_timeout': 1800
+    'execution_timeout': 1800,
+    'compression': 'none',
+    'compression_threshold': 4096,
+    'chunksize_target_duration': 5
 }
 
 SA_INSTALL_DIR = '/opt/lithops'
@@ -17,6 +17,7 @@
 
 import os
 import sys
+import random
 import logging
 import atexit
 import pickle
@@ -32,6 +33,13 @@ from lithops.invokers import create_invoker
 from lithops.storage import InternalStorage
 from lithops.wait import wait, ALL_COMPLETED, THREADPOOL_SIZE, ALWAYS
 from lithops.job import create_map_job, create_reduce_job
+from lithops.job.stats import JobStatsTable
+from lithops.job.profile import JobProfile
+from lithops.job.shuffle import ShuffleMapFunction, ShuffleReduceFunction, hash_partitioner
+from lithops.job.sort import RecordFormat, SortSampleFunction, SortObjectMapFunction, \
+    SortKeysMapFunction, SortReduceFunction, compute_splits
+from lithops.util.tracing import Tracer
+from lithops.broadcast import Broadcast
 from lithops.config import default_config, \
     extract_localhost_config, extract_standalone_config, \
     extract_serverless_config, get_log_info, extract_storage_config
@@ -43,6 +51,7 @@ from lithops.localhost import LocalhostHandlerV1, LocalhostHandlerV2
 from lithops.standalone import StandaloneHandler
 from lithops.serverless import ServerlessHandler
 from lithops.storage.utils import create_job_key, CloudObject
+from lithops.storage.formats import PartitionFormat
 from lithops.monitor import JobMonitor
 from lithops.utils import FuturesList
 
@@ -80,6 +89,7 @@ class FunctionExecutor:
         self.is_lithops_worker = is_lithops_worker()
         self.executor_id = create_executor_id()
         self.futures = []
+        self.pipelines = []
         self.cleaned_jobs = set()
         self.total_jobs = 0
         self.last_call = None
@@ -148,6 +158,13 @@ class FunctionExecutor:
             job_monitor=self.job_monitor
         )
 
+        # Create the tracer of the jobs
+        self.tracer = Tracer(
+            enabled=self.config['lithops'].get('trace', False),
+            executor_id=self.executor_id,
+            config=self.config['lithops']
+        )
+
         logger.debug(f'Function executor for {self.backend} created with ID: {self.executor_id}')
 
         self.log_path = None
@@ -161,12 +178,26 @@ class FunctionExecutor:
         self.job_monitor.stop()
         self.invoker.stop()
         self.compute_handler.clear()
+        self.tracer.close()
 
     def _create_job_id(self, call_type):
         job_id = str(self.total_jobs).zfill(3)
         self.total_jobs += 1
         return f'{call_type}{job_id}'
 
+    def broadcast(self, obj: Any) -> Broadcast:
+        """
+        Serializes and uploads an object once, to share it across the calls of
+        one or many jobs without pickling it into every call. Pass the returned
+        handle to the functions, and get the object with its `value` attribute.
+        Workers download it only once per container.
+
+        :param obj: The object to share, for example a model or a lookup table
+
+        :return: A Broadcast handle of the object
+        """
+        return Broadcast.create(self.internal_storage, self.executor_id, obj)
+
     def call_async(
         self,
         func: Callable,
@@ -175,7 +206,8 @@ class FunctionExecutor:
         runtime_memory: Optional[int] = None,
         timeout: Optional[int] = None,
         include_modules: Optional[List] = [],
-        exclude_modules: Optional[List] = []
+        exclude_modules: Optional[List] = [],
+        profile: Optional[Union[bool, Dict[str, int]]] = False
     ) -> ResponseFuture:
         """
         For running one function execution asynchronously.
@@ -187,9 +219,11 @@ class FunctionExecutor:
         :param timeout: Time that the function has to complete its execution before raising a timeout.
         :param include_modules: Explicitly pickle these dependencies.
         :param exclude_modules: Explicitly keep these modules from pickled dependencies.
+        :param profile: Profile the function with cProfile. Pass {'memory_top': N} to also record its top N memory allocation sites.
 
         :return: Response future.
         """
+        self._run_pipelines(data)
         job_id = self._create_job_id('A')
         self.last_call = 'call_async'
 
@@ -206,7 +240,8 @@ class FunctionExecutor:
                              extra_env=extra_env,
                              include_modules=include_modules,
                              exclude_modules=exclude_modules,
-                             execution_timeout=timeout)
+                             execution_timeout=timeout,
+                             profile=profile)
 
         futures = self.invoker.run_job(job)
         self.futures.extend(futures)
@@ -217,23 +252,26 @@ class FunctionExecutor:
         self,
         map_function: Callable,
         map_iterdata: List[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]],
-        chunksize: Optional[int] = None,
+        chunksize: Optional[Union[int, str]] = None,
         extra_args: Optional[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]] = None,
         extra_env: Optional[Dict[str, str]] = None,
         runtime_memory: Optional[int] = None,
         obj_chunk_size: Optional[int] = None,
         obj_chunk_number: Optional[int] = None,
         obj_newline: Optional[str] = '\n',
+        obj_format: Optional[Union[str, PartitionFormat]] = None,
         timeout: Optional[int] = None,
         include_modules: Optional[List[str]] = [],
-        exclude_modules: Optional[List[str]] = []
+        exclude_modules: Optional[List[str]] = [],
+        profile: Optional[Union[bool, Dict[str, int]]] = False,
+        lazy: Optional[bool] = False
     ) -> FuturesList:
         """
         Spawn multiple function activations based on the items of an input list.
 
         :param map_function: The function to map over the data
         :param map_iterdata: An iterable of input data (e.g python list).
-        :param chunksize: Split map_iteradata in chunks of this size. Lithops spawns 1 worker per resulting chunk
+        :param chunksize: Split map_iteradata in chunks of this size. Lithops spawns 1 worker per resulting chunk. 'auto' chooses it from a probe wave
         :param extra_args: Additional arguments to pass to each map_function activation
         :param extra_env: Additional environment variables for function environment
         :param runtime_memory: Memory (in MB) to use to run the functions
@@ -243,14 +281,29 @@ class FunctionExecutor:
                 'None' for processing the whole file in one function activation. chunk_n has prevalence over chunk_size if both parameters are set
         :param obj_newline: new line character for keeping line integrity of partitions.
                 'None' for disabling line integrity logic and get partitions of the exact same size in the functions
+        :param obj_format: Used for data processing. Format of the objects to split them in partitions of whole records:
+                'lines', 'jsonl', 'csv', 'parquet', or a PartitionFormat instance. Partitions iterate their records with `obj.records()`
         :param timeout: Max time per function activation (seconds)
         :param include_modules: Explicitly pickle these dependencies. All required dependencies are pickled if default empty list.
                 No one dependency is pickled if it is explicitly set to None
         :param exclude_modules: Explicitly keep these modules from pickled dependencies. It is not taken into account if you set include_modules.
+        :param profile: Profile the function with cProfile. Pass {'memory_top': N} to also record its top N memory allocation sites.
+        :param lazy: Defer the map until its futures are waited or another job is created,
+                so the element-wise functions of the next chained `map()` calls run in the same activations.
 
         :return: A list with size `len(map_iterdata)` of futures for each job (Futures are also internally stored by Lithops).
         """
-
+        if lazy:
+            fs = create_futures_list([], self)
+            fs._set_pipeline(map_function, map_iterdata, {
+                'chunksize': chunksize, 'extra_args': extra_args, 'extra_env': extra_env,
+                'runtime_memory': runtime_memory, 'obj_chunk_size': obj_chunk_size,
+                'obj_chunk_number': obj_chunk_number, 'obj_newline': obj_newline, 'obj_format': obj_format, 'timeout': timeout,
+                'include_modules': include_modules, 'exclude_modules': exclude_modules, 'profile': profile
+            })
+            return fs
+
+        self._run_pipelines(map_iterdata)
         job_id = self._create_job_id('M')
         self.last_call = 'map'
 
@@ -273,7 +326,9 @@ class FunctionExecutor:
             extra_args=extra_args,
             obj_chunk_size=obj_chunk_size,
             obj_chunk_number=obj_chunk_number,
-            obj_newline=obj_newline
+            obj_newline=obj_newline,
+            obj_format=obj_format,
+            profile=profile
         )
 
         futures = self.invoker.run_job(job)
@@ -290,7 +345,7 @@ class FunctionExecutor:
         map_function: Callable,
         map_iterdata: List[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]],
         reduce_function: Callable,
-        chunksize: Optional[int] = None,
+        chunksize: Optional[Union[int, str]] = None,
         extra_args: Optional[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]] = None,
         extra_args_reduce: Optional[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]] = None,
         extra_env: Optional[Dict[str, str]] = None,
@@ -300,6 +355,7 @@ class FunctionExecutor:
         obj_chunk_size: Optional[int] = None,
         obj_chunk_number: Optional[int] = None,
         obj_newline: Optional[str] = '\n',
+        obj_format: Optional[Union[str, PartitionFormat]] = None,
         obj_reduce_by_key: Optional[bool] = False,
         spawn_reducer: Optional[int] = 20,
         include_modules: Optional[List[str]] = [],
@@ -311,7 +367,7 @@ class FunctionExecutor:
         :param map_function: The function to map over the data
         :param map_iterdata: An iterable of input data
         :param reduce_function: The function to reduce over the futures
-        :param chunksize: Split map_iteradata in chunks of this size. Lithops spawns 1 worker per resulting chunk. Default 1
+        :param chunksize: Split map_iteradata in chunks of this size. Lithops spawns 1 worker per resulting chunk. 'auto' chooses it from a probe wave. Default 1
         :param extra_args: Additional arguments to pass to function activation. Default None
         :param extra_args_reduce: Additional arguments to pass to the reduce function activation. Default None
         :param extra_env: Additional environment variables for action environment. Default None
@@ -322,6 +378,8 @@ class FunctionExecutor:
         :param obj_chunk_number: Number of chunks to split each object. 'None' for processing the whole file in one function activation
         :param obj_newline: New line character for keeping line integrity of partitions.
                 'None' for disabling line integrity logic and get partitions of the exact same size in the functions
+        :param obj_format: Used for data processing. Format of the objects to split them in partitions of whole records:
+                'lines', 'jsonl', 'csv', 'parquet', or a PartitionFormat instance. Partitions iterate their records with `obj.records()`
         :param obj_reduce_by_key: Set one reducer per object after running the partitioner. By default there is one reducer for all the objects
         :param spawn_reducer: Percentage of done map functions before spawning the reduce function
         :param include_modules: Explicitly pickle these dependencies.
@@ -329,6 +387,7 @@ class FunctionExecutor:
 
         :return: A list with size `len(map_iterdata)` of futures.
         """
+        self._run_pipelines(map_iterdata)
         self.last_call = 'map_reduce'
         map_job_id = self._create_job_id('M')
 
@@ -349,6 +408,7 @@ class FunctionExecutor:
             obj_chunk_size=obj_chunk_size,
             obj_chunk_number=obj_chunk_number,
             obj_newline=obj_newline,
+            obj_format=obj_format,
             include_modules=include_modules,
             exclude_modules=exclude_modules,
             execution_timeout=timeout
@@ -394,6 +454,269 @@ class FunctionExecutor:
 
         return create_futures_list(map_futures + reduce_futures, self)
 
+    def map_shuffle_reduce(
+        self,
+        map_function: Callable,
+        map_iterdata: List[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]],
+        reduce_function: Callable,
+        num_partitions: int,
+        partitioner: Optional[Callable] = hash_partitioner,
+        chunksize: Optional[Union[int, str]] = None,
+        extra_args: Optional[Union[List[Any], Tuple[Any, ...], Dict[str, Any]]] = None,
+        extra_env: Optional[Dict[str, str]] = None,
+        map_runtime_memory: Optional[int] = None,
+        reduce_runtime_memory: Optional[int] = None,
+        timeout: Optional[int] = None,
+        obj_chunk_size: Optional[int] = None,
+        obj_chunk_number: Optional[int] = None,
+        obj_newline: Optional[str] = '\n',
+        obj_format: Optional[Union[str, PartitionFormat]] = None,
+        spawn_reducer: Optional[int] = 20,
+        include_modules: Optional[List[str]] = [],
+        exclude_modules: Optional[List[str]] = []
+    ) -> FuturesList:
+        """
+        Map the map_function over the data, repartition its (key, value) pairs by key, and apply
+        the reduce_function to the values of each key, with one reduce activation per partition.
+
+        :param map_function: The function to map over the data. It must return an iterable of (key, value) pairs or a dict
+        :param map_iterdata: An iterable of input data
+        :param reduce_function: The function to reduce the values of a key. It receives the key and the list of its values
+        :param num_partitions: Number of partitions of the keys, and of reduce function activations
+        :param partitioner: Function that hashes a key. The partition of a key is `partitioner(key) % num_partitions`.
+                It must return the same value for a key in every worker
+        :param chunksize: Split map_iteradata in chunks of this size. Lithops spawns 1 worker per resulting chunk. 'auto' chooses it from a probe wave. Default 1
+        :param extra_args: Additional arguments to pass to the map function activations. Default None
+        :param extra_env: Additional environment variables for action environment. Default None
+        :param map_runtime_memory: Memory to use to run the map function. Default None (loaded from config)
+        :param reduce_runtime_memory: Memory to use to run the reduce function. Default None (loaded from config)
+        :param timeout: Time that the functions have to complete their execution before raising a timeout
+        :param obj_chunk_size: the size of the data chunks to split each object. 'None' for processing the whole file in one function activation
+        :param obj_chunk_number: Number of chunks to split each object. 'None' for processing the whole file in one function activation
+        :param obj_newline: New line character for keeping line integrity of partitions.
+                'None' for disabling line integrity logic and get partitions of the exact same size in the functions
+        :param obj_format: Used for data processing. Format of the objects to split them in partitions of whole records:
+                'lines', 'jsonl', 'csv', 'parquet', or a PartitionFormat instance. Partitions iterate their records with `obj.records()`
+        :param spawn_reducer: Percentage of done map functions before spawning the reduce functions
+        :param include_modules: Explicitly pickle these dependencies.
+        :param exclude_modules: Explicitly keep these modules from pickled dependencies.
+
+        :return: A list of futures, with the futures of the map activations followed by one future per partition,
+            whose result is a dict with the reduced value of each key of the partition.
+        """
+        self._run_pipelines(map_iterdata)
+        self.last_call = 'map_reduce'
+        map_job_id = self._create_job_id('M')
+
+        runtime_meta = self.invoker.select_runtime(map_job_id, map_runtime_memory)
+
+        map_job = create_map_job(
+            config=self.config,
+            internal_storage=self.internal_storage,
+            executor_id=self.executor_id,
+            job_id=map_job_id,
+            map_function=ShuffleMapFunction(map_function, num_partitions, partitioner, self.executor_id, map_job_id),
+            iterdata=map_iterdata,
+            chunksize=chunksize,
+            runtime_meta=runtime_meta,
+            runtime_memory=map_runtime_memory,
+            extra_args=extra_args,
+            extra_env=extra_env,
+            obj_chunk_size=obj_chunk_size,
+            obj_chunk_number=obj_chunk_number,
+            obj_newline=obj_newline,
+            obj_format=obj_format,
+            include_modules=include_modules,
+            exclude_modules=exclude_modules,
+            execution_timeout=timeout
+        )
+
+        map_futures = self.invoker.run_job(map_job)
+        self.futures.extend(map_futures)
+
+        if isinstance(map_iterdata, FuturesList):
+            for fut in map_iterdata:
+                fut._produce_output = False
+
+        if spawn_reducer != ALWAYS:
+            self.wait(map_futures, return_when=spawn_reducer)
+            logger.debug(f'ExecutorID {self.executor_id} | JobID {map_job_id} - '
+                         f'{spawn_reducer}% of map activations done. Spawning reduce stage')
+
+        reduce_job_id = map_job_id.replace('M', 'R')
+
+        runtime_meta = self.invoker.select_runtime(reduce_job_id, reduce_runtime_memory)
+
+        reduce_job = create_reduce_job(
+            config=self.config,
+            internal_storage=self.internal_storage,
+            executor_id=self.executor_id,
+            reduce_job_id=reduce_job_id,
+            reduce_function=ShuffleReduceFunction(reduce_function),
+            map_job=map_job,
+            map_futures=map_futures,
+            runtime_meta=runtime_meta,
+            runtime_memory=reduce_runtime_memory,
+            obj_reduce_by_key=False,
+            extra_env=extra_env,
+            include_modules=include_modules,
+            exclude_modules=exclude_modules,
+            num_partitions=num_partitions
+        )
+
+        reduce_futures = self.invoker.run_job(reduce_job)
+        self.futures.extend(reduce_futures)
+
+        [f._set_mapreduce() for f in map_futures]
+
+        return create_futures_list(map_futures + reduce_futures, self)
+
+    def sort(
+        self,
+        iterdata: List[Any],
+        num_partitions: int,
+        key: Optional[Callable] = None,
+        output_prefix: Optional[str] = None,
+        output_bucket: Optional[str] = None,
+        record_size: Optional[int] = None,
+        sample_size: Optional[int] = 1000,
+        obj_chunk_size: Optional[int] = None,
+        obj_chunk_number: Optional[int] = None,
+        extra_env: Optional[Dict[str, str]] = None,
+        map_runtime_memory: Optional[int] = None,
+        reduce_runtime_memory: Optional[int] = None,
+        timeout: Optional[int] = None,
+        spawn_reducer: Optional[int] = 20,
+        include_modules: Optional[List[str]] = [],
+        exclude_modules: Optional[List[str]] = []
+    ) -> FuturesList:
+        """
+        Sort a dataset in object storage, or a list of keys. The keys are sampled to split them in
+        `num_partitions` ranges, the map activations sort their input and partition it by range, and there is
+        one reduce activation per range that merges the sorted runs of all the map activations.
+
+        :param iterdata: With `output_prefix`, the objects to sort, in the same formats as the iterdata of a `map()`
+                function with the `obj` parameter. Otherwise, a list of keys to sort
+        :param num_partitions: Number of key ranges, and of reduce activations
+        :param key: Function that returns the sort key of a record. Default the whole record
+        :param output_prefix: Key prefix of the output objects, one per range, named `<output_prefix>/part-NNNNN`
+        :param output_bucket: Bucket of the output objects. Default the storage bucket
+        :param record_size: Size of the fixed-width records of the objects. Default newline-terminated records
+        :param sample_size: Number of keys sampled from each map input to compute the key ranges
+        :param obj_chunk_size: Chunk size to split each object in bytes. 'None' for sorting each object in one map activation
+        :param obj_chunk_number: Number of chunks to split each object. Not supported with `record_size`
+        :param extra_env: Additional environment variables for action environment. Default None
+        :param map_runtime_memory: Memory to use to run the map function. Default None (loaded from config)
+        :param reduce_runtime_memory: Memory to use to run the reduce function. Default None (loaded from config)
+        :param timeout: Time that the functions have to complete their execution before raising a timeout
+        :param spawn_reducer: Percentage of done map functions before spawning the reduce functions
+        :param include_modules: Explicitly pickle these dependencies.
+        :param exclude_modules: Explicitly keep these modules from pickled dependencies.
+
+        :return: A list of futures, with the futures of the map activations followed by one future per range,
+            whose result is the description of its output object, or the sorted keys of the range.
+        """
+        self._run_pipelines(iterdata)
+        self.last_call = 'map_reduce'
+        objects = output_prefix is not None
+        record_format = RecordFormat(objects, record_size)
+        job_args = dict(
+            config=self.config,
+            internal_storage=self.internal_storage,
+            executor_id=self.executor_id,
+            extra_env=extra_env,
+            include_modules=include_modules,
+            exclude_modules=exclude_modules,
+            execution_timeout=timeout
+        )
+
+        if objects:
+            obj_newline = None if record_size else '\n'
+            if record_size and obj_chunk_number:
+                raise ValueError('obj_chunk_number is not supported with fixed-width records, use obj_chunk_size')
+            if record_size and obj_chunk_size:
+                # Chunks must not split records
+                obj_chunk_size = max(1, obj_chunk_size // record_size) * record_size
+            obj_args = dict(obj_chunk_size=obj_chunk_size, obj_chunk_number=obj_chunk_number, obj_newline=obj_newline)
+
+            sample_job_id = self._create_job_id('M')
+            runtime_meta = self.invoker.select_runtime(sample_job_id, map_runtime_memory)
+            sample_job = create_map_job(
+                job_id=sample_job_id,
+                map_function=SortSampleFunction(key, record_format, sample_size),
+                iterdata=iterdata,
+                runtime_meta=runtime_meta,
+                runtime_memory=map_runtime_memory,
+                **obj_args,
+                **job_args
+            )
+            sample_futures = self.invoker.run_job(sample_job)
+            self.futures.extend(sample_futures)
+            self.wait(sample_futures, download_results=True, show_progressbar=False)
+            samples = [k for f in sample_futures for k in f.result(internal_storage=self.internal_storage)]
+            [f._set_mapreduce() for f in sample_futures]
+            map_iterdata = iterdata
+        else:
+            keys = list(iterdata)
+            map_iterdata = [(keys[len(keys) * i // num_partitions:len(keys) * (i + 1) // num_partitions], )
+                            for i in range(num_partitions)]
+            map_iterdata = [chunk for chunk in map_iterdata if chunk[0]]
+            samples = [k for chunk, in map_iterdata for k in random.sample(chunk, min(sample_size, len(chunk)))]
+            obj_args = {}
+
+        splits = compute_splits(samples, num_partitions)
+        logger.debug(f'ExecutorID {self.executor_id} - Sort key ranges computed from {len(samples)} sampled keys')
+
+        map_job_id = self._create_job_id('M')
+        runtime_meta = self.invoker.select_runtime(map_job_id, map_runtime_memory)
+        map_function = SortObjectMapFunction if objects else SortKeysMapFunction
+        map_job = create_map_job(
+            job_id=map_job_id,
+            map_function=map_function(key, record_format, splits, self.executor_id, map_job_id),
+            iterdata=map_iterdata,
+            runtime_meta=runtime_meta,
+            runtime_memory=map_runtime_memory,
+            **obj_args,
+            **job_args
+        )
+        map_futures = self.invoker.run_job(map_job)
+        self.futures.extend(map_futures)
+
+        if spawn_reducer != ALWAYS:
+            self.wait(map_futures, return_when=spawn_reducer)
+
+        reduce_job_id = map_job_id.replace('M', 'R')
+        runtime_meta = self.invoker.select_runtime(reduce_job_id, reduce_runtime_memory)
+        reduce_job = create_reduce_job(
+            reduce_job_id=reduce_job_id,
+            reduce_function=SortReduceFunction(key, record_format, output_bucket, output_prefix),
+            map_job=map_job,
+            map_futures=map_futures,
+            runtime_meta=runtime_meta,
+            runtime_memory=reduce_runtime_memory,
+            obj_reduce_by_key=False,
+            num_partitions=num_partitions,
+            **job_args
+        )
+        reduce_futures = self.invoker.run_job(reduce_job)
+        self.futures.extend(reduce_futures)
+
+        [f._set_mapreduce() for f in map_futures]
+
+        return create_futures_list(map_futures + reduce_futures, self)
+
+    def _run_pipelines(self, iterdata=None):
+        """
+        Runs the pending stages of the lazy map pipelines, starting with the
+        one of iterdata, if it is a lazy FuturesList. Called before creating
+        a job, so its input futures exist.
+        """
+        if isinstance(iterdata, FuturesList):
+            iterdata._run_pipeline()
+        pipelines, self.pipelines = self.pipelines, []
+        for fs in pipelines:
+            fs._run_pipeline()
+
     def wait(
         self,
         fs: Optional[Union[ResponseFuture, FuturesList, List[ResponseFuture]]] = None,
@@ -425,6 +748,7 @@ class FunctionExecutor:
         :return: `(fs_done, fs_notdone)` where `fs_done` is a list of futures that have
             completed and `fs_notdone` is a list of futures that have not completed.
         """
+        self._run_pipelines()
         futures = fs or self.futures
 
         if type(futures) not in [list, FuturesList]:
@@ -465,6 +789,8 @@ class FunctionExecutor:
             fs_done = [f for f in futures if f.success or f.done]
             fs_notdone = [f for f in futures if not f.success and not f.done]
 
+        self.tracer.add_futures(fs_done)
+
         return create_futures_list(fs_done, self), create_futures_list(fs_notdone, self)
 
     def get_result(
@@ -488,6 +814,7 @@ class FunctionExecutor:
 
         :return: The result of the future/s
         """
+        self._run_pipelines()
         pending_to_read = len(fs) if fs else len(
             [f for f in self.futures if not f._read and not f.futures])
 
@@ -559,6 +886,45 @@ class FunctionExecutor:
         create_timeline(ftrs_to_plot, dst, figsize)
         create_histogram(ftrs_to_plot, dst, figsize)
 
+    def job_stats(
+        self,
+        fs: Optional[Union[ResponseFuture, List[ResponseFuture], FuturesList]] = None
+    ) -> JobStatsTable:
+        """
+        Returns a columnar table with the stats of the finished calls, with
+        vectorized summaries and exports to CSV, JSON and Parquet.
+
+        :param fs: list of futures.
+
+        :return: A JobStatsTable of the futures.
+        """
+        ftrs = self.futures if not fs else fs
+
+        if isinstance(ftrs, ResponseFuture):
+            ftrs = [ftrs]
+
+        return JobStatsTable.from_futures([f for f in ftrs if f.stats.get('worker_end_tstamp')])
+
+    def job_profile(
+        self,
+        fs: Optional[Union[ResponseFuture, List[ResponseFuture], FuturesList]] = None
+    ) -> JobProfile:
+        """
+        Downloads the profiles of the finished calls run with `profile=True`
+        and merges them into a single profile, exportable as pstats or as
+        collapsed stacks for flame graphs.
+
+        :param fs: list of futures.
+
+        :return: A JobProfile of the futures.
+        """
+        ftrs = self.futures if not fs else fs
+
+        if isinstance(ftrs, ResponseFuture):
+            ftrs = [ftrs]
+
+        return JobProfile.from_futures(ftrs, self.internal_storage)
+
     def clean(
         self,
         fs: Optional[Union[ResponseFuture, List[ResponseFuture]]] = None,
@@ -686,30 +1052,19 @@ class FunctionExecutor:
             if type(futures) is not list:
                 futures = [futures]
 
-            memory = []
-            runtimes = []
-            curr_job_id = futures[0].job_id
-            job_func = futures[0].function_name  # each job is conducted on a single function
-
+            jobs = {}
             for future in futures:
-                if curr_job_id != future.job_id:
-                    cost = self.compute_handler.backend.calc_cost(runtimes, memory)
-                    append([[curr_job_id, job_func, len(runtimes), sum(memory),
-                             np.round(np.average(runtimes), 10), cost, ' ']])
-
-                    # updating next iteration's variables:
-                    curr_job_id = future.job_id
-                    job_func = future.function_name
-                    memory.clear()
-                    runtimes.clear()
-
-                memory.append(future.runtime_memory)
-                runtimes.append(future.stats['worker_exec_time'])
-
-            # appends last Job-ID
-            cost = self.compute_handler.backend.calc_cost(runtimes, memory)
-            append([[curr_job_id, job_func, len(runtimes), sum(memory),
-                     np.round(np.average(runtimes), 10), cost, ' ']])
+                jobs.setdefault(future.job_key, []).append(future)
+
+            for job_futures in jobs.values():
+                # each job is conducted on a single function and runtime memory
+                job_id = job_futures[0].job_id
+                job_func = job_futures[0].function_name
+                runtimes = JobStatsTable.from_futures(job_futures).column('worker_exec_time').tolist()
+                memory = [job_futures[0].runtime_memory] * len(runtimes)
+                cost = self.compute_handler.backend.calc_cost(runtimes, memory)
+                append([[job_id, job_func, len(runtimes), sum(memory),
+                         np.round(np.average(runtimes), 10), cost, ' ']])
             # append summary row to end of the dataframe
             append_summary()
 
@@ -20,23 +20,77 @@ import os
 import sys
 import time
 import zlib
+import queue
+import atexit
 import base64
 import pickle
 import logging
+import threading
 import traceback
 from six import reraise
 
 from lithops.storage import InternalStorage
-from lithops.storage.utils import (
-    check_storage_path,
-    get_storage_path,
-    create_job_key
-)
+from lithops.job.stats import get_job_stats
+from lithops.storage.utils import check_storage_path, get_storage_path
 from lithops.constants import FN_LOG_FILE, LOGS_DIR
+from lithops.utils import loads_oob
 
 logger = logging.getLogger(__name__)
 
 
+class LogsWriter:
+    """
+    Appends the execution logs of the calls to the job log file and to
+    the functions log file from a background thread, out of the path of
+    the status polling
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def put(self, future):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+                atexit.register(self.stop)
+        self.queue.put(future)
+
+    def _run(self):
+        while True:
+            future = self.queue.get()
+            if future is None:
+                break
+            try:
+                self._write(future)
+            except Exception as e:
+                logger.debug(f'Unable to write the logs of call {future.call_id}: {e}')
+            finally:
+                self.queue.task_done()
+
+    def _write(self, future):
+        logs = future.logs
+        if not logs:
+            return
+        log_file = os.path.join(LOGS_DIR, future.job_key + '.log')
+        header = "Activation: '{}' ({})\n[\n".format(future.runtime_name, future.activation_id)
+        tail = ']\n\n'
+        output = logs.replace('\r', '').replace('\n', '\n    ', logs.count('\n') - 1)
+        with open(log_file, 'a') as lf:
+            lf.write(header + '    ' + output + tail)
+        with open(FN_LOG_FILE, 'a') as lf:
+            lf.write(header + '    ' + output + tail)
+
+    def stop(self, timeout=10):
+        self.queue.put(None)
+        self.thread.join(timeout)
+
+
+LOGS_WRITER = LogsWriter()
+
+
 class ResponseFuture:
     """
     Object representing the result of a Lithops invocation. Returns the status of the
@@ -62,8 +116,11 @@ class ResponseFuture:
         self.runtime_name = job.runtime_name
         self.runtime_memory = job.runtime_memory
         self.activation_id = None
+        self.total_calls = job.total_calls
+        self.trace_context = getattr(job, 'trace_context', None)
         self.stats = {}
-        self.logs = None
+
+        self._logs = None
 
         self._storage_config = storage_config
         self._produce_output = True
@@ -85,6 +142,22 @@ class ResponseFuture:
 
         self._storage_path = get_storage_path(self._storage_config)
 
+    @property
+    def logs(self):
+        """
+        Execution logs of the call. They are downloaded the first time they
+        are accessed if they were not inlined in the call status.
+        """
+        if self._logs is None and self._call_status:
+            if 'logs' in self._call_status:
+                logs = base64.b64decode(self._call_status['logs'].encode())
+                self._logs = zlib.decompress(logs).decode(errors='replace')
+            elif 'logs_key' in self._call_status:
+                # Reuses the storage client of this process across the futures
+                internal_storage = InternalStorage(self._storage_config, reuse_client=True)
+                self._logs = internal_storage.get_call_logs(self._call_status)
+        return self._logs
+
     def _set_state(self, new_state):
         self._state = new_state
 
@@ -207,23 +280,16 @@ class ResponseFuture:
         self.stats['host_status_query_count'] = self._status_query_count
         self.activation_id = self._call_status['activation_id']
 
-        if 'logs' in self._call_status:
-            self.logs = zlib.decompress(base64.b64decode(self._call_status['logs'].encode())).decode()
-            job_key = create_job_key(self.executor_id, self.job_id)
-            log_file = os.path.join(LOGS_DIR, job_key + '.log')
-            header = "Activation: '{}' ({})\n[\n".format(self.runtime_name, self.activation_id)
-            tail = ']\n\n'
-            output = self.logs.replace('\r', '').replace('\n', '\n    ', self.logs.count('\n') - 1)
-            with open(log_file, 'a') as lf:
-                lf.write(header + '    ' + output + tail)
-            with open(FN_LOG_FILE, 'a') as lf:
-                lf.write(header + '    ' + output + tail)
+        # Logs stored in a separate object are downloaded by the logs writer thread
+        if 'logs' in self._call_status or 'logs_key' in self._call_status:
+            LOGS_WRITER.put(self)
 
         for key in self._call_status:
             if any(key.startswith(ss) for ss in ['func', 'host', 'worker']):
                 self.stats[key] = self._call_status[key]
 
         self.stats['worker_exec_time'] = round(self.stats['worker_end_tstamp'] - self.stats['worker_start_tstamp'], 8)
+        get_job_stats(self.job_key).add(self.job_key, self.call_id, self.stats)
         total_time = format(round(self.stats['worker_exec_time'], 2), '.2f')
 
         logger.debug(
@@ -283,6 +349,7 @@ class ResponseFuture:
             self._call_output = pickle.loads(eval(self._call_status['result']))
             self.stats['host_result_done_tstamp'] = time.time()
             self.stats['host_result_query_count'] = 0
+            get_job_stats(self.job_key).add(self.job_key, self.call_id, self.stats)
             logger.debug(
                 f'ExecutorID {self.executor_id} | JobID {self.job_id} - Got output '
                 f'from call {self.call_id} - Activation ID: {self.activation_id}'
@@ -344,10 +411,11 @@ class ResponseFuture:
                     self._set_state(ResponseFuture.State.Error)
                     return None
 
-            self._call_output = pickle.loads(call_output)
+            self._call_output = loads_oob(call_output)
 
             self.stats['host_result_done_tstamp'] = time.time()
             self.stats['host_result_query_count'] = self._output_query_count
+            get_job_stats(self.job_key).add(self.job_key, self.call_id, self.stats)
             logger.debug(f'ExecutorID {self.executor_id} | JobID {self.job_id} - Got output '
                          f'from call {self.call_id} - Activation ID: {self.activation_id}')
 
@@ -16,10 +16,13 @@
 
 import os
 import sys
+import json
+import math
 import time
-import random
 import queue
+import pickle
 import shutil
+import asyncio
 import logging
 import threading
 from concurrent.futures import ThreadPoolExecutor
@@ -37,14 +40,38 @@ from lithops.utils import (
 from lithops.constants import (
     LOGGER_LEVEL,
     LOGS_DIR,
+    LITHOPS_DEFAULT_CONFIG_KEYS,
     SERVERLESS,
     SA_INSTALL_DIR,
     STANDALONE_BACKENDS
 )
+from lithops.storage.utils import create_job_manifest_key
 from lithops.util.metrics import PrometheusExporter
 
 logger = logging.getLogger(__name__)
 
+# Times the invocation of a chunk of calls is retried after a transient error
+INVOKE_RETRIES = 5
+
+# Names of the exceptions of the HTTP and cloud clients raised on connection
+# errors and timeouts, checked by name to not import the clients
+TRANSIENT_ERRORS = {
+    'ConnectionError', 'Timeout', 'TimeoutError', 'TimeoutException', 'TransportError',
+    'EndpointConnectionError', 'ConnectTimeoutError', 'ReadTimeoutError', 'ServiceUnavailable'
+}
+
+
+def is_transient_error(error):
+    """
+    Returns True if an invocation error is worth retrying: connection errors,
+    timeouts, and HTTP 429 or 5xx responses
+    """
+    if any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__):
+        return True
+    response = getattr(error, 'response', None)
+    status_code = getattr(response, 'status_code', None) or getattr(error, 'status_code', None)
+    return isinstance(status_code, int) and (status_code == 429 or status_code >= 500)
+
 
 def create_invoker(config, executor_id, internal_storage,
                    compute_handler, job_monitor):
@@ -61,6 +88,19 @@ def create_invoker(config, executor_id, internal_storage,
         )
 
     elif compute_handler.get_backend_type() == BackendType.FAAS.value:
+        backend = config['lithops']['backend']
+        if config[backend].get('async_invoke', False) and not is_lithops_worker():
+            if compute_handler.supports_async_invoke():
+                return AsyncFaaSInvoker(
+                    config,
+                    executor_id,
+                    internal_storage,
+                    compute_handler,
+                    job_monitor
+                )
+            logger.warning(f"The {backend} backend does not support async invocations. "
+                           "Using the default invoker")
+
         return FaaSInvoker(
             config,
             executor_id,
@@ -167,7 +207,9 @@ class Invoker:
             'lithops_version': __version__,
             'runtime_name': job.runtime_name,
             'runtime_memory': job.runtime_memory,
-            'worker_processes': job.worker_processes
+            'worker_processes': job.worker_processes,
+            'profile': job.profile,
+            'trace_context': job.trace_context
         }
 
         return payload
@@ -214,19 +256,10 @@ class Invoker:
                 f'{job.worker_processes} - Chunksize: {job.chunksize}'
             )
 
-        try:
-            job.runtime_name = self.runtime_name
-            self._invoke_job(job)
-        except (KeyboardInterrupt, Exception) as e:
-            self.stop()
-            raise e
+        job.runtime_name = self.runtime_name
 
-        log_file = os.path.join(LOGS_DIR, job.job_key + '.log')
-        logger.info(
-            f'ExecutorID {job.executor_id} | JobID {job.job_id} - View execution logs at {log_file}'
-        )
-
-        # Create all futures
+        # Create all futures. They exist before the invocation, so that the
+        # invoker can fail the calls whose invocation failed
         futures = []
         for i in range(job.total_calls):
             call_id = "{:05d}".format(i)
@@ -238,6 +271,17 @@ class Invoker:
 
         job.futures = futures
 
+        try:
+            self._invoke_job(job)
+        except (KeyboardInterrupt, Exception) as e:
+            self.stop()
+            raise e
+
+        log_file = os.path.join(LOGS_DIR, job.job_key + '.log')
+        logger.info(
+            f'ExecutorID {job.executor_id} | JobID {job.job_id} - View execution logs at {log_file}'
+        )
+
         return futures
 
     def stop(self):
@@ -283,6 +327,271 @@ class BatchInvoker(Invoker):
         return futures
 
 
+class InvocationController:
+    """
+    Adaptive concurrency controller for the FaaS invoker.
+
+    It limits the number of in-flight activations (invoked and not yet
+    finished) following an AIMD (additive increase, multiplicative decrease)
+    policy: the limit grows additively every time the monitor observes a new
+    worker starting, as long as the invoke latency is not degraded, and it is
+    multiplied by ``decrease`` whenever the backend throttles an invocation.
+    Consecutive throttles also apply an exponential backoff before the next
+    invocation is allowed.
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial_limit=None,
+                 increase=1.0, decrease=0.5, latency_factor=3.0,
+                 max_backoff=5.0, on_limit_change=None):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.max_backoff = max_backoff
+        self.on_limit_change = on_limit_change
+
+        initial_limit = initial_limit or self.max_limit
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.in_flight = 0
+        self.should_run = True
+
+        self.total_invoked = 0
+        self.total_throttled = 0
+        self.total_started = 0
+        self.total_finished = 0
+
+        self._cond = threading.Condition()
+        self._latency_avg = None
+        self._latency_min = None
+        self._backoff = 0
+        self._next_invoke_tstamp = 0
+        self._last_decrease_tstamp = 0
+
+    @property
+    def current_limit(self):
+        """Current number of in-flight activations allowed"""
+        return int(self.limit)
+
+    def _set_limit(self, new_limit):
+        old_limit = self.current_limit
+        self.limit = min(max(new_limit, self.min_limit), self.max_limit)
+        if self.current_limit != old_limit:
+            logger.debug(f'Invoker concurrency limit changed: {old_limit} -> {self.current_limit}')
+            if self.on_limit_change:
+                self.on_limit_change(self.current_limit)
+
+    def _latency_degraded(self):
+        if self._latency_avg is None:
+            return False
+        return self._latency_avg > self._latency_min * self.latency_factor
+
+    def start(self):
+        """
+        Re-enables the controller after a stop(). In-flight activations
+        from previous jobs are forgotten.
+        """
+        with self._cond:
+            self.should_run = True
+            self.in_flight = 0
+            self._backoff = 0
+            self._next_invoke_tstamp = 0
+
+    def stop(self):
+        """
+        Unblocks all the threads waiting for an invocation slot
+        """
+        with self._cond:
+            self.should_run = False
+            self._cond.notify_all()
+
+    def acquire(self, timeout=None):
+        """
+        Blocks until an invocation slot is available.
+        Returns False if the controller was stopped or the timeout expired.
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._cond:
+            while self.should_run:
+                now = time.time()
+                if self.in_flight < self.current_limit and now >= self._next_invoke_tstamp:
+                    self.in_flight += 1
+                    return True
+                waits = [self._next_invoke_tstamp - now] if now < self._next_invoke_tstamp else []
+                if deadline is not None:
+                    if now >= deadline:
+                        return False
+                    waits.append(deadline - now)
+                self._cond.wait(min(waits) if waits else None)
+            return False
+
+    def try_acquire(self):
+        """
+        Non-blocking version of acquire()
+        """
+        return self.acquire(timeout=0)
+
+    def free_slots(self):
+        """
+        Number of invocation slots currently available
+        """
+        with self._cond:
+            return max(0, self.current_limit - self.in_flight)
+
+    def release(self, n=1):
+        """
+        Frees n slots. Called when activations finish
+        """
+        with self._cond:
+            self.total_finished += n
+            self.in_flight = max(0, self.in_flight - n)
+            self._cond.notify_all()
+
+    def on_invoked(self, latency):
+        """
+        Registers a successful invocation and its latency
+        """
+        with self._cond:
+            self.total_invoked += 1
+            self._backoff = 0
+            if self._latency_min is None or latency < self._latency_min:
+                self._latency_min = max(latency, 0.001)
+            self._latency_avg = latency if self._latency_avg is None \
+                else 0.8 * self._latency_avg + 0.2 * latency
+
+    def on_throttled(self, invoke_tstamp=None):
+        """
+        Registers a throttled invocation. The slot is returned, the limit
+        is decreased and the next invocation is delayed
+
+        :param invoke_tstamp: Time when the throttled invocation was issued
+        """
+        with self._cond:
+            now = time.time()
+            invoke_tstamp = invoke_tstamp or now
+            self.total_throttled += 1
+            self.in_flight = max(0, self.in_flight - 1)
+            if invoke_tstamp >= self._last_decrease_tstamp:
+                # Throttles of invocations issued before the last decrease belong
+                # to the same congestion event, so they do not decrease the limit
+                # again. As in TCP, the decrease is applied over the flight size.
+                self._last_decrease_tstamp = now
+                self._set_limit(min(self.limit, max(self.in_flight, 1)) * self.decrease)
+                self._backoff = min(self.max_backoff, max(0.1, self._backoff * 2))
+            self._next_invoke_tstamp = max(self._next_invoke_tstamp, now + self._backoff)
+            self._cond.notify_all()
+
+    def on_worker_started(self, n=1):
+        """
+        Registers n new workers started in the backend
+        """
+        with self._cond:
+            self.total_started += n
+            if not self._latency_degraded():
+                for _ in range(n):
+                    self._set_limit(self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+    def get_metrics(self):
+        """
+        Returns the current state of the controller
+        """
+        with self._cond:
+            return {
+                'concurrency_limit': self.current_limit,
+                'in_flight': self.in_flight,
+                'invoked': self.total_invoked,
+                'throttled': self.total_throttled,
+                'workers_started': self.total_started,
+                'workers_finished': self.total_finished,
+                'invoke_latency_avg': round(self._latency_avg or 0, 6)
+            }
+
+
+class ChunksizeTuner:
+    """
+    Chooses the chunksize of a job with chunksize='auto'.
+
+    The first calls of the job are invoked as a probe wave, one call per
+    activation, and the rest are held back. When half of the probes finish,
+    their stats give the overhead of an activation (invocation, cold start,
+    data and status transfers) and the execution time of a call, and the
+    rest of the calls are chunked so that every activation runs about
+    ``target_duration`` seconds, without leaving workers idle.
+    """
+    PROBE_CALLS = 4
+
+    def __init__(self, job, target_duration, max_workers):
+        self.job = job
+        self.target_duration = target_duration
+        self.max_workers = max(1, max_workers)
+        self.probe_calls = min(job.total_calls, self.PROBE_CALLS)
+        # Size of the chunk of every call ID, for the job monitor
+        self.chunksizes = {}
+        self.decision = None
+
+    def chunk(self, call_ids, chunksize):
+        """
+        Splits the call IDs in chunks, and records their size
+        """
+        chunks = list(iterchunks(call_ids, chunksize))
+        for call_ids_range in chunks:
+            for i in call_ids_range:
+                self.chunksizes["{:05d}".format(i)] = len(call_ids_range)
+        return chunks
+
+    def wait_probes(self, should_run, timeout, poll_interval=0.1):
+        """
+        Waits until half of the probes finish, and returns their call status.
+        Returns the finished ones if the timeout expires before.
+        """
+        min_probes = math.ceil(self.probe_calls / 2)
+        deadline = time.time() + timeout
+        while should_run() and time.time() < deadline:
+            probes = getattr(self.job, 'futures', [])[:self.probe_calls]
+            call_status = [f._call_status for f in probes if f._call_status]
+            if len(call_status) >= min_probes:
+                return call_status
+            time.sleep(poll_interval)
+        return [f._call_status for f in getattr(self.job, 'futures', [])[:self.probe_calls] if f._call_status]
+
+    def choose_chunksize(self, probes_call_status, remaining_calls):
+        """
+        Returns the chunksize of the remaining calls from the call status of
+        the probes
+        """
+        overheads, exec_times = [], []
+        for call_status in probes_call_status:
+            if 'worker_func_exec_time' not in call_status or 'worker_end_tstamp' not in call_status:
+                continue
+            activation_time = call_status['worker_end_tstamp'] - call_status['host_submit_tstamp']
+            exec_times.append(call_status['worker_func_exec_time'])
+            overheads.append(max(0, activation_time - call_status['worker_func_exec_time']))
+
+        # More calls than this per activation would leave workers idle
+        max_chunksize = max(1, math.ceil(remaining_calls / self.max_workers))
+
+        if not exec_times:
+            # No probe finished within the target duration
+            chunksize, overhead, exec_time = 1, None, None
+        else:
+            overhead = sorted(overheads)[len(overheads) // 2]
+            exec_time = sorted(exec_times)[len(exec_times) // 2]
+            budget = self.target_duration - overhead
+            chunksize = int(budget / exec_time) if exec_time > 0 else max_chunksize
+            chunksize = max(1, min(chunksize, max_chunksize))
+
+        self.decision = {
+            'host_job_chunksize': chunksize,
+            'host_job_chunksize_probe_calls': self.probe_calls,
+            'host_job_chunksize_probes_done': len(exec_times),
+            'host_job_chunksize_activation_overhead': round(overhead, 6) if overhead is not None else None,
+            'host_job_chunksize_call_exec_time': round(exec_time, 6) if exec_time is not None else None,
+            'host_job_chunksize_target_duration': self.target_duration
+        }
+        return chunksize
+
+
 class FaaSInvoker(Invoker):
     """
     Module responsible to perform the invocations against a FaaS backend
@@ -296,41 +605,62 @@ class FaaSInvoker(Invoker):
         self.remote_invoker = remote_invoker if not is_lithops_worker() else False
 
         self.invokers = []
-        self.ongoing_activations = 0
         self.pending_calls_q = queue.Queue()
+        self.chunksize_tuners = {}
+        # Transient errors of the chunks of calls being retried
+        self.invoke_errors = {}
         self.should_run = False
         self.sync = is_lithops_worker()
 
         self.invoke_pool_threads = self.config[self.backend]['invoke_pool_threads']
         self.executor = ThreadPoolExecutor(self.invoke_pool_threads)
 
+        self.invocation_controller = InvocationController(
+            max_limit=self.max_workers,
+            on_limit_change=self._send_concurrency_limit
+        )
+
         logger.debug(f'ExecutorID {self.executor_id} - Serverless invoker created')
 
+    def _send_concurrency_limit(self, limit):
+        self.prometheus.send_metric(
+            name='invoker_concurrency_limit',
+            value=limit,
+            type='gauge',
+            labels=(('executor_id', self.executor_id),)
+        )
+
+    def get_concurrency_limit(self):
+        """
+        Returns the current number of in-flight activations allowed
+        """
+        return self.invocation_controller.current_limit
+
     def _start_async_invokers(self):
         """Starts the invoker process responsible to spawn pending calls
         in background.
         """
 
         def invoker_process(inv_id):
-            """Run process that implements token bucket scheduling approach"""
+            """Run process that invokes pending calls as soon as the controller allows it"""
             logger.debug(f'ExecutorID {self.executor_id} - Async invoker {inv_id} started')
 
             with ThreadPoolExecutor(max_workers=min(64, self.invoke_pool_threads // 4)) as executor:
                 while self.should_run:
                     try:
-                        self.job_monitor.token_bucket_q.get()
                         job, call_ids_range = self.pending_calls_q.get()
+                        if job is None or not self.invocation_controller.acquire():
+                            break
                     except KeyboardInterrupt:
                         break
                     if self.should_run:
-                        executor.submit(self._invoke_task, job, call_ids_range)
+                        self._submit_task(job, call_ids_range, executor)
                     else:
                         break
 
             logger.debug(f'ExecutorID {self.executor_id} - Async invoker {inv_id} finished')
 
         for inv_id in range(self.ASYNC_INVOKERS):
-            self.job_monitor.token_bucket_q.put('#')
             p = threading.Thread(target=invoker_process, args=(inv_id,))
             self.invokers.append(p)
             p.daemon = True
@@ -343,6 +673,7 @@ class FaaSInvoker(Invoker):
         if self.invokers:
             logger.debug(f'ExecutorID {self.executor_id} - Stopping async invokers')
             self.should_run = False
+            self.invocation_controller.stop()
 
             while not self.pending_calls_q.empty():
                 try:
@@ -351,46 +682,148 @@ class FaaSInvoker(Invoker):
                     pass
 
             for invoker in self.invokers:
-                self.job_monitor.token_bucket_q.put('$')
                 self.pending_calls_q.put((None, None))
 
             self.invokers = []
 
-    def _invoke_task(self, job, call_ids_range):
-        """Method used to perform the actual invocation against the
-        compute backend.
+    def _submit_task(self, job, call_ids_range, executor=None):
         """
-        # prepare payload
-        payload = self._create_payload(job)
+        Submits the invocation of a chunk of calls. Returns a future
+        """
+        executor = executor or self.executor
+        return executor.submit(self._invoke_task, job, call_ids_range)
 
+    def _put_job_manifest(self, job):
+        """
+        Stores in the storage backend the job metadata shared by all the
+        invocations of the job, so that it is not transmitted in every
+        activation payload
+        """
+        manifest = self._create_payload(job)
+        for key in ('call_ids', 'data_byte_ranges', 'host_submit_tstamp'):
+            del manifest[key]
+
+        job.manifest_key = create_job_manifest_key(job.executor_id, job.job_id)
+        self.internal_storage.put_job_manifest(job.manifest_key, json.dumps(manifest))
+
+    def _create_task_payload(self, job, call_ids_range):
+        """
+        Creates the payload of a single invocation. It only carries the
+        job manifest key and the per-call information
+        """
         call_ids = ["{:05d}".format(i) for i in call_ids_range]
-        payload['call_ids'] = call_ids
+
+        payload = {
+            'manifest_key': job.manifest_key,
+            'storage_config': self.storage_config,
+            'log_level': self.log_level,
+            'executor_id': job.executor_id,
+            'job_id': job.job_id,
+            'job_key': job.job_key,
+            'call_ids': call_ids,
+            'host_submit_tstamp': time.time(),
+            'runtime_name': job.runtime_name,
+            'runtime_memory': job.runtime_memory,
+            'chunksize': len(call_ids)
+        }
 
         if job.data_key:
-            data_byte_ranges = [job.data_byte_ranges[int(call_id)] for call_id in call_ids]
-            payload['data_byte_ranges'] = data_byte_ranges
+            payload['data_byte_ranges'] = [job.data_byte_ranges[int(call_id)] for call_id in call_ids]
         else:
-            del payload['data_byte_ranges']
             payload['data_byte_strs'] = [job.data_byte_strs[int(call_id)] for call_id in call_ids]
 
-        # do the invocation
-        start = time.time()
-        activation_id = self.compute_handler.invoke(payload)
+        return payload
+
+    def _process_invocation(self, job, call_ids_range, call_ids, activation_id, start):
+        """
+        Processes the response of an invocation
+        """
         roundtrip = time.time() - start
         resp_time = format(round(roundtrip, 3), '.3f')
 
         if not activation_id:
-            # reached quota limit
-            time.sleep(random.randint(0, 5))
+            # reached quota limit, or the invocation failed. The slot is returned,
+            # the calls are queued again and the controller delays the next invocation
+            self.invocation_controller.on_throttled(start)
             self.pending_calls_q.put((job, call_ids_range))
-            self.job_monitor.token_bucket_q.put('#')
             return
 
+        self.invoke_errors.pop((job.job_key, call_ids[0]), None)
+        self.invocation_controller.on_invoked(roundtrip)
+
         logger.debug(
             f'ExecutorID {job.executor_id} | JobID {job.job_id} - Calls {", ".join(call_ids)} '
             f'invoked ({resp_time}s) - Activation ID: {activation_id}'
         )
 
+    def _process_invocation_error(self, job, call_ids_range, error, start):
+        """
+        Processes an invocation that raised an exception. Transient errors
+        are handled as throttled invocations, up to INVOKE_RETRIES times.
+        Otherwise the slot is returned and the futures of the calls fail.
+        """
+        call_ids = ["{:05d}".format(i) for i in call_ids_range]
+        key = (job.job_key, call_ids[0])
+        retries = self.invoke_errors.get(key, 0)
+
+        if is_transient_error(error) and retries < INVOKE_RETRIES:
+            self.invoke_errors[key] = retries + 1
+            logger.warning(
+                f'ExecutorID {job.executor_id} | JobID {job.job_id} - Invocation of calls '
+                f'{", ".join(call_ids)} failed, retrying ({retries + 1}/{INVOKE_RETRIES}): {error}'
+            )
+            self._process_invocation(job, call_ids_range, call_ids, None, start)
+            return
+
+        self.invoke_errors.pop(key, None)
+        logger.error(
+            f'ExecutorID {job.executor_id} | JobID {job.job_id} - Invocation of calls '
+            f'{", ".join(call_ids)} failed: {error}'
+        )
+        self.invocation_controller.release()
+        self._fail_calls(job, call_ids, error, start)
+
+    def _fail_calls(self, job, call_ids, error, start):
+        """
+        Sets the futures of calls that could not be invoked as failed with
+        the invocation error, as if the worker had raised it
+        """
+        try:
+            exc_info = pickle.dumps((type(error), error, None))
+            pickle.loads(exc_info)
+        except Exception:
+            error = RuntimeError(f'{type(error).__name__}: {error}')
+            exc_info = pickle.dumps((type(error), error, None))
+
+        now = time.time()
+        for call_id in call_ids:
+            call_status = {
+                'type': '__end__',
+                'exception': True,
+                'exc_info': str(exc_info),
+                'activation_id': None,
+                'executor_id': job.executor_id,
+                'job_id': job.job_id,
+                'call_id': call_id,
+                'host_submit_tstamp': start,
+                'worker_start_tstamp': now,
+                'worker_end_tstamp': now
+            }
+            job.futures[int(call_id)]._set_ready(call_status)
+
+    def _invoke_task(self, job, call_ids_range):
+        """Method used to perform the actual invocation against the
+        compute backend.
+        """
+        start = time.time()
+        try:
+            payload = self._create_task_payload(job, call_ids_range)
+            activation_id = self.compute_handler.invoke(payload)
+        except Exception as e:
+            self._process_invocation_error(job, call_ids_range, e, start)
+            return
+        self._process_invocation(job, call_ids_range, payload['call_ids'], activation_id, start)
+
     def _invoke_job_remote(self, job):
         """
         Logic for invoking a job using a remote function
@@ -426,32 +859,43 @@ class FaaSInvoker(Invoker):
         if self.remote_invoker:
             return self._invoke_job_remote(job)
 
+        self._put_job_manifest(job)
+
         if self.should_run is False:
-            self.running_workers = 0
             self.should_run = True
+            self.invocation_controller.start()
             self._start_async_invokers()
 
-        if self.running_workers > 0 and not self.job_monitor.token_bucket_q.empty():
-            while not self.job_monitor.token_bucket_q.empty():
-                try:
-                    self.job_monitor.token_bucket_q.get(False)
-                    self.running_workers -= 1
-                    if self.running_workers == 0:
-                        break
-                except Exception:
-                    pass
+        callids = range(job.total_calls)
+        chunksize = job.chunksize
+        tuner = None
+
+        if getattr(job, 'auto_chunksize', False):
+            # Only the probe wave is invoked now, the tuner chunks the rest
+            target_duration = self.config['lithops'].get(
+                'chunksize_target_duration',
+                LITHOPS_DEFAULT_CONFIG_KEYS['chunksize_target_duration']
+            )
+            tuner = ChunksizeTuner(job, target_duration, self.max_workers)
+            self.chunksize_tuners[job.job_key] = tuner
+            callids = range(tuner.probe_calls)
+            chunksize = 1
+            tuner.chunk(callids, chunksize)
+            logger.debug(
+                f'ExecutorID {job.executor_id} | JobID {job.job_id} - Chunksize auto: '
+                f'invoking a probe wave of {tuner.probe_calls} activations'
+            )
+
+        free_workers = self.invocation_controller.free_slots()
 
-        if self.running_workers < self.max_workers:
-            free_workers = self.max_workers - self.running_workers
-            total_direct = free_workers * job.chunksize
-            callids = range(job.total_calls)
+        if free_workers > 0 and self.pending_calls_q.empty():
+            total_direct = free_workers * chunksize
             callids_to_invoke_direct = callids[:total_direct]
             callids_to_invoke_nondirect = callids[total_direct:]
 
             ci = len(callids_to_invoke_direct)
-            cz = job.chunksize
+            cz = chunksize
             consumed_workers = ci // cz + (ci % cz > 0)
-            self.running_workers += consumed_workers
 
             logger.debug(
                 f'ExecutorID {job.executor_id} | JobID {job.job_id} - Free workers: '
@@ -463,8 +907,11 @@ class FaaSInvoker(Invoker):
                 future.result()
 
             invoke_futures = []
-            for call_ids_range in iterchunks(callids_to_invoke_direct, job.chunksize):
-                future = self.executor.submit(self._invoke_task, job, call_ids_range)
+            for call_ids_range in iterchunks(callids_to_invoke_direct, chunksize):
+                if not self.invocation_controller.try_acquire():
+                    self.pending_calls_q.put((job, call_ids_range))
+                    continue
+                future = self._submit_task(job, call_ids_range)
                 future.add_done_callback(_callback)
                 invoke_futures.append(future)
 
@@ -477,31 +924,150 @@ class FaaSInvoker(Invoker):
                     f'ExecutorID {job.executor_id} | JobID {job.job_id} - Putting remaining '
                     f'{len(callids_to_invoke_nondirect)} function activations into pending queue'
                 )
-                for call_ids_range in iterchunks(callids_to_invoke_nondirect, job.chunksize):
+                for call_ids_range in iterchunks(callids_to_invoke_nondirect, chunksize):
                     self.pending_calls_q.put((job, call_ids_range))
         else:
             logger.debug(
-                f'ExecutorID {job.executor_id} | JobID {job.job_id} - Reached maximum {self.max_workers} '
-                f'workers, queuing {job.total_calls} function activations'
+                f'ExecutorID {job.executor_id} | JobID {job.job_id} - Reached maximum '
+                f'{self.invocation_controller.current_limit} workers, queuing '
+                f'{len(callids)} function activations'
             )
-            for call_ids_range in iterchunks(range(job.total_calls), job.chunksize):
+            for call_ids_range in iterchunks(callids, chunksize):
                 self.pending_calls_q.put((job, call_ids_range))
 
+        if tuner:
+            threading.Thread(target=self._tune_chunksize, args=(job, tuner), daemon=True).start()
+
+    def _tune_chunksize(self, job, tuner):
+        """
+        Waits for the probe wave of a job with chunksize='auto', and queues
+        the rest of its calls, held back until now, with the chosen chunksize.
+        The probes still in the pending queue keep their place in it.
+        """
+        probes_call_status = tuner.wait_probes(lambda: self.should_run, timeout=2 * tuner.target_duration)
+        if not self.should_run:
+            return
+
+        callids = range(tuner.probe_calls, job.total_calls)
+        chunksize = tuner.choose_chunksize(probes_call_status, len(callids))
+
+        job.metadata.update(tuner.decision)
+        for f in getattr(job, 'futures', []):
+            f.stats.update(tuner.decision)
+
+        logger.debug(
+            f'ExecutorID {job.executor_id} | JobID {job.job_id} - Chunksize auto: '
+            f'{tuner.decision["host_job_chunksize_probes_done"]} probes done - Activation overhead: '
+            f'{tuner.decision["host_job_chunksize_activation_overhead"]}s - Call execution time: '
+            f'{tuner.decision["host_job_chunksize_call_exec_time"]}s - Chosen chunksize: {chunksize}'
+        )
+
+        for call_ids_range in tuner.chunk(callids, chunksize):
+            self.pending_calls_q.put((job, call_ids_range))
+
     def run_job(self, job):
         """
         Run a job
         """
         futures = self._run_job(job)
+        tuner = self.chunksize_tuners.get(job.job_key)
         self.job_monitor.start(
             fs=futures,
             job_id=job.job_id,
-            chunksize=job.chunksize,
-            generate_tokens=True
+            chunksize=tuner.chunksizes if tuner else job.chunksize,
+            invocation_controller=self.invocation_controller
         )
 
         return futures
 
 
+class AsyncFaaSInvoker(FaaSInvoker):
+    """
+    FaaS invoker that performs all the invocations from a single asyncio
+    event loop, through a pooled async HTTP client with keep-alive (and
+    HTTP/2 when available). Intended for HTTP-based backends that implement
+    the invoke_async() hook.
+    """
+
+    def __init__(self, config, executor_id, internal_storage, compute_handler, job_monitor):
+        super().__init__(config, executor_id, internal_storage, compute_handler, job_monitor)
+
+        try:
+            import httpx
+        except ImportError:
+            raise ModuleNotFoundError(
+                "Please install 'pip3 install lithops[async]' for "
+                "making use of the async_invoke feature")
+
+        self.httpx = httpx
+        self.max_connections = self.config[self.backend].get('async_max_connections', 100)
+        self.insecure = self.config[self.backend].get('insecure', False)
+        self.http_client = None
+        self.semaphore = None
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.loop_thread.start()
+
+        logger.debug(f'ExecutorID {self.executor_id} - Async invoker created')
+
+    def _create_http_client(self):
+        """
+        Creates the pooled HTTP client. Must be called within the event loop
+        """
+        try:
+            import h2  # noqa
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        limits = self.httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections
+        )
+        logger.debug(f'ExecutorID {self.executor_id} - Creating async HTTP client - '
+                     f'Max connections: {self.max_connections} - HTTP/2: {http2}')
+
+        return self.httpx.AsyncClient(http2=http2, limits=limits, verify=not self.insecure, timeout=None)
+
+    async def _invoke_task_async(self, job, call_ids_range):
+        """
+        Performs the actual invocation against the compute backend
+        """
+        if self.http_client is None:
+            self.http_client = self._create_http_client()
+            # Keeps the pending requests out of the connection pool, whose
+            # scheduling cost grows with the number of queued requests
+            self.semaphore = asyncio.Semaphore(self.max_connections)
+
+        async with self.semaphore:
+            start = time.time()
+            try:
+                payload = self._create_task_payload(job, call_ids_range)
+                activation_id = await self.compute_handler.invoke_async(self.http_client, payload)
+            except Exception as e:
+                self._process_invocation_error(job, call_ids_range, e, start)
+                return
+        self._process_invocation(job, call_ids_range, payload['call_ids'], activation_id, start)
+
+    def _submit_task(self, job, call_ids_range, executor=None):
+        """
+        Schedules the invocation of a chunk of calls in the event loop
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._invoke_task_async(job, call_ids_range), self.loop
+        )
+
+    def stop(self):
+        """
+        Stop async invokers and close the HTTP client connections
+        """
+        super().stop()
+
+        if self.http_client is not None:
+            http_client, self.http_client = self.http_client, None
+            asyncio.run_coroutine_threadsafe(http_client.aclose(), self.loop)
+
+
 def extend_runtime(job, compute_handler, internal_storage):
     """
     This method is used when runtime_include_function is active
@@ -29,6 +29,7 @@ from lithops.job.partitioner import create_partitions
 from lithops.storage.utils import create_func_key, create_data_key, \
     create_job_key, func_key_suffix
 from lithops.job.serialize import SerializeIndependent, create_module_data
+from lithops.util.tracing import create_trace_context
 from lithops.constants import MAX_AGG_DATA_SIZE, LOCALHOST, \
     SERVERLESS, STANDALONE, CUSTOM_RUNTIME_DIR
 
@@ -56,7 +57,9 @@ def create_map_job(
     extra_args=None,
     obj_chunk_size=None,
     obj_newline='\n',
-    obj_chunk_number=None
+    obj_chunk_number=None,
+    obj_format=None,
+    profile=None
 ):
     """
     Wrapper to create a map job. It integrates COS logic to process objects.
@@ -73,7 +76,7 @@ def create_map_job(
                      'from object storage flow'.format(executor_id, job_id))
         map_iterdata, ppo = create_partitions(
             config, internal_storage, map_iterdata,
-            obj_chunk_size, obj_chunk_number, obj_newline
+            obj_chunk_size, obj_chunk_number, obj_newline, obj_format
         )
         host_job_meta['host_job_create_partitions_time'] = round(time.time() - create_partitions_start, 6)
     # ########
@@ -92,7 +95,8 @@ def create_map_job(
         include_modules=include_modules,
         exclude_modules=exclude_modules,
         execution_timeout=execution_timeout,
-        host_job_meta=host_job_meta
+        host_job_meta=host_job_meta,
+        profile=profile
     )
 
     if ppo:
@@ -116,15 +120,20 @@ def create_reduce_job(
     include_modules,
     exclude_modules,
     execution_timeout=None,
-    extra_args=None
+    extra_args=None,
+    num_partitions=None
 ):
     """
     Wrapper to create a reduce job. Apply a function across all map futures.
+    With num_partitions, there is one reduce call per partition of a shuffle.
     """
     host_job_meta = {'host_job_create_tstamp': time.time()}
 
     iterdata = [(map_futures, )]
 
+    if num_partitions:
+        iterdata = [(map_futures, partition) for partition in range(num_partitions)]
+
     if hasattr(map_job, 'parts_per_object') and obj_reduce_by_key:
         prev_total_partitons = 0
         iterdata = []
@@ -172,7 +181,8 @@ def _create_job(
     exclude_modules,
     execution_timeout,
     host_job_meta,
-    chunksize=None
+    chunksize=None,
+    profile=None
 ):
     """
     Creates a new Job
@@ -186,15 +196,25 @@ def _create_job(
     backend = config['lithops']['backend']
 
     job = SimpleNamespace()
-    job.chunksize = chunksize or config['lithops']['chunksize']
+    chunksize = chunksize or config['lithops']['chunksize']
+    # With chunksize='auto' the FaaS invoker chooses the chunksize from a
+    # probe wave. The other invokers use the default one of the backend
+    job.auto_chunksize = chunksize == 'auto'
+    if job.auto_chunksize:
+        default_chunksize = config['lithops']['chunksize']
+        chunksize = 1 if default_chunksize == 'auto' else default_chunksize
+    job.chunksize = chunksize
     job.worker_processes = config[backend]['worker_processes']
     job.execution_timeout = execution_timeout or config['lithops']['execution_timeout']
     job.executor_id = executor_id
     job.job_id = job_id
     job.job_key = create_job_key(job.executor_id, job.job_id)
     job.extra_env = ext_env
-    job.function_name = func.__name__ if inspect.isfunction(func) or inspect.ismethod(func) else type(func).__name__
+    job.function_name = func.__name__ if inspect.isfunction(func) or inspect.ismethod(func) \
+        or isinstance(func, utils.FunctionWrapper) else type(func).__name__
     job.total_calls = len(iterdata)
+    job.profile = _verify_profile(profile)
+    job.trace_context = create_trace_context() if config['lithops'].get('trace') else None
 
     if mode == SERVERLESS:
         job.runtime_memory = runtime_memory or config[backend]['runtime_memory']
@@ -264,7 +284,8 @@ def _create_job(
 
     # Upload function and data
     upload_function = not config[backend].get("runtime_include_function", False)
-    upload_data = any([(len(data_str) * job.chunksize) > MAX_DATA_IN_PAYLOAD for data_str in data_strs])
+    max_chunksize = job.total_calls if job.auto_chunksize else job.chunksize
+    upload_data = any([(len(data_str) * max_chunksize) > MAX_DATA_IN_PAYLOAD for data_str in data_strs])
 
     # Upload function and modules
     if upload_function:
@@ -302,6 +323,7 @@ def _create_job(
         # pass_iteradata through an object storage file
         data_key = create_data_key(executor_id, job_id)
         job.data_key = data_key
+        data_strs = [internal_storage.compress(data_str) for data_str in data_strs]
         data_bytes, data_byte_ranges = utils.agg_data(data_strs)
         job.data_byte_ranges = data_byte_ranges
         data_upload_start = time.time()
@@ -326,6 +348,19 @@ def _create_job(
     return job
 
 
+def _verify_profile(profile):
+    """
+    Returns the profiling options of a job, or None if profiling is disabled
+    """
+    if not profile:
+        return None
+    if profile is True:
+        return {'memory_top': 0}
+    if not isinstance(profile, dict) or set(profile) - {'memory_top'}:
+        raise ValueError("'profile' must be True or a dict with the 'memory_top' key")
+    return {'memory_top': int(profile.get('memory_top', 0))}
+
+
 def _store_func_and_modules(
     job_tmp_dir,
     func_key,
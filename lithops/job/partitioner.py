@@ -23,6 +23,7 @@ from concurrent.futures import ThreadPoolExecutor
 from lithops import utils
 from lithops.storage import Storage
 from lithops.storage.utils import CloudObject, CloudObjectUrl, CloudObjectLocal
+from lithops.storage.formats import get_format
 from lithops.utils import sizeof_fmt
 
 logger = logging.getLogger(__name__)
@@ -36,12 +37,14 @@ def create_partitions(
     map_iterdata,
     obj_chunk_size,
     obj_chunk_number,
-    obj_newline
+    obj_newline,
+    obj_format=None
 ):
     """
     Method that returns the function that will create
     the partitions of the objects in the Cloud
     """
+    obj_format = get_format(obj_format)
 
     urls = []
     paths = []
@@ -68,21 +71,21 @@ def create_partitions(
         # process objects from urls.
         return _split_objects_from_urls(
             urls, obj_chunk_size,
-            obj_chunk_number, obj_newline
+            obj_chunk_number, obj_newline, obj_format
         )
 
     elif paths:
         # process objects from localhost paths.
         return _split_objects_from_paths(
             paths, obj_chunk_size,
-            obj_chunk_number, obj_newline
+            obj_chunk_number, obj_newline, obj_format
         )
 
     elif objects:
         # process objects from an object store.
         return _split_objects_from_object_storage(
             objects, obj_chunk_size, obj_chunk_number,
-            internal_storage, config, obj_newline
+            internal_storage, config, obj_newline, obj_format
         )
 
 
@@ -90,7 +93,8 @@ def _split_objects_from_urls(
     map_func_args_list,
     chunk_size,
     chunk_number,
-    obj_newline
+    obj_newline,
+    obj_format
 ):
     """
     Create partitions from a list of objects urls
@@ -127,6 +131,24 @@ def _split_objects_from_urls(
         if 'accept-ranges' not in metadata.headers:
             obj_chunk_size = obj_size
 
+        if obj_format is not None:
+            if 'content-length' not in metadata.headers:
+                raise Exception(f'Cannot partition {object_url} by format without its content length')
+
+            def read_range(first_byte, last_byte):
+                resp = requests.get(object_url, headers={'Range': f'bytes={first_byte}-{last_byte}'})
+                if resp.status_code == 206:
+                    return resp.content
+                return resp.content[first_byte:last_byte + 1]
+
+            obj_partitions = _split_by_format(
+                entry, lambda: CloudObjectUrl(object_url),
+                int(metadata.headers['content-length']), obj_chunk_size, obj_format, read_range
+            )
+            partitions.extend(obj_partitions)
+            parts_per_object.append(len(obj_partitions))
+            return
+
         obj_partitions = []
         size = obj_total_partitions = 0
 
@@ -170,7 +192,7 @@ def _split_objects_from_urls(
         parts_per_object.append(obj_total_partitions)
 
     with ThreadPoolExecutor(64) as ex:
-        ex.map(_split, map_func_args_list)
+        list(ex.map(_split, map_func_args_list))
 
     return partitions, parts_per_object
 
@@ -179,7 +201,8 @@ def _split_objects_from_paths(
     map_func_args_list,
     chunk_size,
     chunk_number,
-    obj_newline
+    obj_newline,
+    obj_format
 ):
     """
     Create partitions from a list of objects paths
@@ -232,6 +255,20 @@ def _split_objects_from_paths(
         else:
             obj_chunk_size = obj_size = 1
 
+        if obj_format is not None:
+            def read_range(first_byte, last_byte):
+                with open(path, 'rb') as f:
+                    f.seek(first_byte)
+                    return f.read(last_byte - first_byte + 1)
+
+            obj_partitions = _split_by_format(
+                entry, lambda: CloudObjectLocal(path),
+                int(file_stats.st_size), obj_chunk_size, obj_format, read_range
+            )
+            partitions.extend(obj_partitions)
+            parts_per_object.append(len(obj_partitions))
+            return
+
         obj_partitions = []
         size = obj_total_partitions = 0
 
@@ -275,7 +312,7 @@ def _split_objects_from_paths(
         parts_per_object.append(obj_total_partitions)
 
     with ThreadPoolExecutor(64) as ex:
-        ex.map(_split, new_map_func_args_list)
+        list(ex.map(_split, new_map_func_args_list))
 
     return partitions, parts_per_object
 
@@ -286,7 +323,8 @@ def _split_objects_from_object_storage(
     chunk_number,
     internal_storage,
     config,
-    obj_newline
+    obj_newline,
+    obj_format
 ):
     """
     Create partitions from a list of buckets or object keys
@@ -337,6 +375,19 @@ def _split_objects_from_object_storage(
         else:
             obj_chunk_size = obj_size
 
+        if obj_format is not None:
+            def read_range(first_byte, last_byte):
+                extra_get_args = {'Range': f'bytes={first_byte}-{last_byte}'}
+                return storage.get_object(bucket, key, extra_get_args=extra_get_args)
+
+            obj_partitions = _split_by_format(
+                entry, lambda: CloudObject(sb, bucket, key),
+                obj_size, obj_chunk_size, obj_format, read_range
+            )
+            partitions.extend(obj_partitions)
+            parts_per_object.append(len(obj_partitions))
+            return
+
         obj_partitions = []
         size = obj_total_partitions = 0
 
@@ -439,3 +490,28 @@ def _split_objects_from_object_storage(
         raise Exception('No objects found')
 
     return partitions, parts_per_object
+
+
+def _split_by_format(entry, create_object, obj_size, obj_chunk_size, obj_format, read_range):
+    """
+    Create the partitions of an object with the byte ranges of a PartitionFormat
+    """
+    obj_partitions = []
+    if obj_size:
+        logger.debug(f'Creating {obj_format.name} partitions from {entry["obj"]} ({sizeof_fmt(obj_size)})')
+        for first_byte, last_byte, attributes in obj_format.split(obj_size, obj_chunk_size, read_range):
+            partition = entry.copy()
+            partition['obj'] = create_object()
+            partition['obj'].data_byte_range = (first_byte, last_byte)
+            partition['obj'].chunk_size = last_byte - first_byte + 1
+            partition['obj'].part = len(obj_partitions) + 1
+            partition['obj'].newline = None
+            partition['obj'].format = obj_format
+            for name, value in attributes.items():
+                setattr(partition['obj'], name, value)
+            obj_partitions.append(partition)
+
+    for partition in obj_partitions:
+        partition['obj'].total_parts = len(obj_partitions)
+
+    return obj_partitions
@@ -0,0 +1,174 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import io
+import zlib
+import pickle
+import pstats
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Maximum depth of the stacks rebuilt from the caller graph of a profile
+COLLAPSED_MAX_DEPTH = 64
+
+
+class _ProfileData:
+    """
+    Wraps a pstats dict so it can be loaded by pstats.Stats
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def _func_label(func):
+    filename, lineno, name = func
+    if filename == '~':
+        # Built-in functions
+        return name.replace(';', ':')
+    return f'{name} ({os.path.basename(filename)}:{lineno})'.replace(';', ':')
+
+
+class JobProfile:
+    """
+    Aggregated profile of the calls of one or several jobs run with
+    `profile=True`. The cProfile stats of all the calls are merged into a
+    single pstats.Stats, and the tracemalloc allocation sites are summed.
+    """
+
+    def __init__(self):
+        self.stats = None
+        self.roots = set()
+        self.memory = {}
+        self.memory_peak = 0
+        self.calls = 0
+
+    def add(self, profile):
+        """
+        Merges the profile of one call, as uploaded by the worker
+        """
+        profile = pickle.loads(zlib.decompress(profile))
+        stats = _ProfileData(profile['stats'])
+        if self.stats is None:
+            self.stats = pstats.Stats(stats, stream=io.StringIO())
+        else:
+            self.stats.add(stats)
+        if profile.get('root'):
+            self.roots.add(profile['root'])
+
+        for filename, lineno, size, count in profile['memory']:
+            site_size, site_count = self.memory.get((filename, lineno), (0, 0))
+            self.memory[(filename, lineno)] = (site_size + size, site_count + count)
+        self.memory_peak = max(self.memory_peak, profile['memory_peak'])
+        self.calls += 1
+
+    @classmethod
+    def from_futures(cls, fs, internal_storage):
+        """
+        Downloads and merges the profiles of the given futures
+        """
+        profile_keys = [f.stats['worker_profile_key'] for f in fs if 'worker_profile_key' in f.stats]
+        job_profile = cls()
+        if not profile_keys:
+            return job_profile
+
+        with ThreadPoolExecutor(min(len(profile_keys), 64)) as ex:
+            for profile in ex.map(internal_storage.get_data, profile_keys):
+                job_profile.add(profile)
+
+        return job_profile
+
+    def print_stats(self, *restrictions, sort='cumulative'):
+        """
+        Prints the merged stats, as pstats.Stats.print_stats() does
+        """
+        if self.stats is None:
+            return
+        stream = io.StringIO()
+        self.stats.stream = stream
+        self.stats.sort_stats(sort).print_stats(*restrictions)
+        print(stream.getvalue())
+
+    def dump_stats(self, path):
+        """
+        Writes the merged stats to a file readable by pstats and tools
+        like snakeviz
+        """
+        self.stats.dump_stats(path)
+
+    def memory_top(self, limit=10):
+        """
+        Returns the (filename, lineno, size, count) of the allocation sites
+        holding more memory, summed over all the calls
+        """
+        sites = sorted(self.memory.items(), key=lambda site: site[1][0], reverse=True)
+        return [(filename, lineno, size, count) for (filename, lineno), (size, count) in sites[:limit]]
+
+    def to_collapsed(self):
+        """
+        Returns the merged profile in the collapsed stack format used by
+        flame graph tools, with the times in microseconds. cProfile only
+        records caller-callee pairs, so the stacks are rebuilt from the
+        caller graph, starting from the profiled functions, and splitting
+        the time of a function among its callers in proportion to the time
+        spent in each of them.
+        """
+        if self.stats is None:
+            return ''
+
+        children = {}
+        for func, (cc, nc, tt, ct, callers) in self.stats.stats.items():
+            for caller, caller_stats in callers.items():
+                children.setdefault(caller, []).append((func, caller_stats[3]))
+
+        roots = [func for func in self.roots if func in self.stats.stats]
+        if not roots:
+            # Functions without callers in the profile, ignoring recursive calls
+            roots = [func for func, (cc, nc, tt, ct, callers) in self.stats.stats.items()
+                     if not any(caller in self.stats.stats and caller != func for caller in callers)]
+
+        stacks = {}
+
+        def visit(func, time, stack):
+            cc, nc, tt, ct, callers = self.stats.stats[func]
+            stack = stack + [_func_label(func)]
+            if ct <= 0 or time <= 0:
+                return
+            self_time = time * min(tt / ct, 1)
+            if self_time:
+                key = ';'.join(stack)
+                stacks[key] = stacks.get(key, 0) + self_time
+            if len(stack) >= COLLAPSED_MAX_DEPTH:
+                return
+            for child, child_time in children.get(func, []):
+                if _func_label(child) not in stack:
+                    visit(child, time * child_time / ct, stack)
+
+        for root in roots:
+            visit(root, self.stats.stats[root][3], [])
+
+        return ''.join(f'{stack} {round(time * 1e6)}\n'
+                       for stack, time in sorted(stacks.items()) if round(time * 1e6) > 0)
+
+    def to_collapsed_file(self, path):
+        with open(path, 'w') as f:
+            f.write(self.to_collapsed())
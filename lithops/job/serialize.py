@@ -30,7 +30,7 @@ from types import CodeType, FunctionType, ModuleType
 
 from lithops.libs import imp
 from lithops.libs import inspect as linspect
-from lithops.utils import bytes_to_b64str
+from lithops.utils import bytes_to_b64str, FunctionWrapper, dumps_oob
 from lithops.libs.multyvac.module_dependency import ModuleDependencyAnalyzer
 
 logger = logging.getLogger(__name__)
@@ -53,7 +53,7 @@ class SerializeIndependent:
         mod_paths = set()
 
         for obj in list_of_objs:
-            strs.append(cloudpickle.dumps(obj))
+            strs.append(b''.join(dumps_oob(obj, cloudpickle.dumps)))
 
         if include_modules is None:
             # If include_modules is explicitly set to None, no module is included
@@ -151,6 +151,10 @@ class SerializeIndependent:
                     for k, v in linspect.getmembers_static(param):
                         if inspect.isfunction(v) or (inspect.ismethod(v) and inspect.isfunction(v.__func__)):
                             worklist.append(v)
+        elif isinstance(obj, FunctionWrapper):
+            # The obj wraps the user's functions
+            for func in obj.functions:
+                mods.update(self._module_inspect(func))
         elif isinstance(obj, partial):
             found_methods = ["__call__"]
             worklist.append(obj.func)
@@ -0,0 +1,162 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import zlib
+import pickle
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from lithops.utils import FunctionWrapper
+from lithops.storage.utils import create_shuffle_key
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of partitions fetched concurrently by a reducer
+SHUFFLE_FETCH_THREADS = 32
+
+
+def hash_partitioner(key):
+    """
+    Default partitioner of the shuffle. It hashes the keys the same way in
+    every worker, unlike hash(), which salts str and bytes per process.
+    """
+    if isinstance(key, str):
+        key = key.encode()
+    if isinstance(key, (bytes, bytearray)):
+        return zlib.crc32(key)
+    if isinstance(key, tuple):
+        return zlib.crc32(b''.join(hash_partitioner(k).to_bytes(8, 'little', signed=True) for k in key))
+    return hash(key)
+
+
+def write_partitions(storage, key, runs):
+    """
+    Writes the serialized partitions of a map call to a single object, and
+    returns its index, with the offsets of each partition
+    """
+    offsets = [0]
+    for run in runs:
+        offsets.append(offsets[-1] + len(run))
+    storage.put_object(storage.bucket, key, b''.join(runs))
+    return {'key': key, 'offsets': offsets}
+
+
+def fetch_partitions(storage, map_results, partition, ordered=False):
+    """
+    Fetches a partition from the objects written by all the map calls with
+    concurrent ranged reads, and yields their data as the reads complete,
+    or in the order of the map calls if ordered is set
+    """
+    ranges = [(index['key'], index['offsets'][partition], index['offsets'][partition + 1])
+              for index in map_results]
+    ranges = [(key, start, end) for key, start, end in ranges if end > start]
+
+    def fetch(key, start, end):
+        return storage.get_object(storage.bucket, key, extra_get_args={'Range': f'bytes={start}-{end - 1}'})
+
+    if ranges:
+        with ThreadPoolExecutor(min(len(ranges), SHUFFLE_FETCH_THREADS)) as ex:
+            fs = [ex.submit(fetch, *byte_range) for byte_range in ranges]
+            for future in (fs if ordered else as_completed(fs)):
+                yield future.result()
+
+    bytes_read = sum(end - start for _, start, end in ranges)
+    logger.info(f'Partition {partition}: {bytes_read} bytes read from {len(ranges)} map outputs')
+
+
+def add_params(func, params):
+    """
+    Signature of func with the given reserved params, so the worker
+    passes them to the wrapper
+    """
+    func_sig = inspect.signature(func)
+    parameters = list(func_sig.parameters.values())
+    position = len(parameters)
+    if parameters and parameters[-1].kind == inspect.Parameter.VAR_KEYWORD:
+        position -= 1
+    for name in params:
+        if name not in func_sig.parameters:
+            parameters.insert(position, inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY))
+            position += 1
+    return func_sig.replace(parameters=parameters)
+
+
+class ShuffleMapFunction(FunctionWrapper):
+    """
+    Runs the map function of a shuffle, and writes the (key, value) pairs
+    it returns to a single object, partitioned by key. The result of the
+    call is the index of the object, with the offsets of each partition.
+    """
+
+    def __init__(self, map_function, num_partitions, partitioner, executor_id, job_id):
+        super().__init__([map_function])
+        self.map_function = map_function
+        self.num_partitions = num_partitions
+        self.partitioner = partitioner
+        self.executor_id = executor_id
+        self.job_id = job_id
+        if inspect.isfunction(partitioner) and partitioner is not hash_partitioner:
+            self.functions.append(partitioner)
+        self.__signature__ = add_params(map_function, ('storage', 'id'))
+
+    def __call__(self, *args, **kwargs):
+        map_params = inspect.signature(self.map_function).parameters
+        storage = kwargs['storage'] if 'storage' in map_params else kwargs.pop('storage')
+        call_id = kwargs['id'] if 'id' in map_params else kwargs.pop('id')
+
+        pairs = self.map_function(*args, **kwargs)
+        if isinstance(pairs, dict):
+            pairs = pairs.items()
+
+        partitions = [[] for _ in range(self.num_partitions)]
+        for key, value in pairs:
+            partitions[self.partitioner(key) % self.num_partitions].append((key, value))
+
+        shuffle_key = create_shuffle_key(self.executor_id, self.job_id, '{:05d}'.format(call_id))
+        runs = [pickle.dumps(partition, protocol=pickle.HIGHEST_PROTOCOL) if partition else b''
+                for partition in partitions]
+        return write_partitions(storage, shuffle_key, runs)
+
+
+class ShuffleReduceFunction(FunctionWrapper):
+    """
+    Fetches one partition from the objects written by all the map calls of
+    a shuffle with concurrent ranged reads, groups its values by key as the
+    reads complete, and applies the reduce function to each key. The
+    result of the call is a dict with the result of each key.
+    """
+
+    def __init__(self, reduce_function):
+        super().__init__([reduce_function])
+        self.reduce_function = reduce_function
+
+    def __call__(self, map_results, partition, storage):
+        groups = {}
+        for data in fetch_partitions(storage, map_results, partition):
+            for key, value in pickle.loads(data):
+                groups.setdefault(key, []).append(value)
+
+        return {key: self.reduce_function(key, values) for key, values in groups.items()}
+
+
+def shuffle_partition_sizes(map_results, num_partitions):
+    """
+    Returns the bytes read by the reducer of every partition, from the
+    results of the map calls of a shuffle
+    """
+    return [sum(index['offsets'][p + 1] - index['offsets'][p] for index in map_results)
+            for p in range(num_partitions)]
@@ -0,0 +1,196 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import heapq
+import pickle
+import random
+import logging
+from bisect import bisect_right
+
+from lithops.utils import FunctionWrapper
+from lithops.storage.utils import create_shuffle_key
+from lithops.job.shuffle import write_partitions, fetch_partitions
+
+logger = logging.getLogger(__name__)
+
+# Bytes of an input chunk read at a time to sample its keys
+SORT_SAMPLE_BYTES = 1024 ** 2
+
+
+def _identity(record):
+    return record
+
+
+def compute_splits(samples, num_partitions):
+    """
+    Returns the num_partitions - 1 keys that split the sampled keys in
+    ranges of the same size
+    """
+    samples = sorted(samples)
+    if not samples:
+        return []
+    return [samples[len(samples) * i // num_partitions] for i in range(1, num_partitions)]
+
+
+class RecordFormat:
+    """
+    Records of a sort. Object data is split in newline-terminated records,
+    or in records of record_size bytes. Without object data, the records
+    are the keys given in the iterdata, and the runs are pickled.
+    """
+
+    def __init__(self, objects, record_size=None):
+        self.objects = objects
+        self.record_size = record_size
+
+    def split(self, data):
+        """
+        Returns the position after the last complete record of the data
+        """
+        if self.record_size:
+            return len(data) - len(data) % self.record_size
+        return data.rfind(b'\n') + 1
+
+    def parse(self, data):
+        if not self.objects:
+            return pickle.loads(data)
+        if self.record_size:
+            end = len(data) - len(data) % self.record_size
+            return [data[i:i + self.record_size] for i in range(0, end, self.record_size)]
+        records = data.split(b'\n')
+        if records and records[-1] == b'':
+            records.pop()
+        return records
+
+    def dump(self, records):
+        if not records:
+            return b''
+        if not self.objects:
+            return pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.record_size:
+            return b''.join(records)
+        return b'\n'.join(records) + b'\n'
+
+
+class SortSampleFunction(FunctionWrapper):
+    """
+    Samples the keys of the records of an input chunk. The chunk is read in
+    blocks, and the records are reservoir-sampled over the whole chunk.
+    """
+
+    def __init__(self, key, record_format, sample_size):
+        super().__init__([key] if key else [])
+        self.__name__ = 'sort_sample'
+        self.key = key or _identity
+        self.record_format = record_format
+        self.sample_size = sample_size
+
+    def _sample(self, records, sample, seen):
+        for record in records:
+            seen += 1
+            if len(sample) < self.sample_size:
+                sample.append(record)
+            else:
+                i = random.randrange(seen)
+                if i < self.sample_size:
+                    sample[i] = record
+        return seen
+
+    def __call__(self, obj):
+        sample = []
+        seen = 0
+        rest = b''
+        while True:
+            data = obj.data_stream.read(SORT_SAMPLE_BYTES)
+            if not data:
+                break
+            data = rest + data
+            end = self.record_format.split(data)
+            seen = self._sample(self.record_format.parse(data[:end]), sample, seen)
+            rest = data[end:]
+        # The last record may not end with a newline
+        self._sample(self.record_format.parse(rest), sample, seen)
+        return [self.key(record) for record in sample]
+
+
+class SortMapFunction(FunctionWrapper):
+    """
+    Sorts the records of a map input, and writes them to a single object
+    with one sorted run for each key range
+    """
+
+    def __init__(self, key, record_format, splits, executor_id, job_id):
+        super().__init__([key] if key else [])
+        self.__name__ = 'sort_map'
+        self.key = key or _identity
+        self.record_format = record_format
+        self.splits = splits
+        self.executor_id = executor_id
+        self.job_id = job_id
+
+    def _run(self, records, storage, call_id):
+        decorated = sorted(((self.key(record), record) for record in records), key=lambda kr: kr[0])
+        keys = [k for k, _ in decorated]
+        bounds = [0] + [bisect_right(keys, split) for split in self.splits] + [len(decorated)]
+
+        runs = [self.record_format.dump([record for _, record in decorated[bounds[i]:bounds[i + 1]]])
+                for i in range(len(bounds) - 1)]
+        shuffle_key = create_shuffle_key(self.executor_id, self.job_id, '{:05d}'.format(call_id))
+        return write_partitions(storage, shuffle_key, runs)
+
+
+class SortObjectMapFunction(SortMapFunction):
+
+    def __call__(self, obj, storage, id):
+        return self._run(self.record_format.parse(obj.data_stream.read()), storage, id)
+
+
+class SortKeysMapFunction(SortMapFunction):
+
+    def __call__(self, keys, storage, id):
+        return self._run(keys, storage, id)
+
+
+class SortReduceFunction(FunctionWrapper):
+    """
+    Merges the sorted runs of a key range written by all the map calls, in
+    the order of the map calls, so records with the same key keep their
+    input order. The merged records are written to the output object of the
+    range, or returned if the records are not object data.
+    """
+
+    def __init__(self, key, record_format, output_bucket=None, output_prefix=None):
+        super().__init__([key] if key else [])
+        self.__name__ = 'sort_reduce'
+        self.key = key
+        self.record_format = record_format
+        self.output_bucket = output_bucket
+        self.output_prefix = output_prefix
+
+    def __call__(self, map_results, partition, storage):
+        runs = [self.record_format.parse(data) for data in fetch_partitions(storage, map_results, partition, ordered=True)]
+        records = list(heapq.merge(*runs, key=self.key))
+
+        if not self.record_format.objects:
+            return records
+
+        bucket = self.output_bucket or storage.bucket
+        key = f"{self.output_prefix.rstrip('/')}/part-{partition:05d}"
+        data = self.record_format.dump(records)
+        storage.put_object(bucket, key, data)
+        logger.info(f'Partition {partition}: {len(records)} records written to {bucket}/{key}')
+
+        return {'bucket': bucket, 'key': key, 'records': len(records), 'size': len(data)}
@@ -0,0 +1,246 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import csv
+import json
+import math
+import threading
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NAN = float('nan')
+
+# Stats tables of the jobs of this process, by job key
+JOB_STATS = {}
+MAX_JOB_STATS = 100
+
+_job_stats_lock = threading.Lock()
+
+# Latency metrics summarized by JobStatsTable.summary(), computed as the
+# difference of two timestamps, or taken from a stats key
+LATENCY_METRICS = {
+    'queueing_delay': ('worker_start_tstamp', 'host_submit_tstamp'),
+    'cold_start_time': ('worker_func_start_tstamp', 'worker_start_tstamp'),
+    'exec_time': 'worker_func_exec_time',
+    'result_upload_time': 'worker_result_upload_time',
+    'status_fetch_latency': ('host_status_done_tstamp', 'worker_end_tstamp')
+}
+
+SUMMARY_PERCENTILES = (50, 90, 95, 99)
+STRAGGLER_FACTOR = 1.5
+
+
+def get_job_stats(job_key):
+    """
+    Returns the stats table of a job, creating it if it does not exist
+    """
+    with _job_stats_lock:
+        if job_key not in JOB_STATS:
+            if len(JOB_STATS) >= MAX_JOB_STATS:
+                JOB_STATS.pop(next(iter(JOB_STATS)))
+            JOB_STATS[job_key] = JobStatsTable()
+        return JOB_STATS[job_key]
+
+
+def _percentiles(values, percentiles):
+    """
+    Linear interpolation percentiles of the non-NaN values
+    """
+    if np is not None:
+        values = np.asarray(values)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return [NAN] * len(percentiles)
+        return np.percentile(values, percentiles).tolist()
+
+    values = sorted(v for v in values if not math.isnan(v))
+    if not values:
+        return [NAN] * len(percentiles)
+    result = []
+    for p in percentiles:
+        k = (len(values) - 1) * p / 100
+        f = math.floor(k)
+        c = min(f + 1, len(values) - 1)
+        result.append(values[f] + (values[c] - values[f]) * (k - f))
+    return result
+
+
+class JobStatsTable:
+    """
+    Columnar store of the stats of the calls of one or several jobs.
+    Every numeric stat is a typed column of doubles, with NaN where a
+    call does not have it. Rows are added or updated as call statuses
+    and results arrive, possibly from several threads.
+    """
+
+    def __init__(self):
+        self.job_keys = []
+        self.call_ids = []
+        self.columns = {}
+        self.index = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.call_ids)
+
+    def add(self, job_key, call_id, stats):
+        """
+        Adds or updates the row of a call with its stats dict
+        """
+        stats = [(key, value) for key, value in stats.items() if isinstance(value, (int, float))]
+
+        with self.lock:
+            row = self.index.get((job_key, call_id))
+            if row is None:
+                row = len(self.call_ids)
+                self.index[(job_key, call_id)] = row
+                self.job_keys.append(job_key)
+                self.call_ids.append(call_id)
+                for column in self.columns.values():
+                    column.append(NAN)
+
+            for key, value in stats:
+                if key not in self.columns:
+                    self.columns[key] = array('d', [NAN]) * len(self.call_ids)
+                self.columns[key][row] = value
+
+    @classmethod
+    def from_futures(cls, fs):
+        """
+        Returns the stats table of the given futures. If the futures are
+        all the calls of a job, its incrementally built table is reused.
+        """
+        job_keys = {f.job_key for f in fs}
+        if len(job_keys) == 1:
+            job_table = JOB_STATS.get(job_keys.pop())
+            if job_table is not None and len(job_table) == len(fs) \
+               and all((f.job_key, f.call_id) in job_table.index for f in fs):
+                return job_table
+
+        table = cls()
+        for f in fs:
+            table.add(f.job_key, f.call_id, f.stats)
+        return table
+
+    def column(self, name):
+        """
+        Returns a column as a NumPy array if available, otherwise as an array
+        of doubles. Missing columns are all NaN.
+        """
+        column = self.columns.get(name)
+        if column is None:
+            column = array('d', [NAN]) * len(self)
+        if np is not None:
+            return np.array(column, dtype=np.float64)
+        return column
+
+    def metric(self, name):
+        """
+        Returns one of the LATENCY_METRICS, or a column
+        """
+        definition = LATENCY_METRICS.get(name, name)
+        if isinstance(definition, str):
+            return self.column(definition)
+        end, start = (self.column(key) for key in definition)
+        if np is not None:
+            return end - start
+        return array('d', map(float.__sub__, end, start))
+
+    def percentiles(self, name, percentiles=SUMMARY_PERCENTILES):
+        return dict(zip(percentiles, _percentiles(self.metric(name), percentiles)))
+
+    def stragglers(self, factor=STRAGGLER_FACTOR):
+        """
+        Returns the (job_key, call_id) of the calls whose execution time is
+        greater than `factor` times the median execution time
+        """
+        exec_times = self.metric('exec_time')
+        median, = _percentiles(exec_times, [50])
+        if math.isnan(median):
+            return []
+        if np is not None:
+            return [(self.job_keys[i], self.call_ids[i])
+                    for i in np.flatnonzero(exec_times > factor * median)]
+        return [(self.job_keys[i], self.call_ids[i])
+                for i, exec_time in enumerate(exec_times) if exec_time > factor * median]
+
+    def cold_start_breakdown(self, percentiles=SUMMARY_PERCENTILES):
+        """
+        Number of cold and warm starts, and the queueing delay percentiles of each
+        """
+        cold_starts = self.column('worker_cold_start')
+        queueing_delay = self.metric('queueing_delay')
+        breakdown = {}
+        for start_type, flag in (('cold', 1), ('warm', 0)):
+            if np is not None:
+                delays = queueing_delay[cold_starts == flag]
+            else:
+                delays = [d for d, c in zip(queueing_delay, cold_starts) if c == flag]
+            breakdown[start_type] = {
+                'count': len(delays),
+                'queueing_delay': dict(zip(percentiles, _percentiles(delays, percentiles)))
+            }
+        return breakdown
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES, straggler_factor=STRAGGLER_FACTOR):
+        """
+        Returns the percentiles of the latency metrics, and the straggler
+        and cold start breakdowns
+        """
+        return {
+            'calls': len(self),
+            'latencies': {name: self.percentiles(name, percentiles) for name in LATENCY_METRICS},
+            'stragglers': len(self.stragglers(straggler_factor)),
+            'cold_starts': self.cold_start_breakdown(percentiles)
+        }
+
+    def to_dict(self):
+        return {'job_key': self.job_keys, 'call_id': self.call_ids,
+                **{name: self.column(name) for name in self.columns}}
+
+    def to_pandas(self):
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ModuleNotFoundError("Please install 'pip3 install lithops[plotting]' "
+                                      "for converting the stats to a DataFrame")
+        return pd.DataFrame(self.to_dict())
+
+    def to_csv(self, path):
+        names = list(self.columns)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['job_key', 'call_id'] + names)
+            columns = [self.columns[name] for name in names]
+            writer.writerows(zip(self.job_keys, self.call_ids, *columns))
+
+    def to_json(self, path):
+        data = {name: [None if math.isnan(v) else v for v in column]
+                for name, column in self.columns.items()}
+        with open(path, 'w') as f:
+            json.dump({'job_key': self.job_keys, 'call_id': self.call_ids, **data}, f)
+
+    def to_parquet(self, path):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ModuleNotFoundError("Please install 'pip3 install pyarrow' "
+                                      "for exporting the stats to Parquet")
+        self.to_pandas().to_parquet(path)
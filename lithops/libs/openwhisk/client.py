@@ -292,6 +292,34 @@ class OpenWhiskClient:
                 logger.debug(data)
                 raise Exception(data['error'])
 
+    async def invoke_async(self, http_client, package, action_name, payload={}):
+        """
+        Invoke an WSK function through an async HTTP client (httpx.AsyncClient)
+        """
+        url = '/'.join([self.url, self.namespace, 'actions', package, action_name])
+
+        for attempt in range(2):
+            try:
+                resp = await http_client.post(url, content=json.dumps(payload, default=str),
+                                              headers=self.headers)
+                resp_status = resp.status_code
+                data = resp.json()
+                break
+            except Exception as e:
+                logger.debug(f'Invocation Failed: {str(e)}. Doing reinvocation')
+                if attempt == 1:
+                    return None
+
+        if resp_status == 202 and 'activationId' in data:
+            return data["activationId"]
+        elif resp_status == 429:
+            return None  # "Too many concurrent requests in flight"
+        elif resp_status in (401, 404):
+            return resp_status
+        else:
+            logger.debug(data)
+            raise Exception(data['error'])
+
     def invoke_with_result(self, package, action_name, payload={}):
         """
         Invoke a WSK function waiting for the result.
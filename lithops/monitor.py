@@ -21,7 +21,6 @@ import time
 import lithops
 import pickle
 import sys
-import queue
 import threading
 import concurrent.futures as cf
 from tblib import pickling_support
@@ -40,9 +39,8 @@ class Monitor(threading.Thread):
 
     def __init__(self, executor_id,
                  internal_storage,
-                 token_bucket_q,
                  job_chunksize,
-                 generate_tokens,
+                 invocation_controller,
                  config):
 
         super().__init__()
@@ -50,9 +48,9 @@ class Monitor(threading.Thread):
         self.futures = set()
         self.internal_storage = internal_storage
         self.should_run = True
-        self.token_bucket_q = token_bucket_q
         self.job_chunksize = job_chunksize
-        self.generate_tokens = generate_tokens
+        self.invocation_controller = invocation_controller
+        self.generate_tokens = invocation_controller is not None
         self.config = config
         self.daemon = True
 
@@ -156,17 +154,15 @@ class RabbitmqMonitor(Monitor):
             self,
             executor_id,
             internal_storage,
-            token_bucket_q,
             job_chunksize,
-            generate_tokens,
+            invocation_controller,
             config
     ):
         super().__init__(
             executor_id,
             internal_storage,
-            token_bucket_q,
             job_chunksize,
-            generate_tokens,
+            invocation_controller,
             config
         )
 
@@ -229,13 +225,20 @@ class RabbitmqMonitor(Monitor):
 
     def _generate_tokens(self, call_status):
         """
-        generates a new token for the invoker
+        notifies the invocation controller about started and finished workers
         """
         if not self.generate_tokens or not self.should_run:
             return
 
         call_id = (call_status['executor_id'], call_status['job_id'], call_status['call_id'])
         worker_id = call_status['activation_id']
+        if call_status['type'] == '__init__':
+            if worker_id not in self.workers:
+                self.workers[worker_id] = set()
+                self.invocation_controller.on_worker_started()
+            self.workers[worker_id].add(call_id)
+            return
+
         if worker_id not in self.callids_done_worker:
             self.callids_done_worker[worker_id] = []
         self.callids_done_worker[worker_id].append(call_id)
@@ -244,7 +247,7 @@ class RabbitmqMonitor(Monitor):
                 len(self.callids_done_worker[worker_id]) == call_status['chunksize']:
             self.workers_done.append(worker_id)
             if self.should_run:
-                self.token_bucket_q.put('#')
+                self.invocation_controller.release()
 
     def run(self):
         logger.debug(f'ExecutorID {self.executor_id} | Starting RabbitMQ job monitor')
@@ -256,6 +259,7 @@ class RabbitmqMonitor(Monitor):
             call_status = json.loads(body.decode("utf-8"))
 
             if call_status['type'] == '__init__':
+                self._generate_tokens(call_status)
                 self._tag_future_as_running(call_status)
 
             elif call_status['type'] == '__end__':
@@ -293,17 +297,15 @@ class StorageMonitor(Monitor):
             self,
             executor_id,
             internal_storage,
-            token_bucket_q,
             job_chunksize,
-            generate_tokens,
+            invocation_controller,
             config
     ):
         super().__init__(
             executor_id,
             internal_storage,
-            token_bucket_q,
             job_chunksize,
-            generate_tokens,
+            invocation_controller,
             config
         )
 
@@ -392,7 +394,7 @@ class StorageMonitor(Monitor):
 
     def _generate_tokens(self, callids_running, callids_done):
         """
-        Method that generates new tokens
+        Notifies the invocation controller about started and finished workers
         """
         if not self.generate_tokens or not self.should_run:
             return
@@ -400,12 +402,17 @@ class StorageMonitor(Monitor):
         callids_running_to_process = callids_running - self.callids_running_processed
         callids_done_to_process = callids_done - self.callids_done_processed
 
+        new_workers = 0
         for call_id, worker_id in callids_running_to_process:
             if worker_id not in self.workers:
                 self.workers[worker_id] = set()
+                new_workers += 1
             self.workers[worker_id].add(call_id)
             self.callids_running_worker[call_id] = worker_id
 
+        if new_workers:
+            self.invocation_controller.on_worker_started(new_workers)
+
         for callid_done in callids_done_to_process:
             if callid_done in self.callids_running_worker:
                 worker_id = self.callids_running_worker[callid_done]
@@ -418,11 +425,14 @@ class StorageMonitor(Monitor):
             if job_id not in self.present_jobs:
                 continue
             chunksize = self.job_chunksize[job_id]
+            if isinstance(chunksize, dict):
+                # chunksize='auto': the size of the chunk of every call ID
+                chunksize = chunksize.get(self.callids_done_worker[worker_id][0][2])
             if worker_id not in self.workers_done and \
                     len(self.callids_done_worker[worker_id]) == chunksize:
                 self.workers_done.append(worker_id)
                 if self.should_run:
-                    self.token_bucket_q.put('#')
+                    self.invocation_controller.release()
                 else:
                     break
 
@@ -487,7 +497,6 @@ class JobMonitor:
         self.config = config
         self.type = self.config['lithops']['monitoring'].lower() if config else 'storage'
 
-        self.token_bucket_q = queue.Queue()
         self.monitor = None
         self.job_chunksize = {}
 
@@ -496,7 +505,7 @@ class JobMonitor:
             f'{self.type.capitalize()}Monitor'
         )
 
-    def start(self, fs, job_id=None, chunksize=None, generate_tokens=False):
+    def start(self, fs, job_id=None, chunksize=None, invocation_controller=None):
         if self.type == 'storage':
             monitoring_interval = self.storage_config['monitoring_interval']
             monitor_config = {'monitoring_interval': monitoring_interval}
@@ -510,9 +519,8 @@ class JobMonitor:
             self.monitor = self.MonitorClass(
                 executor_id=self.executor_id,
                 internal_storage=self.internal_storage,
-                token_bucket_q=self.token_bucket_q,
                 job_chunksize=self.job_chunksize,
-                generate_tokens=generate_tokens,
+                invocation_controller=invocation_controller,
                 config=monitor_config
             )
 
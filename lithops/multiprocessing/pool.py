@@ -190,6 +190,14 @@ class Pool(object):
 
         return result
 
+    def broadcast(self, obj):
+        """
+        Uploads `obj` once and returns a handle to pass to the tasks instead
+        of the object. The tasks get the object with the `value` attribute
+        of the handle.
+        """
+        return self._executor.broadcast(obj)
+
     def __reduce__(self):
         raise NotImplementedError('pool objects cannot be passed between processes or pickled')
 
@@ -20,21 +20,20 @@ import pylab
 import time
 import logging
 import numpy as np
-import pandas as pd
 import seaborn as sns
 import matplotlib.patches as mpatches
 from matplotlib.collections import LineCollection
 
+from lithops.job.stats import JobStatsTable
+
 sns.set_style('whitegrid')
 pylab.switch_backend("Agg")
 logger = logging.getLogger(__name__)
 
 
 def create_timeline(fs, dst, figsize=(10, 6)):
-    stats = [f.stats for f in fs]
-    host_job_create_tstamp = min([cm['host_job_create_tstamp'] for cm in stats])
-
-    stats_df = pd.DataFrame(stats)
+    stats_df = JobStatsTable.from_futures(fs).to_pandas()
+    host_job_create_tstamp = stats_df.host_job_create_tstamp.min()
     total_calls = len(stats_df)
 
     palette = sns.color_palette("deep", 10)
@@ -101,50 +100,33 @@ def create_timeline(fs, dst, figsize=(10, 6)):
 
 
 def create_histogram(fs, dst, figsize=(10, 6)):
-    stats = [f.stats for f in fs]
-    host_job_create_tstamp = min([cm['host_job_create_tstamp'] for cm in stats])
+    stats_table = JobStatsTable.from_futures(fs)
+    tzero = np.nanmin(stats_table.column('host_job_create_tstamp'))
+    start_time = np.asarray(stats_table.column('worker_start_tstamp')) - tzero
+    end_time = np.asarray(stats_table.column('worker_end_tstamp')) - tzero
 
-    total_calls = len(stats)
-    max_seconds = int(max([cs['worker_end_tstamp'] - host_job_create_tstamp for cs in stats]) * 2.5)
+    total_calls = len(stats_table)
+    max_seconds = int(np.nanmax(end_time) * 2.5)
 
     runtime_bins = np.linspace(0, max_seconds, max_seconds)
 
-    def compute_times_rates(time_rates):
-        x = np.array(time_rates)
-        tzero = host_job_create_tstamp
-        start_time = x[:, 0] - tzero
-        end_time = x[:, 1] - tzero
-
-        N = len(start_time)
-
-        runtime_calls_hist = np.zeros((N, len(runtime_bins)))
-
-        for i in range(N):
-            s = start_time[i]
-            e = end_time[i]
-            a, b = np.searchsorted(runtime_bins, [s, e])
-            if b - a > 0:
-                runtime_calls_hist[i, a:b] = 1
-
-        return {'start_tstamp': start_time,
-                'end_tstamp': end_time,
-                'runtime_calls_hist': runtime_calls_hist}
+    # Active calls per bin: +1 at the start bin of each call and -1 at its end bin
+    start_bins, end_bins = np.searchsorted(runtime_bins, start_time), np.searchsorted(runtime_bins, end_time)
+    active_calls = np.zeros(len(runtime_bins) + 1)
+    np.add.at(active_calls, start_bins, 1)
+    np.add.at(active_calls, end_bins, -1)
+    active_calls = np.cumsum(active_calls)[:-1]
 
     fig = pylab.figure(figsize=figsize)
     ax = fig.add_subplot(1, 1, 1)
 
-    time_rates = [(cs['worker_start_tstamp'], cs['worker_end_tstamp']) for cs in stats]
-
-    time_hist = compute_times_rates(time_rates)
-
-    N = len(time_hist['start_tstamp'])
-    line_segments = LineCollection([[[time_hist['start_tstamp'][i], i],
-                                     [time_hist['end_tstamp'][i], i]] for i in range(N)],
-                                   linestyles='solid', color='k', alpha=0.6, linewidth=0.4)
+    segments = np.stack([np.column_stack([start_time, np.arange(total_calls)]),
+                         np.column_stack([end_time, np.arange(total_calls)])], axis=1)
+    line_segments = LineCollection(segments, linestyles='solid', color='k', alpha=0.6, linewidth=0.4)
 
     ax.add_collection(line_segments)
 
-    ax.plot(runtime_bins, time_hist['runtime_calls_hist'].sum(axis=0), label='Total Active Calls', zorder=-1)
+    ax.plot(runtime_bins, active_calls, label='Total Active Calls', zorder=-1)
 
     yplot_step = int(np.max([1, total_calls / 20]))
     y_ticks = np.arange(total_calls // yplot_step + 2) * yplot_step
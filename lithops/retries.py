@@ -15,8 +15,10 @@
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from lithops import FunctionExecutor
+from lithops.broadcast import Broadcast
 from lithops.future import ResponseFuture
 from lithops.storage.utils import CloudObject
+from lithops.storage.formats import PartitionFormat
 from lithops.wait import (
     ALL_COMPLETED,
     ALWAYS,
@@ -197,6 +199,16 @@ class RetryingFunctionExecutor:
         """
         self.executor.__exit__(exc_type, exc_value, traceback)
 
+    def broadcast(self, obj: Any) -> Broadcast:
+        """
+        Uploads an object once to share it across the calls. Delegates to the inner FunctionExecutor.
+
+        :param obj: The object to share
+
+        :return: A Broadcast handle of the object
+        """
+        return self.executor.broadcast(obj)
+
     def map(
         self,
         map_function: Callable,
@@ -208,6 +220,7 @@ class RetryingFunctionExecutor:
         obj_chunk_size: Optional[int] = None,
         obj_chunk_number: Optional[int] = None,
         obj_newline: Optional[str] = '\n',
+        obj_format: Optional[Union[str, PartitionFormat]] = None,
         timeout: Optional[int] = None,
         include_modules: Optional[List[str]] = [],
         exclude_modules: Optional[List[str]] = [],
@@ -225,6 +238,7 @@ class RetryingFunctionExecutor:
         :param obj_chunk_size: For file processing. Split each object into chunks of this size (in bytes).
         :param obj_chunk_number: For file processing. Number of chunks to split each object into.
         :param obj_newline: Newline character for line integrity in file partitioning.
+        :param obj_format: For file processing. Format of the objects to split them in partitions of whole records.
         :param timeout: Max time per function activation (in seconds).
         :param include_modules: Explicitly pickle these dependencies.
         :param exclude_modules: Explicitly exclude these modules from pickling.
@@ -249,6 +263,7 @@ class RetryingFunctionExecutor:
             obj_chunk_size=obj_chunk_size,
             obj_chunk_number=obj_chunk_number,
             obj_newline=obj_newline,
+            obj_format=obj_format,
             timeout=timeout,
             include_modules=include_modules,
             exclude_modules=exclude_modules,
@@ -266,6 +281,7 @@ class RetryingFunctionExecutor:
                 obj_chunk_size=obj_chunk_size,
                 obj_chunk_number=obj_chunk_number,
                 obj_newline=obj_newline,
+                obj_format=obj_format,
                 timeout=timeout,
                 include_modules=include_modules,
                 exclude_modules=exclude_modules,
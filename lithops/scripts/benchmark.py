@@ -0,0 +1,280 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Standard performance scenarios of the `lithops benchmark` command. Every
+scenario run is executed in a fresh process and reports the submit
+latency, the time to the first result, the makespan, the calls/sec, and
+the CPU time and peak RSS of the host process, so the results of
+different Lithops versions can be compared.
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import platform
+import statistics
+import traceback
+import multiprocessing as mp
+from collections import namedtuple
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from lithops.version import __version__
+from lithops.wait import ANY_COMPLETED, ALWAYS
+
+BENCHMARK_PREFIX = 'lithops.benchmark'
+BENCHMARK_SEED = 42
+MiB = 1024 ** 2
+
+Scenario = namedtuple('Scenario', ['func', 'params', 'description'])
+
+
+def _random_bytes(rand, size):
+    return rand.getrandbits(8 * size).to_bytes(size, 'little')
+
+
+# Functions run by the scenarios
+
+def noop(x):
+    return x
+
+
+def payload_size(payload):
+    return len(payload)
+
+
+def generate_result(size):
+    return _random_bytes(random.Random(BENCHMARK_SEED), size)
+
+
+def sum_results(results):
+    return sum(results)
+
+
+def count_lines(obj):
+    return obj.data_stream.read().count(b'\n')
+
+
+def echo_queue(in_queue, out_queue, round_trips):
+    for _ in range(round_trips):
+        out_queue.put(in_queue.get())
+
+
+# Measurement
+
+def _peak_rss():
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    return peak_rss if sys.platform == 'darwin' else peak_rss * 1024
+
+
+class Measurement:
+    """
+    Wall-clock marks of a scenario run, and the CPU time and peak RSS of
+    the host process
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.cpu_start = time.process_time()
+        self.marks = {}
+
+    def mark(self, name):
+        self.marks[name] = round(time.time() - self.start, 6)
+
+    def result(self, calls):
+        self.mark('makespan')
+        return {
+            'calls': calls,
+            **self.marks,
+            'calls_per_sec': round(calls / self.marks['makespan'], 3),
+            'host_cpu_time': round(time.process_time() - self.cpu_start, 6),
+            'host_peak_rss': _peak_rss()
+        }
+
+
+def _measure_map(fexec, map_function, iterdata, **map_kwargs):
+    measurement = Measurement()
+    fs = fexec.map(map_function, iterdata, **map_kwargs)
+    measurement.mark('submit_latency')
+    fexec.wait(fs, return_when=ANY_COMPLETED, download_results=True, show_progressbar=False)
+    measurement.mark('time_to_first_result')
+    fexec.get_result(fs, show_progressbar=False)
+    return measurement.result(len(fs))
+
+
+# Scenarios
+
+def noop_map(fexec, calls):
+    return _measure_map(fexec, noop, range(calls))
+
+
+def large_iterdata(fexec, calls, payload_mb):
+    rand = random.Random(BENCHMARK_SEED)
+    iterdata = [_random_bytes(rand, int(payload_mb * MiB)) for _ in range(calls)]
+    return _measure_map(fexec, payload_size, iterdata)
+
+
+def large_results(fexec, calls, result_mb):
+    return _measure_map(fexec, generate_result, [int(result_mb * MiB)] * calls)
+
+
+def map_reduce(fexec, calls):
+    measurement = Measurement()
+    fs = fexec.map_reduce(noop, range(calls), sum_results, spawn_reducer=ALWAYS)
+    measurement.mark('submit_latency')
+    fexec.wait(fs, return_when=ANY_COMPLETED, download_results=True, show_progressbar=False)
+    measurement.mark('time_to_first_result')
+    fexec.get_result(fs, show_progressbar=False)
+    return measurement.result(len(fs))
+
+
+def object_partitioning(fexec, object_mb, chunk_mb):
+    """
+    Generates a text object of random lines in the storage backend, and
+    counts its lines in chunks
+    """
+    storage = fexec.storage
+    bucket = fexec.config[fexec.config['lithops']['storage']]['storage_bucket']
+    key = f'{BENCHMARK_PREFIX}/{fexec.executor_id}/object.txt'
+
+    rand = random.Random(BENCHMARK_SEED)
+    with tempfile.NamedTemporaryFile(suffix='.txt') as tmp:
+        written = 0
+        while written < object_mb * MiB:
+            block = _random_bytes(rand, 4 * MiB).hex().encode()
+            block = b'\n'.join(block[i:i + 99] for i in range(0, len(block), 99)) + b'\n'
+            tmp.write(block)
+            written += len(block)
+        tmp.flush()
+        storage.upload_file(tmp.name, bucket, key)
+
+    try:
+        return _measure_map(fexec, count_lines, [f'{bucket}/{key}'], obj_chunk_size=int(chunk_mb * MiB))
+    finally:
+        storage.delete_object(bucket, key)
+
+
+def multiprocessing_pool(fexec, calls):
+    from lithops.multiprocessing import Pool, config as mp_config
+
+    mp_config.set_parameter(mp_config.LITHOPS_CONFIG, {'config': fexec.config})
+    measurement = Measurement()
+    with Pool() as pool:
+        result = pool.map_async(noop, range(calls))
+        measurement.mark('submit_latency')
+        result.get()
+    return measurement.result(calls)
+
+
+def multiprocessing_queue(fexec, round_trips):
+    from lithops.multiprocessing import Process, Queue, config as mp_config
+
+    mp_config.set_parameter(mp_config.LITHOPS_CONFIG, {'config': fexec.config})
+    in_queue, out_queue = Queue(), Queue()
+    measurement = Measurement()
+    process = Process(target=echo_queue, args=(in_queue, out_queue, round_trips))
+    process.start()
+    measurement.mark('submit_latency')
+    for i in range(round_trips):
+        in_queue.put(i)
+        out_queue.get()
+        if i == 0:
+            measurement.mark('time_to_first_result')
+    process.join()
+    return measurement.result(round_trips)
+
+
+SCENARIOS = {
+    'noop_map_1k': Scenario(noop_map, {'calls': 1000}, 'No-op map of 1k calls'),
+    'noop_map_10k': Scenario(noop_map, {'calls': 10000}, 'No-op map of 10k calls'),
+    'large_iterdata': Scenario(large_iterdata, {'calls': 100, 'payload_mb': 1}, 'Map over 100 inputs of 1MiB'),
+    'large_results': Scenario(large_results, {'calls': 50, 'result_mb': 4}, 'Map of 50 calls returning 4MiB each'),
+    'map_reduce': Scenario(map_reduce, {'calls': 1000}, 'No-op map_reduce of 1k map calls'),
+    'object_partitioning': Scenario(object_partitioning, {'object_mb': 2048, 'chunk_mb': 64},
+                                    'Line count of a generated 2GiB object in 64MiB chunks'),
+    'multiprocessing_pool': Scenario(multiprocessing_pool, {'calls': 100}, 'multiprocessing Pool.map of 100 calls'),
+    'multiprocessing_queue': Scenario(multiprocessing_queue, {'round_trips': 100},
+                                      'multiprocessing Queue round trips with a remote process')
+}
+
+# Params scaled by the --scale option
+SCALABLE_PARAMS = ('calls', 'payload_mb', 'result_mb', 'object_mb', 'round_trips')
+
+
+def scale_params(params, scale):
+    return {key: max(1, round(value * scale)) if key in SCALABLE_PARAMS else value
+            for key, value in params.items()}
+
+
+def run_scenario(name, params, executor_kwargs):
+    """
+    Runs a scenario once. It is called in a fresh process, so the peak RSS
+    of every run is independent
+    """
+    import lithops
+
+    try:
+        with lithops.FunctionExecutor(**executor_kwargs) as fexec:
+            return SCENARIOS[name].func(fexec, **params)
+    except Exception as e:
+        traceback.print_exc()
+        return {'error': f'{type(e).__name__}: {e}'}
+
+
+def run_benchmark(names, executor_kwargs, repeat=1, scale=1):
+    """
+    Runs the given scenarios and returns the results as a JSON-serializable
+    dict, with the metrics of every run and their medians
+    """
+    results = {
+        'lithops_version': __version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'backend': executor_kwargs.get('backend'),
+        'storage': executor_kwargs.get('storage'),
+        'repeat': repeat,
+        'scale': scale,
+        'scenarios': {}
+    }
+
+    for name in names:
+        params = scale_params(SCENARIOS[name].params, scale)
+        runs = []
+        for _ in range(repeat):
+            with ProcessPoolExecutor(1, mp_context=mp.get_context('spawn')) as ex:
+                runs.append(ex.submit(run_scenario, name, params, executor_kwargs).result())
+
+        ok_runs = [run for run in runs if 'error' not in run]
+        median = {}
+        if ok_runs:
+            median = {key: statistics.median(run[key] for run in ok_runs)
+                      for key, value in ok_runs[0].items() if value is not None}
+        results['scenarios'][name] = {'params': params, 'runs': runs, 'median': median}
+
+    return results
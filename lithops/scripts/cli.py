@@ -17,6 +17,7 @@
 
 
 import os
+import json
 import time
 import click
 import logging
@@ -59,7 +60,7 @@ from lithops.constants import (
 )
 from lithops.storage import InternalStorage
 from lithops.serverless import ServerlessHandler
-from lithops.storage.utils import clean_bucket
+from lithops.storage.utils import clean_bucket, status_key_suffix
 from lithops.standalone import StandaloneHandler
 from lithops.localhost import LocalhostHandler
 
@@ -453,15 +454,103 @@ def poll():
 
 @logs.command('get')
 @click.argument('job_key')
-def get_logs(job_key):
-    log_file = os.path.join(LOGS_DIR, job_key + '.log')
+@click.option('--call-id', '-i', default=None, help='get only the logs of this call')
+@click.option('--remote', '-r', is_flag=True, help='get the logs from the storage backend')
+@click.option('--config', '-c', default=None, help='path to yaml config file', type=click.Path(exists=True))
+@click.option('--storage', '-s', default=None, help='storage backend')
+def get_logs(job_key, call_id, remote, config, storage):
+    if not remote:
+        log_file = os.path.join(LOGS_DIR, job_key + '.log')
+
+        if not os.path.isfile(log_file):
+            print('The execution id: {} does not exists in logs'.format(job_key))
+            return
 
-    if not os.path.isfile(log_file):
-        print('The execution id: {} does not exists in logs'.format(job_key))
+        with open(log_file, 'r') as content_file:
+            print(content_file.read())
         return
 
-    with open(log_file, 'r') as content_file:
-        print(content_file.read())
+    config = load_yaml_config(config) if config else None
+    config_ow = set_config_ow(backend=None, storage=storage)
+    config = default_config(config_data=config, config_overwrite=config_ow)
+    internal_storage = InternalStorage(extract_storage_config(config))
+
+    executor_id, job_id = job_key.rsplit('-', 1)
+    if call_id:
+        call_ids = [call_id]
+    else:
+        prefix = '/'.join([JOBS_PREFIX, job_key]) + '/'
+        keys = internal_storage.storage.list_keys(internal_storage.bucket, prefix)
+        call_ids = sorted(k.split('/')[2] for k in keys if k.endswith(status_key_suffix))
+
+    if not call_ids:
+        print('The execution id: {} does not exists in the storage backend'.format(job_key))
+        return
+
+    for call_id in call_ids:
+        call_status = internal_storage.get_call_status(executor_id, job_id, call_id)
+        if call_status is None:
+            print('The call {} of the execution id {} does not exists'.format(call_id, job_key))
+            continue
+        call_logs = internal_storage.get_call_logs(call_status) or ''
+        print("Call: '{}' (Activation ID: {})\n[\n    {}\n]\n".format(
+            call_id, call_status.get('activation_id'),
+            call_logs.strip().replace('\n', '\n    ')))
+
+
+# /---------------------------------------------------------------------------/
+#
+# lithops benchmark
+#
+# /---------------------------------------------------------------------------/
+
+@click.group('benchmark')
+@click.pass_context
+def benchmark(ctx):
+    pass
+
+
+@benchmark.command('list')
+def list_benchmarks():
+    from lithops.scripts.benchmark import SCENARIOS
+
+    scenarios = [(name, scenario.description, scenario.params) for name, scenario in SCENARIOS.items()]
+    print(tabulate(scenarios, headers=['Scenario', 'Description', 'Params']))
+
+
+@benchmark.command('run')
+@click.argument('scenarios', nargs=-1)
+@click.option('--config', '-c', default=None, help='path to yaml config file', type=click.Path(exists=True))
+@click.option('--backend', '-b', default=LOCALHOST, help='compute backend')
+@click.option('--storage', '-s', default=LOCALHOST, help='storage backend')
+@click.option('--repeat', '-n', default=1, type=click.IntRange(min=1), help='number of runs of each scenario')
+@click.option('--scale', default=1.0, type=click.FloatRange(min=0, min_open=True),
+              help='factor applied to the number of calls and data sizes of the scenarios')
+@click.option('--output', '-o', default=None, help='write the JSON results to this file')
+@click.option('--debug', '-d', is_flag=True, help='debug mode')
+def run_benchmarks(scenarios, config, backend, storage, repeat, scale, output, debug):
+    from lithops.scripts.benchmark import SCENARIOS, run_benchmark
+
+    unknown = [name for name in scenarios if name not in SCENARIOS]
+    if unknown:
+        raise click.BadParameter(f'Unknown scenarios: {", ".join(unknown)}. '
+                                 'Run "lithops benchmark list" for the available ones')
+
+    log_level = logging.INFO if not debug else logging.DEBUG
+    setup_lithops_logger(log_level)
+
+    config = load_yaml_config(config) if config else None
+    executor_kwargs = {'config': config, 'backend': backend, 'storage': storage,
+                       'log_level': 'DEBUG' if debug else 'WARNING'}
+    results = run_benchmark(scenarios or list(SCENARIOS), executor_kwargs, repeat, scale)
+
+    results_json = json.dumps(results, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(results_json + '\n')
+        logger.info(f'Benchmark results written to {output}')
+    else:
+        print(results_json)
 
 
 # /---------------------------------------------------------------------------/
@@ -937,6 +1026,7 @@ lithops_cli.add_command(job)
 lithops_cli.add_command(worker)
 lithops_cli.add_command(logs)
 lithops_cli.add_command(storage)
+lithops_cli.add_command(benchmark)
 
 if __name__ == '__main__':
     lithops_cli()
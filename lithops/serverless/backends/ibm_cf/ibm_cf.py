@@ -15,6 +15,7 @@
 #
 
 import os
+import asyncio
 import logging
 from threading import Lock
 
@@ -296,6 +297,7 @@ class IBMCloudFunctionsBackend:
         Pre-invocation task. This is executed only once before the invocation
         """
         self._refresh_ow_client()
+        self._get_or_create_namespace()
 
     def invoke(self, docker_image_name, runtime_memory, payload):
         """
@@ -333,6 +335,28 @@ class IBMCloudFunctionsBackend:
 
         return activation_id
 
+    async def invoke_async(self, http_client, docker_image_name, runtime_memory, payload):
+        """
+        Async invoke -- return information about this invocation
+        """
+        if not self.namespace_id:
+            # Resolved in pre_invoke(). Its requests must not block the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self._get_or_create_namespace)
+        action_name = self._format_function_name(docker_image_name, runtime_memory)
+
+        activation_id = await self.cf_client.invoke_async(
+            http_client, self.package, action_name, payload
+        )
+
+        if activation_id in (401, 404):
+            # Token expired or runtime not deployed. Recover through the blocking path
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, self.invoke, docker_image_name, runtime_memory, payload
+            )
+
+        return activation_id
+
     def get_runtime_key(self, docker_image_name, runtime_memory, version=__version__):
         """
         Method that creates and returns the runtime key.
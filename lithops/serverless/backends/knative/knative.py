@@ -16,6 +16,7 @@
 
 import os
 import ssl
+import asyncio
 import json
 import time
 import yaml
@@ -42,6 +43,8 @@ urllib3.disable_warnings()
 
 logger = logging.getLogger(__name__)
 
+ASYNC_INVOKE_RETRIES = 3
+
 
 class KnativeServingBackend:
     """
@@ -79,6 +82,7 @@ class KnativeServingBackend:
 
         self.custom_api = client.CustomObjectsApi()
         self.core_api = client.CoreV1Api()
+        self.service_endpoints = {}
 
         if self.ingress_endpoint is None:
             if self.networking_layer == 'istio':
@@ -642,9 +646,9 @@ class KnativeServingBackend:
 
         return runtimes
 
-    def invoke(self, runtime_name, memory, payload, return_result=False):
+    def _get_service_endpoint(self, runtime_name, memory):
         """
-        Invoke -- return information about this invocation
+        Returns the endpoint and the headers to invoke a runtime
         """
         service_name = self._format_service_name(runtime_name, memory)
         if self.service_host_suffix:
@@ -663,6 +667,23 @@ class KnativeServingBackend:
         if 'codeengine' in endpoint:
             endpoint = endpoint.replace('http://', 'https://')
 
+        return endpoint, headers
+
+    def pre_invoke(self, runtime_name, memory):
+        """
+        Pre-invocation task. Resolves the endpoint of the runtime once, so that
+        the invocations do not request the Kubernetes API
+        """
+        if (runtime_name, memory) not in self.service_endpoints:
+            self.service_endpoints[(runtime_name, memory)] = self._get_service_endpoint(runtime_name, memory)
+
+    def invoke(self, runtime_name, memory, payload, return_result=False):
+        """
+        Invoke -- return information about this invocation
+        """
+        self.pre_invoke(runtime_name, memory)
+        endpoint, headers = self.service_endpoints[(runtime_name, memory)]
+
         exec_id = payload.get('executor_id')
         call_ids = payload.get('call_ids')
         job_id = payload.get('job_id')
@@ -707,6 +728,34 @@ class KnativeServingBackend:
             logger.debug('ExecutorID {} | JobID {} - Function call {} failed ({}). Retrying request'
                          .format(exec_id, job_id, ', '.join(call_ids), resp_status))
 
+    async def invoke_async(self, http_client, runtime_name, memory, payload):
+        """
+        Async invoke through a pooled HTTP client -- return information about this invocation
+        """
+        if (runtime_name, memory) not in self.service_endpoints:
+            # Resolved in pre_invoke(). Its requests must not block the event loop
+            self.service_endpoints[(runtime_name, memory)] = await asyncio.get_running_loop().run_in_executor(
+                None, self._get_service_endpoint, runtime_name, memory
+            )
+        endpoint, headers = self.service_endpoints[(runtime_name, memory)]
+        route = payload.get("service_route", '/')
+        url = endpoint.rstrip('/') + route
+        call_ids = ', '.join(payload.get('call_ids') or [])
+
+        for attempt in range(1, ASYNC_INVOKE_RETRIES + 1):
+            resp = await http_client.post(url, content=json.dumps(payload, default=str), headers=headers)
+
+            if resp.status_code in [200, 202]:
+                return resp.json()["activationId"]
+            elif resp.status_code == 404:
+                raise Exception("Lithops runtime is not deployed in your k8s cluster")
+            elif attempt < ASYNC_INVOKE_RETRIES:
+                logger.debug('ExecutorID {} | JobID {} - Function call {} failed ({}). Retrying request'
+                             .format(payload.get('executor_id'), payload.get('job_id'), call_ids, resp.status_code))
+                await asyncio.sleep(0.5 * attempt)
+
+        raise Exception(f'Function call {call_ids} failed ({resp.status_code}) after {ASYNC_INVOKE_RETRIES} attempts')
+
     def get_runtime_key(self, runtime_name, runtime_memory, version=__version__):
         """
         Method that creates and returns the runtime key.
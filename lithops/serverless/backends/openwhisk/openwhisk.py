@@ -215,6 +215,14 @@ class OpenWhiskBackend:
 
         return activation_id
 
+    async def invoke_async(self, http_client, docker_image_name, runtime_memory, payload):
+        """
+        Async invoke -- return information about this invocation
+        """
+        action_name = self._format_function_name(docker_image_name, runtime_memory)
+
+        return await self.cf_client.invoke_async(http_client, self.package, action_name, payload)
+
     def get_runtime_key(self, docker_image_name, runtime_memory, version=__version__):
         """
         Method that creates and returns the runtime key.
@@ -69,6 +69,22 @@ class ServerlessHandler:
 
         return self.backend.invoke(runtime_name, runtime_memory, job_payload)
 
+    def supports_async_invoke(self):
+        """
+        Returns True if the backend implements the invoke_async() hook
+        """
+        return hasattr(self.backend, 'invoke_async')
+
+    async def invoke_async(self, http_client, job_payload):
+        """
+        Async invoke through the provided HTTP client -- return information
+        about this invocation
+        """
+        runtime_name = job_payload['runtime_name']
+        runtime_memory = job_payload['runtime_memory']
+
+        return await self.backend.invoke_async(http_client, runtime_name, runtime_memory, job_payload)
+
     def build_runtime(self, runtime_name, file, extra_args=[]):
         """
         Wrapper method to build a new runtime for the compute backend.
@@ -50,12 +50,22 @@ from lithops.constants import (
 )
 from lithops.utils import (
     verify_runtime_name,
-    setup_lithops_logger
+    setup_lithops_logger,
+    iterchunks
 )
 from lithops.standalone.utils import (
     JobStatus,
     StandaloneMode,
     WorkerStatus,
+    WORKERS_INDEX,
+    JOBS_INDEX,
+    ACTIVE_JOBS_INDEX,
+    TASKS_DONE_CHANNEL,
+    WORKER_HEARTBEAT_INTERVAL,
+    REQUEUE_TASKS_LUA,
+    get_worker_type_index,
+    get_worker_heartbeat_key,
+    get_worker_inflight_key,
     get_host_setup_script,
     get_worker_setup_script,
     install_script_kwargs_from_config,
@@ -71,8 +81,11 @@ app = flask.Flask(__name__)
 
 MAX_INSTANCE_CREATE_RETRIES = 2
 JOB_MONITOR_CHECK_INTERVAL = 1
+JOB_MONITOR_RECONCILE_INTERVAL = 30
+TASKS_ENQUEUE_BATCH_SIZE = 1000
 
 redis_client = None
+requeue_tasks_script = None
 budget_keeper = None
 master_ip = None
 
@@ -81,36 +94,37 @@ master_ip = None
 # Workers
 # /---------------------------------------------------------------------------/
 
-def is_worker_free(worker_private_ip):
+def get_worker_ttd(worker_data, heartbeat):
     """
-    Checks if the Lithops service is ready and free in the worker VM instance
+    Gets the time to dismantle of a worker VM instance from its last heartbeat
     """
-    url = f"http://{worker_private_ip}:{SA_WORKER_SERVICE_PORT}/ping"
-    try:
-        r = requests.get(url, timeout=0.5)
-        resp = r.json()
-        logger.debug(f'Worker processes status from {worker_private_ip}: {resp}')
-        return True if resp.get('free', 0) > 0 else False
-    except Exception:
-        return False
+    if master_ip == worker_data['private_ip']:
+        return str(budget_keeper.get_time_to_dismantle())
+    if heartbeat is None:
+        return "Unknown"
+    return str(heartbeat['ttd'])
 
 
-def get_worker_ttd(worker_private_ip):
+def get_workers_heartbeats(workers):
     """
-    Checks if the Lithops service is ready and free in the worker VM instance
+    Gets the last heartbeat of the given workers in a single round trip.
+    Workers without a heartbeat, or whose heartbeat expired, get None.
     """
-    try:
-        if master_ip == worker_private_ip:
-            ttd = str(budget_keeper.get_time_to_dismantle())
-        else:
-            url = f"http://{worker_private_ip}:{SA_WORKER_SERVICE_PORT}/ttd"
-            r = requests.get(url, timeout=0.5)
-            ttd = r.text
-        logger.debug(f'Worker TTD from {worker_private_ip}: {ttd}')
-        return ttd
-    except Exception as e:
-        logger.error(f"Unable to get TTD from {worker_private_ip}: {e}")
-        return "Unknown"
+    pipe = redis_client.pipeline(transaction=False)
+    for worker_data in workers:
+        pipe.get(get_worker_heartbeat_key(worker_data['name']))
+    return [json.loads(heartbeat) if heartbeat else None for heartbeat in pipe.execute()]
+
+
+def get_workers_data(worker_names):
+    """
+    Gets the data of the given workers in a single round trip. Workers
+    already deleted are skipped.
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    for worker_name in worker_names:
+        pipe.hgetall(f"worker:{worker_name}")
+    return [worker_data for worker_data in pipe.execute() if worker_data]
 
 
 @app.route('/worker/list', methods=['GET'])
@@ -124,12 +138,10 @@ def list_workers():
 
     result = [['Worker Name', 'Created', 'Instance Type', 'Processes', 'Runtime', 'Mode', 'Status', 'TTD']]
 
-    def get_worker(worker):
-        worker_data = redis_client.hgetall(worker)
+    def get_worker(worker_data, heartbeat):
         name = worker_data['name']
         status = worker_data['status']
-        private_ip = worker_data['private_ip']
-        ttd = get_worker_ttd(private_ip)
+        ttd = get_worker_ttd(worker_data, heartbeat)
         ttd = ttd if ttd in ["Unknown", "Disabled"] else ttd + "s"
         timestamp = float(worker_data['created'])
         created = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
@@ -139,10 +151,9 @@ def list_workers():
         runtime = worker_data['runtime']
         result.append((name, created, instance_type, worker_processes, runtime, exec_mode, status, ttd))
 
-    workers = redis_client.keys('worker:*')
-    if workers:
-        with ThreadPoolExecutor(len(workers)) as ex:
-            ex.map(get_worker, workers)
+    workers = get_workers_data(redis_client.smembers(WORKERS_INDEX))
+    for worker_data, heartbeat in zip(workers, get_workers_heartbeats(workers)):
+        get_worker(worker_data, heartbeat)
 
     logger.debug(f"workers: {result}")
     return flask.jsonify(result)
@@ -151,13 +162,10 @@ def list_workers():
 @app.route('/worker/get', methods=['GET'])
 def get_workers():
     """
-    Returns the number of free workers
+    Returns the free workers, according to their last heartbeat
     """
     budget_keeper.last_usage_time = time.time()
 
-    workers = redis_client.keys('worker:*')
-    logger.debug(f'Getting workers - Total workers: {len(workers)}')
-
     payload = flask.request.get_json(force=True, silent=True)
     if payload and not isinstance(payload, dict):
         return error('The action did not receive a dictionary as an argument.')
@@ -166,22 +174,16 @@ def get_workers():
     worker_processes = payload['worker_processes']
     runtime_name = payload['runtime_name']
 
-    active_workers = []
-
-    for worker in workers:
-        worker_data = redis_client.hgetall(worker)
-        if worker_data['instance_type'] == worker_instance_type \
-           and worker_data['runtime'] == runtime_name \
-           and int(worker_data['worker_processes']) == int(worker_processes):
-            active_workers.append(worker_data)
+    worker_type_index = get_worker_type_index(worker_instance_type, worker_processes, runtime_name)
+    active_workers = get_workers_data(redis_client.smembers(worker_type_index))
 
     worker_type = f'{worker_instance_type}-{worker_processes}-{runtime_name}'
     logger.debug(f'Workers for {worker_type}: {len(active_workers)}')
 
     free_workers = []
 
-    def check_worker(worker_data):
-        if is_worker_free(worker_data['private_ip']):
+    for worker_data, heartbeat in zip(active_workers, get_workers_heartbeats(active_workers)):
+        if heartbeat and heartbeat.get('free', 0) > 0:
             free_workers.append(
                 (
                     worker_data['name'],
@@ -193,10 +195,6 @@ def get_workers():
                 )
             )
 
-    if active_workers:
-        with ThreadPoolExecutor(len(active_workers)) as ex:
-            ex.map(check_worker, active_workers)
-
     logger.debug(f'Free workers for {worker_type}: {len(free_workers)}')
 
     response = flask.jsonify(free_workers)
@@ -205,6 +203,41 @@ def get_workers():
     return response
 
 
+def worker_monitor():
+    """
+    Marks as unresponsive the active workers whose heartbeat expired, and
+    puts back the tasks they had claimed to their work queue. Unresponsive
+    workers whose heartbeat resumes are marked as active again.
+    """
+    logger.info("Starting worker monitoring thread")
+
+    monitored_status = (WorkerStatus.ACTIVE.value, WorkerStatus.UNRESPONSIVE.value)
+
+    while True:
+        time.sleep(WORKER_HEARTBEAT_INTERVAL)
+        try:
+            workers = [
+                worker_data for worker_data in get_workers_data(redis_client.smembers(WORKERS_INDEX))
+                if worker_data['status'] in monitored_status
+            ]
+            for worker_data, heartbeat in zip(workers, get_workers_heartbeats(workers)):
+                worker_name = worker_data['name']
+                if heartbeat is not None:
+                    if worker_data['status'] == WorkerStatus.UNRESPONSIVE.value:
+                        logger.info(f'Worker {worker_name} heartbeat resumed, marking it as active')
+                        redis_client.hset(f"worker:{worker_name}", 'status', WorkerStatus.ACTIVE.value)
+                    continue
+                if worker_data['status'] == WorkerStatus.UNRESPONSIVE.value:
+                    continue
+                logger.warning(f'Worker {worker_name} heartbeat expired, marking it as unresponsive')
+                redis_client.hset(f"worker:{worker_name}", 'status', WorkerStatus.UNRESPONSIVE.value)
+                total = requeue_tasks_script(keys=[get_worker_inflight_key(worker_name), worker_data['queue_name']])
+                if total:
+                    logger.debug(f"Requeued {total} in-flight tasks of {worker_name} to {worker_data['queue_name']}")
+        except Exception as e:
+            logger.error(e)
+
+
 def _redis_field(value):
     """
     Redis hash values must be bytes, str, int, or float.
@@ -226,8 +259,12 @@ def save_worker(worker, standalone_config, work_queue_name):
 
     worker_processes = CPU_COUNT if worker.config['worker_processes'] == 'AUTO' \
         else worker.config['worker_processes']
+    worker_type_index = get_worker_type_index(
+        worker.instance_type, worker_processes, standalone_config['runtime']
+    )
 
-    redis_client.hset(f"worker:{worker.name}", mapping={
+    pipe = redis_client.pipeline()
+    pipe.hset(f"worker:{worker.name}", mapping={
         'name': worker.name,
         'status': WorkerStatus.STARTING.value,
         'private_ip': worker.private_ip or '',
@@ -237,8 +274,12 @@ def save_worker(worker, standalone_config, work_queue_name):
         'created': str(time.time()),
         'ssh_credentials': json.dumps(worker.ssh_credentials),
         'queue_name': work_queue_name,
+        'type_index': worker_type_index,
         'err': "", **config,
     })
+    pipe.sadd(WORKERS_INDEX, worker.name)
+    pipe.sadd(worker_type_index, worker.name)
+    pipe.execute()
 
 
 def setup_worker_create_reuse(standalone_handler, worker_info, work_queue_name):
@@ -444,25 +485,26 @@ def cancel_job_process(job_key_list):
 
         tmp_queue = []
         while redis_client.llen(queue_name) > 0:
-            task_payload_json = redis_client.rpop(queue_name)
-            task_payload = json.loads(task_payload_json)
-            if task_payload['job_key'] != job_key:
-                tmp_queue.append(task_payload_json)
+            task_str = redis_client.rpop(queue_name)
+            task_job_key, first_call_id, last_call_id = json.loads(task_str)
+            if task_job_key != job_key:
+                tmp_queue.append(task_str)
 
-        for task_payload_json in tmp_queue:
-            redis_client.lpush(queue_name, task_payload_json)
+        for task_str in tmp_queue:
+            redis_client.lpush(queue_name, task_str)
 
-        def stop_task(worker):
-            worker_data = redis_client.hgetall(worker)
+        def stop_task(worker_data):
             url = f"http://{worker_data['private_ip']}:{SA_WORKER_SERVICE_PORT}/stop/{job_key}"
             requests.post(url, timeout=0.5)
 
         # Send stop signal to all workers
-        workers = redis_client.keys('worker:*')
-        with ThreadPoolExecutor(len(workers)) as ex:
-            ex.map(stop_task, workers)
+        workers = get_workers_data(redis_client.smembers(WORKERS_INDEX))
+        if workers:
+            with ThreadPoolExecutor(len(workers)) as ex:
+                ex.map(stop_task, workers)
 
         Path(os.path.join(JOBS_DIR, job_key + '.done')).touch()
+        redis_client.zrem(ACTIVE_JOBS_INDEX, job_key)
         if redis_client.hget(f"job:{job_key}", 'status') != JobStatus.DONE.value:
             redis_client.hset(f"job:{job_key}", 'status', JobStatus.CANCELED.value)
 
@@ -491,8 +533,15 @@ def list_jobs():
 
     result = [['Job ID', 'Function Name', 'Submitted', 'Worker Type', 'Runtime', 'Tasks Done', 'Job Status']]
 
-    for job_job_key in redis_client.keys('job:*'):
-        job_data = redis_client.hgetall(job_job_key)
+    job_fields = ['job_key', 'exec_mode', 'status', 'func_name', 'submitted',
+                  'runtime_name', 'worker_type', 'total_tasks', 'done_tasks']
+
+    pipe = redis_client.pipeline(transaction=False)
+    for job_key in redis_client.zrange(JOBS_INDEX, 0, -1):
+        pipe.hmget(f"job:{job_key}", job_fields)
+
+    for job_values in pipe.execute():
+        job_data = dict(zip(job_fields, job_values))
         job_key = job_data['job_key']
         exec_mode = job_data['exec_mode']
         status = job_data['status']
@@ -502,7 +551,7 @@ def list_jobs():
         worker_type = job_data['worker_type'] if exec_mode != StandaloneMode.CONSUME.value else 'VM'
         submitted = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S UTC')
         total_tasks = str(job_data['total_tasks'])
-        done_tasks = str(redis_client.llen(f'tasksdone:{job_key}'))
+        done_tasks = str(job_data['done_tasks'])
         job = (job_key, func_name, submitted, worker_type, runtime, f'{done_tasks}/{total_tasks}', status)
         result.append(job)
 
@@ -513,11 +562,19 @@ def list_jobs():
 def handle_job(job_payload, queue_name):
     """
     Process responsible to put the job in redis and all the
-    individual tasks in a work queue
+    individual tasks in a work queue.
+
+    The job payload is stored once in the job hash, and the tasks are
+    enqueued as small [job_key, first_call_id, last_call_id] descriptors,
+    one per chunk of calls.
     """
     job_key = job_payload['job_key']
+    call_ids = job_payload['call_ids']
+    chunksize = job_payload.get('chunksize') or 1
+    job_body = {key: value for key, value in job_payload.items() if key != 'call_ids'}
 
-    redis_client.hset(f"job:{job_key}", mapping={
+    pipe = redis_client.pipeline()
+    pipe.hset(f"job:{job_key}", mapping={
         'job_key': job_key,
         'status': JobStatus.SUBMITTED.value,
         'submitted': job_payload['host_submit_tstamp'],
@@ -525,18 +582,27 @@ def handle_job(job_payload, queue_name):
         'worker_type': job_payload.get('worker_instance_type', 'VM'),
         'runtime_name': job_payload['runtime_name'],
         'exec_mode': job_payload['config']['standalone']['exec_mode'],
-        'total_tasks': len(job_payload['call_ids']),
-        'queue_name': queue_name
+        'total_tasks': len(call_ids),
+        'done_tasks': 0,
+        'queue_name': queue_name,
+        'payload': json.dumps(job_body)
     })
+    pipe.zadd(JOBS_INDEX, {job_key: job_payload['host_submit_tstamp']})
+    pipe.zadd(ACTIVE_JOBS_INDEX, {job_key: job_payload['host_submit_tstamp']})
+    pipe.execute()
+
+    tasks = [
+        json.dumps([job_key, int(call_ids_chunk[0]), int(call_ids_chunk[-1])])
+        for call_ids_chunk in iterchunks(call_ids, chunksize)
+    ]
 
-    dbr = job_payload['data_byte_ranges']
-    for call_id in job_payload['call_ids']:
-        task_payload = copy.deepcopy(job_payload)
-        task_payload['call_ids'] = [call_id]
-        task_payload['data_byte_ranges'] = [dbr[int(call_id)]]
-        redis_client.lpush(queue_name, json.dumps(task_payload))
+    pipe = redis_client.pipeline(transaction=False)
+    for tasks_chunk in iterchunks(tasks, TASKS_ENQUEUE_BATCH_SIZE):
+        pipe.lpush(queue_name, *tasks_chunk)
+    pipe.execute()
 
-    logger.debug(f"Job {job_key} correctly submitted to work queue '{queue_name}'")
+    logger.debug(f"Job {job_key} correctly submitted to work queue "
+                 f"'{queue_name}' - Total tasks: {len(tasks)}")
 
 
 @app.route('/job/run', methods=['POST'])
@@ -582,31 +648,64 @@ def run():
     return response
 
 
+def update_jobs_progress(job_keys, jobs_done):
+    """
+    Updates the tasks done of the given jobs. Jobs with all their tasks
+    done are marked as completed and leave the active jobs index.
+    """
+    job_keys = list(job_keys)
+    pipe = redis_client.pipeline(transaction=False)
+    for job_key in job_keys:
+        pipe.hmget(f"job:{job_key}", ['total_tasks', 'done_tasks'])
+
+    for job_key, (total_tasks, done_tasks) in zip(job_keys, pipe.execute()):
+        if total_tasks is None:
+            redis_client.zrem(ACTIVE_JOBS_INDEX, job_key)
+            continue
+        total_tasks = int(total_tasks)
+        done_tasks = int(done_tasks or 0)
+        if job_key not in jobs_done and done_tasks < total_tasks:
+            budget_keeper.add_job(job_key)
+        if jobs_done.get(job_key) == done_tasks:
+            continue
+        jobs_done[job_key] = done_tasks
+        exec_id, job_id = job_key.rsplit('-', 1)
+        msg = f"ExecutorID: {exec_id} | JObID: {job_id} - Tasks done: {done_tasks}/{total_tasks}"
+        if done_tasks >= total_tasks:
+            Path(os.path.join(JOBS_DIR, f'{job_key}.done')).touch()
+            redis_client.zrem(ACTIVE_JOBS_INDEX, job_key)
+            del jobs_done[job_key]
+            msg += " - Completed!"
+        logger.debug(msg)
+
+
 def job_monitor():
+    """
+    Follows the progress of the active jobs from the task completion events
+    published by the workers. The whole active jobs index is periodically
+    reconciled as well, in case some event was missed.
+    """
     logger.info("Starting job monitoring thread")
 
-    jobs_data = {}
+    jobs_done = {}
+    last_reconcile = 0
+
+    pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(TASKS_DONE_CHANNEL)
 
     while True:
-        time.sleep(JOB_MONITOR_CHECK_INTERVAL)
-        for job_job_key in redis_client.keys('job:*'):
-            job_key = job_job_key.replace("job:", "")
-            if job_key not in jobs_data:
-                budget_keeper.add_job(job_key)
-                job_data = redis_client.hgetall(job_job_key)
-                jobs_data[job_key] = {'total': int(job_data['total_tasks']), 'done': 0}
-            if jobs_data[job_key]['total'] == jobs_data[job_key]['done']:
-                continue
-            done_tasks = int(redis_client.llen(f"tasksdone:{job_key}"))
-            if jobs_data[job_key]['done'] != done_tasks:
-                total_tasks = jobs_data[job_key]['total']
-                jobs_data[job_key]['done'] = done_tasks
-                exec_id, job_id = job_key.rsplit('-', 1)
-                msg = f"ExecutorID: {exec_id} | JObID: {job_id} - Tasks done: {done_tasks}/{total_tasks}"
-                if jobs_data[job_key]['total'] == jobs_data[job_key]['done']:
-                    Path(os.path.join(JOBS_DIR, f'{job_key}.done')).touch()
-                    msg += " - Completed!"
-                logger.debug(msg)
+        job_keys = set()
+        message = pubsub.get_message(timeout=JOB_MONITOR_CHECK_INTERVAL)
+        while message:
+            job_keys.add(message['data'])
+            message = pubsub.get_message()
+
+        if time.time() - last_reconcile > JOB_MONITOR_RECONCILE_INTERVAL:
+            job_keys.update(redis_client.zrange(ACTIVE_JOBS_INDEX, 0, -1))
+            last_reconcile = time.time()
+
+        if job_keys:
+            update_jobs_progress(job_keys, jobs_done)
 
 
 # /---------------------------------------------------------------------------/
@@ -660,6 +759,7 @@ def get_metadata():
 
 def main():
     global redis_client
+    global requeue_tasks_script
     global budget_keeper
     global master_ip
 
@@ -676,8 +776,10 @@ def main():
     budget_keeper.start()
 
     redis_client = redis.Redis(decode_responses=True)
+    requeue_tasks_script = redis_client.register_script(REQUEUE_TASKS_LUA)
 
     Thread(target=job_monitor, daemon=True).start()
+    Thread(target=worker_monitor, daemon=True).start()
 
     server = WSGIServer(('0.0.0.0', SA_MASTER_SERVICE_PORT), app, log=app.logger)
     server.serve_forever()
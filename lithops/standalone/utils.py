@@ -58,6 +58,7 @@ class WorkerStatus(Enum):
     IDLE = "idle"
     BUSY = "busy"
     STOPPED = "stopped"
+    UNRESPONSIVE = "unresponsive"
 
 
 class JobStatus(Enum):
@@ -72,6 +73,48 @@ class LithopsValidationError(Exception):
     pass
 
 
+# Redis indexes maintained by the master and the workers, so that
+# listing workers and jobs never requires scanning the whole keyspace
+WORKERS_INDEX = 'workers'  # set of all the worker names
+JOBS_INDEX = 'jobs'  # sorted set of all the job keys, by submission time
+ACTIVE_JOBS_INDEX = 'jobs:active'  # sorted set of the not finished job keys
+TASKS_DONE_CHANNEL = 'tasksdone'  # pub/sub channel of task completion events
+
+# Seconds between worker heartbeats, and seconds after which a worker
+# without heartbeats is considered unresponsive
+WORKER_HEARTBEAT_INTERVAL = 5
+WORKER_HEARTBEAT_TTL = 3 * WORKER_HEARTBEAT_INTERVAL
+
+# Moves back all the tasks of an in-flight list (KEYS[1]) to the head
+# of a work queue (KEYS[2])
+REQUEUE_TASKS_LUA = """
+local total = 0
+local task = redis.call('LPOP', KEYS[1])
+while task do
+    redis.call('RPUSH', KEYS[2], task)
+    total = total + 1
+    task = redis.call('LPOP', KEYS[1])
+end
+return total
+"""
+
+
+def get_worker_type_index(instance_type, worker_processes, runtime_name):
+    """
+    Name of the set of workers of the same instance type, number of
+    worker processes and runtime
+    """
+    return f'workers:{instance_type}-{worker_processes}-{runtime_name}'
+
+
+def get_worker_heartbeat_key(worker_name):
+    return f'heartbeat:{worker_name}'
+
+
+def get_worker_inflight_key(worker_name):
+    return f'inflight:{worker_name}'
+
+
 MASTER_SERVICE_NAME = 'lithops-master.service'
 MASTER_SERVICE_FILE = f"""
 [Unit]
@@ -16,6 +16,7 @@
 #
 
 import os
+import time
 import json
 import redis
 import flask
@@ -24,13 +25,25 @@ import signal
 import subprocess as sp
 from pathlib import Path
 from threading import Thread
+from collections import deque
 from functools import partial
 from gevent.pywsgi import WSGIServer
 from concurrent.futures import ThreadPoolExecutor
 
 from lithops.utils import setup_lithops_logger
 from lithops.standalone.keeper import BudgetKeeper
-from lithops.standalone.utils import JobStatus, StandaloneMode, WorkerStatus
+from lithops.standalone.utils import (
+    JobStatus,
+    StandaloneMode,
+    WorkerStatus,
+    WORKERS_INDEX,
+    TASKS_DONE_CHANNEL,
+    WORKER_HEARTBEAT_INTERVAL,
+    WORKER_HEARTBEAT_TTL,
+    REQUEUE_TASKS_LUA,
+    get_worker_heartbeat_key,
+    get_worker_inflight_key
+)
 from lithops.constants import (
     CPU_COUNT,
     LITHOPS_TEMP_DIR,
@@ -61,23 +74,70 @@ job_processes = {}
 worker_threads = {}
 canceled = []
 
+# Job payloads already fetched from redis, by job key
+job_payloads = {}
+MAX_CACHED_JOB_PAYLOADS = 100
+
+# Maximum number of tasks claimed at once by a consumer, and seconds of
+# work (according to the observed task duration) to claim at once
+MAX_PREFETCH_TASKS = 16
+PREFETCH_TIME = 2
+
+# Moves up to ARGV[1] tasks from the work queue to the in-flight list
+CLAIM_TASKS_LUA = """
+local tasks = {}
+for i = 1, tonumber(ARGV[1]) do
+    local task = redis.call('RPOP', KEYS[1])
+    if not task then
+        break
+    end
+    redis.call('LPUSH', KEYS[2], task)
+    tasks[#tasks + 1] = task
+end
+return tasks
+"""
+
+# Removes a task (ARGV[1]) from the in-flight list (KEYS[1]) and, only if
+# it was there, adds its ARGV[2] calls to the done tasks of the job hash
+# (KEYS[2]), setting the job status to ARGV[3] when all of them are done.
+# A task requeued by the master is counted by the worker that runs it next.
+TASK_DONE_LUA = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+local done_tasks = redis.call('HINCRBY', KEYS[2], 'done_tasks', ARGV[2])
+local total_tasks = tonumber(redis.call('HGET', KEYS[2], 'total_tasks'))
+if total_tasks and done_tasks >= total_tasks then
+    redis.call('HSET', KEYS[2], 'status', ARGV[3])
+end
+return 1
+"""
+
+claim_tasks_script = None
+requeue_tasks_script = None
+task_done_script = None
+
+
+def get_processes_status():
+    idle_count = sum(1 for worker in worker_threads.values() if worker.get('status') == WorkerStatus.IDLE.value)
+    busy_count = sum(1 for worker in worker_threads.values() if worker.get('status') == WorkerStatus.BUSY.value)
+    return {'busy': busy_count, 'free': idle_count}
+
+
+def get_ttd():
+    return budget_keeper.get_time_to_dismantle() if budget_keeper else "Disabled"
+
 
 @app.route('/ping', methods=['GET'])
 def ping():
-    idle_count = sum(1 for worker in worker_threads.values() if worker['status'] == WorkerStatus.IDLE.value)
-    busy_count = sum(1 for worker in worker_threads.values() if worker['status'] == WorkerStatus.BUSY.value)
-    response = flask.jsonify({'busy': busy_count, 'free': idle_count})
+    response = flask.jsonify(get_processes_status())
     response.status_code = 200
     return response
 
 
 @app.route('/ttd', methods=['GET'])
 def ttd():
-    if budget_keeper:
-        ttd = budget_keeper.get_time_to_dismantle()
-    else:
-        ttd = "Disabled"
-    return str(ttd), 200
+    return str(get_ttd()), 200
 
 
 @app.route('/stop/<job_key>', methods=['POST'])
@@ -99,6 +159,25 @@ def stop(job_key):
     return response
 
 
+def send_heartbeat(worker_name):
+    """
+    Publishes the free/busy processes and the time to dismantle of this
+    worker. The heartbeat expires if the worker stops sending them.
+    """
+    heartbeat = {**get_processes_status(), 'ttd': get_ttd(), 'tstamp': time.time()}
+    try:
+        redis_client.set(get_worker_heartbeat_key(worker_name),
+                         json.dumps(heartbeat), ex=WORKER_HEARTBEAT_TTL)
+    except Exception as e:
+        logger.error(e)
+
+
+def send_heartbeats(worker_name):
+    while True:
+        time.sleep(WORKER_HEARTBEAT_INTERVAL)
+        send_heartbeat(worker_name)
+
+
 def notify_worker_active(worker_name):
     try:
         redis_client.hset(f"worker:{worker_name}", 'status', WorkerStatus.ACTIVE.value)
@@ -109,99 +188,225 @@ def notify_worker_active(worker_name):
 def notify_worker_idle(worker_name):
     try:
         data = {'status': WorkerStatus.IDLE.value, 'runtime': '', 'worker_processes': ''}
-        redis_client.hset(f"worker:{worker_name}", mapping=data)
+        type_index = redis_client.hget(f"worker:{worker_name}", 'type_index')
+        pipe = redis_client.pipeline()
+        pipe.hset(f"worker:{worker_name}", mapping=data)
+        pipe.delete(get_worker_heartbeat_key(worker_name))
+        if type_index:
+            pipe.srem(type_index, worker_name)
+        pipe.execute()
     except Exception as e:
         logger.error(e)
 
 
 def notify_worker_stop(worker_name):
     try:
-        redis_client.hset(f"worker:{worker_name}", 'status', WorkerStatus.STOPPED.value)
+        pipe = redis_client.pipeline()
+        pipe.hset(f"worker:{worker_name}", 'status', WorkerStatus.STOPPED.value)
+        pipe.delete(get_worker_heartbeat_key(worker_name))
+        pipe.execute()
     except Exception as e:
         logger.error(e)
 
 
 def notify_worker_delete(worker_name):
     try:
-        redis_client.delete(f"worker:{worker_name}")
+        type_index = redis_client.hget(f"worker:{worker_name}", 'type_index')
+        pipe = redis_client.pipeline()
+        pipe.delete(f"worker:{worker_name}")
+        pipe.delete(get_worker_heartbeat_key(worker_name))
+        pipe.srem(WORKERS_INDEX, worker_name)
+        if type_index:
+            pipe.srem(type_index, worker_name)
+        pipe.execute()
     except Exception as e:
         logger.error(e)
 
 
-def notify_task_start(job_key, call_id):
+def notify_tasks_start(job_keys):
+    """
+    Sets as running the submitted jobs of a batch of claimed tasks
+    """
     try:
-        if redis_client.hget(f"job:{job_key}", 'status') == JobStatus.SUBMITTED.value:
-            redis_client.hset(f"job:{job_key}", 'status', JobStatus.RUNNING.value)
+        job_keys = list(job_keys)
+        pipe = redis_client.pipeline(transaction=False)
+        for job_key in job_keys:
+            pipe.hget(f"job:{job_key}", 'status')
+        statuses = pipe.execute()
+
+        for job_key, status in zip(job_keys, statuses):
+            if status == JobStatus.SUBMITTED.value:
+                pipe.hset(f"job:{job_key}", 'status', JobStatus.RUNNING.value)
+        pipe.execute()
     except Exception as e:
         logger.error(e)
 
 
-def notify_task_done(job_key, call_id):
+def notify_task_done(job_key, call_ids, task_str, inflight_queue_name):
+    """
+    Atomically removes the task from the in-flight list and marks its calls
+    as done, and notifies the master. The calls are not counted if the task
+    is no longer in the in-flight list, as the master requeued it.
+    """
     try:
-        done_tasks = int(redis_client.rpush(f"tasksdone:{job_key}", call_id))
-        if int(redis_client.hget(f"job:{job_key}", 'total_tasks')) == done_tasks:
-            redis_client.hset(f"job:{job_key}", 'status', JobStatus.DONE.value)
+        counted = task_done_script(
+            keys=[inflight_queue_name, f"job:{job_key}"],
+            args=[task_str, len(call_ids), JobStatus.DONE.value]
+        )
+        if counted:
+            redis_client.publish(TASKS_DONE_CHANNEL, job_key)
+        else:
+            logger.debug(f'Task of job {job_key} already requeued, not counting it as done')
     except Exception as e:
         logger.error(e)
 
 
-def redis_queue_consumer(pid, work_queue_name, exec_mode, backend):
-    worker_threads[pid]['status'] = WorkerStatus.IDLE.value
+def claim_tasks(work_queue_name, inflight_queue_name, count, block):
+    """
+    Atomically moves up to `count` tasks from the work queue to the
+    in-flight list of this worker. If block is True and the work queue
+    is empty, waits for a task.
+    """
+    tasks = claim_tasks_script(keys=[work_queue_name, inflight_queue_name], args=[count])
 
-    logger.info(f"Redis consumer process {pid} started")
+    if not tasks and block:
+        task_str = redis_client.brpoplpush(work_queue_name, inflight_queue_name, timeout=0)
+        tasks = [task_str] if task_str else []
 
-    while True:
-        if exec_mode == StandaloneMode.CREATE.value:
-            task_payload_str = redis_client.rpop(work_queue_name)
-            if task_payload_str is None:
-                break
-        else:
-            key, task_payload_str = redis_client.brpop(work_queue_name)
+    return tasks
 
-        worker_threads[pid]['status'] = WorkerStatus.BUSY.value
 
-        task_payload = json.loads(task_payload_str)
+def requeue_inflight_tasks(inflight_queue_name, work_queue_name):
+    """
+    Puts back to the head of the work queue the tasks claimed and not
+    finished by a previous run of this worker
+    """
+    try:
+        total = requeue_tasks_script(keys=[inflight_queue_name, work_queue_name])
+        if total:
+            logger.info(f'Requeued {total} in-flight tasks to {work_queue_name}')
+    except Exception as e:
+        logger.error(e)
+
 
-        executor_id = task_payload['executor_id']
-        job_id = task_payload['job_id']
-        job_key = task_payload['job_key']
-        call_id = task_payload['call_ids'][0]
-        job_key_call_id = f'{job_key}-{call_id}'
+def get_prefetch_size(avg_task_duration):
+    """
+    Number of tasks to claim at once, so that a consumer does not hold
+    more than PREFETCH_TIME seconds of work
+    """
+    if not avg_task_duration:
+        return 1
+    return max(1, min(MAX_PREFETCH_TASKS, int(PREFETCH_TIME / avg_task_duration)))
 
-        try:
-            logger.debug(f'ExecutorID {executor_id} | JobID {job_id} - Running '
-                         f'CallID {call_id} in the local worker (consumer {pid})')
-            notify_task_start(job_key, call_id)
 
-            if budget_keeper:
-                budget_keeper.add_job(job_key_call_id)
+def get_job_payload(job_key):
+    """
+    Gets the job payload stored by the master, only once per job
+    """
+    if job_key not in job_payloads:
+        job_payload = json.loads(redis_client.hget(f"job:{job_key}", 'payload'))
+        if len(job_payloads) >= MAX_CACHED_JOB_PAYLOADS:
+            job_payloads.pop(next(iter(job_payloads)))
+        job_payloads[job_key] = job_payload
+
+    return job_payloads[job_key]
+
 
-            task_filename = os.path.join(JOBS_DIR, f'{job_key_call_id}.task')
+def create_task_payload(task_str):
+    """
+    Builds the payload of a task from its [job_key, first_call_id, last_call_id]
+    descriptor and the job payload
+    """
+    job_key, first_call_id, last_call_id = json.loads(task_str)
+    task_payload = dict(get_job_payload(job_key))
 
-            with open(task_filename, 'w') as jl:
-                json.dump(task_payload, jl, default=str)
+    call_ids = ["{:05d}".format(i) for i in range(first_call_id, last_call_id + 1)]
+    dbr = task_payload['data_byte_ranges']
+    task_payload['call_ids'] = call_ids
+    task_payload['data_byte_ranges'] = [dbr[int(call_id)] for call_id in call_ids]
 
-            cmd = ["python3", f"{SA_INSTALL_DIR}/runner.py", backend, task_filename]
-            log = open(RN_LOG_FILE, 'a')
-            process = sp.Popen(cmd, stdout=log, stderr=log, start_new_session=True)
-            job_processes[job_key_call_id] = process
-            process.communicate()  # blocks until the process finishes
-            del job_processes[job_key_call_id]
+    return task_payload
 
-            if os.path.exists(task_filename):
-                os.remove(task_filename)
 
-            Path(os.path.join(JOBS_DIR, f'{job_key_call_id}.done')).touch()
+def run_task(pid, task_payload, backend):
+    """
+    Runs a task in a separate runner process
+    """
+    executor_id = task_payload['executor_id']
+    job_id = task_payload['job_id']
+    job_key = task_payload['job_key']
+    call_ids = task_payload['call_ids']
+    call_id = call_ids[0] if len(call_ids) == 1 else f'{call_ids[0]}-{call_ids[-1]}'
+    job_key_call_id = f'{job_key}-{call_id}'
+
+    logger.debug(f'ExecutorID {executor_id} | JobID {job_id} - Running '
+                 f'CallID {call_id} in the local worker (consumer {pid})')
+
+    if budget_keeper:
+        budget_keeper.add_job(job_key_call_id)
+
+    task_filename = os.path.join(JOBS_DIR, f'{job_key_call_id}.task')
+
+    with open(task_filename, 'w') as jl:
+        json.dump(task_payload, jl, default=str)
+
+    cmd = ["python3", f"{SA_INSTALL_DIR}/runner.py", backend, task_filename]
+    with open(RN_LOG_FILE, 'a') as log:
+        process = sp.Popen(cmd, stdout=log, stderr=log, start_new_session=True)
+        job_processes[job_key_call_id] = process
+        process.communicate()  # blocks until the process finishes
+        del job_processes[job_key_call_id]
+
+    if os.path.exists(task_filename):
+        os.remove(task_filename)
+
+    Path(os.path.join(JOBS_DIR, f'{job_key_call_id}.done')).touch()
+
+    msg = f'ExecutorID {executor_id} | JobID {job_id} - CallID {call_id} execution '
+    logger.debug(msg + ('canceled' if job_key in canceled else 'finished'))
+
+
+def redis_queue_consumer(pid, work_queue_name, inflight_queue_name, exec_mode, backend):
+    worker_threads[pid]['status'] = WorkerStatus.IDLE.value
+
+    logger.info(f"Redis consumer process {pid} started")
+
+    prefetched_tasks = deque()
+    avg_task_duration = None
+
+    while True:
+        if not prefetched_tasks:
+            block = exec_mode != StandaloneMode.CREATE.value
+            prefetch_size = get_prefetch_size(avg_task_duration)
+            tasks = claim_tasks(work_queue_name, inflight_queue_name, prefetch_size, block)
+            if not tasks:
+                break
+            prefetched_tasks.extend(tasks)
+            notify_tasks_start({json.loads(task_str)[0] for task_str in tasks})
+
+        task_str = prefetched_tasks.popleft()
+        worker_threads[pid]['status'] = WorkerStatus.BUSY.value
+
+        try:
+            task_payload = create_task_payload(task_str)
+            job_key = task_payload['job_key']
 
-            msg = f'ExecutorID {executor_id} | JobID {job_id} - '
             if job_key in canceled:
-                msg += f'CallID {call_id} execution canceled'
+                redis_client.lrem(inflight_queue_name, 1, task_str)
             else:
-                notify_task_done(job_key, call_id)
-                msg += f'CallID {call_id} execution finished'
-            logger.debug(msg)
+                task_start = time.time()
+                run_task(pid, task_payload, backend)
+                task_duration = time.time() - task_start
+                avg_task_duration = task_duration if avg_task_duration is None \
+                    else 0.8 * avg_task_duration + 0.2 * task_duration
+
+                if job_key in canceled:
+                    redis_client.lrem(inflight_queue_name, 1, task_str)
+                else:
+                    notify_task_done(job_key, task_payload['call_ids'], task_str, inflight_queue_name)
         except Exception as e:
-            logger.error(e)
+            logger.error(f'Error running task {task_str}: {e}')
+            redis_client.lrem(inflight_queue_name, 1, task_str)
 
         worker_threads[pid]['status'] = WorkerStatus.IDLE.value
 
@@ -211,6 +416,9 @@ def redis_queue_consumer(pid, work_queue_name, exec_mode, backend):
 def run_worker():
     global redis_client
     global budget_keeper
+    global claim_tasks_script
+    global requeue_tasks_script
+    global task_done_script
 
     os.makedirs(LITHOPS_TEMP_DIR, exist_ok=True)
 
@@ -225,8 +433,17 @@ def run_worker():
 
     # Start the redis client
     redis_client = redis.Redis(host=worker_data['master_ip'], decode_responses=True)
+    claim_tasks_script = redis_client.register_script(CLAIM_TASKS_LUA)
+    requeue_tasks_script = redis_client.register_script(REQUEUE_TASKS_LUA)
+    task_done_script = redis_client.register_script(TASK_DONE_LUA)
+
+    # Tasks claimed by a previous run of this worker that did not finish
+    work_queue_name = worker_data['work_queue_name']
+    inflight_queue_name = get_worker_inflight_key(worker_data['name'])
+    requeue_inflight_tasks(inflight_queue_name, work_queue_name)
 
     # Set the worker as Active
+    send_heartbeat(worker_data['name'])
     notify_worker_active(worker_data['name'])
 
     # Start the budget keeper. It is responsible to automatically terminate the
@@ -245,6 +462,9 @@ def run_worker():
         server.serve_forever()
     Thread(target=run_wsgi, daemon=True).start()
 
+    # Keep sending heartbeats to the master
+    Thread(target=send_heartbeats, args=(worker_data['name'],), daemon=True).start()
+
     # Start the consumer threads
     worker_processes = standalone_config[standalone_config['backend']]['worker_processes']
     worker_processes = CPU_COUNT if worker_processes == 'AUTO' else worker_processes
@@ -258,13 +478,16 @@ def run_worker():
             worker_threads[i] = {}
             future = executor.submit(
                 redis_queue_consumer, i,
-                worker_data['work_queue_name'],
+                work_queue_name,
+                inflight_queue_name,
                 standalone_config['exec_mode'],
                 standalone_config['backend']
             )
             redis_queue_consumer_futures.append(future)
             worker_threads[i]['future'] = future
 
+        send_heartbeat(worker_data['name'])
+
         for future in redis_queue_consumer_futures:
             future.result()
 
@@ -17,6 +17,7 @@
 import os
 import io
 import copy
+import uuid
 import redis
 import shutil
 import logging
@@ -26,6 +27,60 @@ from lithops.constants import STORAGE_CLI_MSG
 
 logger = logging.getLogger(__name__)
 
+# Objects bigger than chunk_size (MiB) are split in chunks of this size
+DEFAULT_CHUNK_SIZE = 64
+# Size of the ranged reads of the streamed objects
+STREAM_BLOCK_SIZE = 8 * 1024 ** 2
+# Number of keys fetched per listing and size request
+LIST_BATCH_SIZE = 10000
+# Chunks of an upload are deleted after this time if it is not committed
+UPLOAD_EXPIRY = 3600
+
+INDEX_KEY = 'lithops:index:{}'
+CHUNKS_META_KEY = 'lithops:chunks:{}'
+CHUNK_KEY = 'lithops:chunk:{}:{}'
+
+# Every object is a member of the sorted set index of its bucket, all with
+# score 0, so keys can be listed by prefix with lexicographical ranges. The
+# scripts keep the index, the data and the chunks of an object consistent.
+DELETE_CHUNKS_LUA = """
+local function delete_chunks(meta_key)
+    local meta = redis.call('HMGET', meta_key, 'upload_id', 'chunks')
+    if meta[1] then
+        for i = 0, tonumber(meta[2]) - 1 do
+            redis.call('DEL', 'lithops:chunk:' .. meta[1] .. ':' .. i)
+        end
+        redis.call('DEL', meta_key)
+    end
+end
+"""
+
+# KEYS: data key, chunks meta key, index key - ARGV: object key, data
+PUT_OBJECT_LUA = DELETE_CHUNKS_LUA + """
+delete_chunks(KEYS[2])
+redis.call('SET', KEYS[1], ARGV[2])
+redis.call('ZADD', KEYS[3], 0, ARGV[1])
+"""
+
+# KEYS: data key, chunks meta key, index key
+# ARGV: object key, size, chunk size, number of chunks, upload id
+COMMIT_CHUNKS_LUA = DELETE_CHUNKS_LUA + """
+delete_chunks(KEYS[2])
+redis.call('DEL', KEYS[1])
+for i = 0, tonumber(ARGV[4]) - 1 do
+    redis.call('PERSIST', 'lithops:chunk:' .. ARGV[5] .. ':' .. i)
+end
+redis.call('HSET', KEYS[2], 'size', ARGV[2], 'chunk_size', ARGV[3], 'chunks', ARGV[4], 'upload_id', ARGV[5])
+redis.call('ZADD', KEYS[3], 0, ARGV[1])
+"""
+
+# KEYS: data key, chunks meta key, index key - ARGV: object key
+DELETE_OBJECT_LUA = DELETE_CHUNKS_LUA + """
+delete_chunks(KEYS[2])
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[3], ARGV[1])
+"""
+
 
 class RedisBackend:
     def __init__(self, config):
@@ -33,12 +88,18 @@ class RedisBackend:
         self.config = config
         self.user_agent = self.config['user_agent']
         self.host = self.config['host']
+        self.chunk_size = int(self.config.get('chunk_size', DEFAULT_CHUNK_SIZE) * 1024 ** 2)
 
         redis_config = copy.deepcopy(config)
         redis_config.pop('storage_bucket')
         redis_config.pop('user_agent')
+        redis_config.pop('chunk_size', None)
         self._client = redis.Redis(**redis_config)
 
+        self._put_object_script = self._client.register_script(PUT_OBJECT_LUA)
+        self._commit_chunks_script = self._client.register_script(COMMIT_CHUNKS_LUA)
+        self._delete_object_script = self._client.register_script(DELETE_OBJECT_LUA)
+
         msg = STORAGE_CLI_MSG.format('Redis')
         logger.info(f"{msg} - Host: {self.host}")
 
@@ -48,35 +109,102 @@ class RedisBackend:
     def put_object(self, bucket_name, key, data):
         """
         Put an object in Redis. Override the object if the key already exists.
+        Objects bigger than the chunk size are stored in chunks, and file-like
+        objects are read one chunk at a time.
         :param bucket_name: bucket name
         :param key: key of the object.
         :param data: data of the object
-        :type data: str/bytes
+        :type data: str/bytes/file-like object
         :return: None
         """
-        if not isinstance(data, (str, bytes, bytearray)):
-            raise TypeError(type(data), 'valid types: {}'.format((str, bytes, bytearray)))
+        if isinstance(data, str):
+            data = data.encode()
+
+        if isinstance(data, (bytes, bytearray)):
+            if len(data) <= self.chunk_size:
+                self._put_object_script(keys=self._object_keys(bucket_name, key), args=[key, data])
+            else:
+                self._put_chunks(bucket_name, key, (data[i:i + self.chunk_size]
+                                 for i in range(0, len(data), self.chunk_size)))
+        elif hasattr(data, 'read'):
+            first_chunk = data.read(self.chunk_size)
+            second_chunk = data.read(self.chunk_size) if len(first_chunk) == self.chunk_size else b''
+            if not second_chunk:
+                self._put_object_script(keys=self._object_keys(bucket_name, key), args=[key, first_chunk])
+            else:
+                self._put_chunks(bucket_name, key, self._read_chunks(data, first_chunk, second_chunk))
+        else:
+            raise TypeError(type(data), 'valid types: {}'.format((str, bytes, bytearray, 'file-like object')))
+
+    def _read_chunks(self, data, *chunks):
+        yield from chunks
+        while True:
+            chunk = data.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
 
+    def _put_chunks(self, bucket_name, key, chunks):
+        """
+        Stores the chunks of an object under a new upload id, and then
+        replaces the previous object atomically
+        """
+        upload_id = uuid.uuid4().hex
+        size = 0
+        total_chunks = 0
+        for i, chunk in enumerate(chunks):
+            self._client.set(CHUNK_KEY.format(upload_id, i), chunk, ex=UPLOAD_EXPIRY)
+            size += len(chunk)
+            total_chunks += 1
+
+        self._commit_chunks_script(
+            keys=self._object_keys(bucket_name, key),
+            args=[key, size, self.chunk_size, total_chunks, upload_id]
+        )
+
+    def _object_keys(self, bucket_name, key):
         redis_key = self._format_key(bucket_name, key)
-        components = redis_key.split('/')
+        return [redis_key, CHUNKS_META_KEY.format(redis_key), INDEX_KEY.format(bucket_name)]
 
-        # NOTE: could use a lua script and add from the lowest
-        # to the highest dir and stop when SADD returns 0 since
-        # then we can assume higher dirs already exist
+    def _get_object_info(self, bucket_name, key):
+        """
+        Returns the size of an object and, if it is chunked, its chunks metadata
+        """
+        redis_key = self._format_key(bucket_name, key)
         pipeline = self._client.pipeline(False)
+        pipeline.exists(redis_key)
+        pipeline.strlen(redis_key)
+        pipeline.hmget(CHUNKS_META_KEY.format(redis_key), 'size', 'chunk_size', 'upload_id')
+        exists, size, (chunked_size, chunk_size, upload_id) = pipeline.execute()
+
+        if exists:
+            return {'size': size}
+        if upload_id:
+            return {'size': int(chunked_size), 'chunk_size': int(chunk_size), 'upload_id': upload_id.decode()}
+        raise StorageNoSuchKeyError(bucket_name, key)
+
+    def _get_range(self, bucket_name, key, info, start, end):
+        """
+        Reads the bytes from start to end (inclusive) of an object
+        """
+        if end < start:
+            return b''
 
-        # create parent dirs
-        for i in range(1, len(components) - 1):
-            loc = '/'.join(components[:i]) + '/'
-            pipeline.sadd(loc, components[i] + '/')
-
-        # add file to lowest dir
-        loc = '/'.join(components[:-1]) + '/'
-        pipeline.sadd(loc, components[-1])
+        if 'upload_id' not in info:
+            return self._client.getrange(self._format_key(bucket_name, key), start, end)
 
-        # set actual key
-        pipeline.set(redis_key, data)
-        pipeline.execute()
+        chunk_size = info['chunk_size']
+        pipeline = self._client.pipeline(False)
+        for i in range(start // chunk_size, end // chunk_size + 1):
+            chunk_start = max(start - i * chunk_size, 0)
+            chunk_end = min(end - i * chunk_size, chunk_size - 1)
+            pipeline.getrange(CHUNK_KEY.format(info['upload_id'], i), chunk_start, chunk_end)
+        data = b''.join(pipeline.execute())
+
+        if len(data) != end - start + 1:
+            # The object was replaced or deleted while reading it
+            raise StorageNoSuchKeyError(bucket_name, key)
+        return data
 
     def get_object(self, bucket_name, key, stream=False, extra_get_args={}):
         """
@@ -87,26 +215,30 @@ class RedisBackend:
         :return: Data of the object
         :rtype: str/bytes
         """
-
         redis_key = self._format_key(bucket_name, key)
-        try:
+
+        if stream or 'Range' in extra_get_args:
+            info = self._get_object_info(bucket_name, key)
+            start, end = 0, info['size'] - 1
             if 'Range' in extra_get_args:  # expected format: Range='bytes=L-H'
-                bytes_range = extra_get_args.pop('Range')[6:]
-                start, end = self._parse_range(bytes_range)
-                data = self._client.getrange(redis_key, start, end)
-            else:
-                data = self._client.get(redis_key)
+                start, end = self._parse_range(extra_get_args['Range'][6:], info['size'])
 
-        except redis.exceptions.ResponseError:
-            raise StorageNoSuchKeyError(bucket_name, key)
+            if stream:
+                return io.BufferedReader(RedisObjectStream(self, bucket_name, key, info, start, end),
+                                         buffer_size=STREAM_BLOCK_SIZE)
+            return self._get_range(bucket_name, key, info, start, end)
 
-        if data is None:
-            raise StorageNoSuchKeyError(bucket_name, key)
+        pipeline = self._client.pipeline(False)
+        pipeline.get(redis_key)
+        pipeline.exists(CHUNKS_META_KEY.format(redis_key))
+        data, chunked = pipeline.execute()
 
-        if stream:
-            return io.BytesIO(data)
-        else:
+        if data is not None:
             return data
+        if chunked:
+            info = self._get_object_info(bucket_name, key)
+            return self._get_range(bucket_name, key, info, 0, info['size'] - 1)
+        raise StorageNoSuchKeyError(bucket_name, key)
 
     def upload_file(self, file_name, bucket, key=None, extra_args={}, config=None):
         """Upload a file
@@ -148,7 +280,7 @@ class RedisBackend:
                 os.makedirs(dirname)
             with open(file_name, 'wb') as out:
                 data_stream = self.get_object(bucket, key, stream=True)
-                shutil.copyfileobj(data_stream, out)
+                shutil.copyfileobj(data_stream, out, STREAM_BLOCK_SIZE)
         except Exception as e:
             logging.error(e)
             return False
@@ -163,14 +295,8 @@ class RedisBackend:
         :return: Data of the object
         :rtype: dict
         """
-        redis_key = self._format_key(bucket_name, key)
-        try:
-            meta = self._client.debug_object(redis_key)
-        except redis.exceptions.ResponseError:
-            raise StorageNoSuchKeyError(bucket_name, key)
-
-        meta['content-length'] = meta['serializedlength'] - 1
-        return meta
+        info = self._get_object_info(bucket_name, key)
+        return {'content-length': str(info['size'])}
 
     def delete_object(self, bucket_name, key):
         """
@@ -186,27 +312,22 @@ class RedisBackend:
         :param bucket_name: bucket name
         :param key_list: list of keys
         """
-        redis_key_list = [self._format_key(bucket_name, k) for k in key_list]
-
-        pipeline = self._client.pipeline(False)
-        pipeline.delete(*redis_key_list)
-
-        for full_path in redis_key_list:
-            components = full_path.split('/')
-            pdir = '/'.join(components[:-1]) + '/'
-            pipeline.srem(pdir, components[-1])
-
-        pipeline.execute()
+        for i in range(0, len(key_list), LIST_BATCH_SIZE):
+            pipeline = self._client.pipeline(False)
+            for key in key_list[i:i + LIST_BATCH_SIZE]:
+                self._delete_object_script(keys=self._object_keys(bucket_name, key), args=[key], client=pipeline)
+            pipeline.execute()
 
     def head_bucket(self, bucket_name):
         """
-        Head bucket from Redis with a name.
-        Throws StorageNoSuchKeyError if the given bucket does not exist.
+        Head bucket from Redis with a name. Buckets are implicit in Redis,
+        so any bucket exists if the server is reachable.
         :param bucket_name: name of the bucket
         :return: metadata of the bucket
         :rtype: dict
         """
-        return bool(self._client.exists(self._format_key(bucket_name, '')))
+        self._client.ping()
+        return {'ResponseMetadata': {'HTTPStatusCode': 200}}
 
     def list_objects(self, bucket_name, prefix=None, match_pattern=None):
         """
@@ -216,10 +337,27 @@ class RedisBackend:
         :return: List of objects in bucket that match the given prefix.
         :rtype: list of dict
         """
-        pipeline = self._client.pipeline(False)
-        for key in self.list_keys(bucket_name, prefix):
-            pipeline.get(self._format_key(bucket_name, key))
-        return pipeline.execute()
+        keys = self.list_keys(bucket_name, prefix)
+        objects = []
+
+        for i in range(0, len(keys), LIST_BATCH_SIZE):
+            batch = keys[i:i + LIST_BATCH_SIZE]
+            pipeline = self._client.pipeline(False)
+            for key in batch:
+                pipeline.strlen(self._format_key(bucket_name, key))
+            sizes = pipeline.execute()
+
+            # Chunked (and empty) objects have no data key
+            pipeline = self._client.pipeline(False)
+            maybe_chunked = [j for j, size in enumerate(sizes) if size == 0]
+            for j in maybe_chunked:
+                pipeline.hget(CHUNKS_META_KEY.format(self._format_key(bucket_name, batch[j])), 'size')
+            for j, chunked_size in zip(maybe_chunked, pipeline.execute()):
+                sizes[j] = int(chunked_size or 0)
+
+            objects.extend({'Key': key, 'Size': size} for key, size in zip(batch, sizes))
+
+        return objects
 
     def list_keys(self, bucket_name, prefix=None):
         """
@@ -229,56 +367,60 @@ class RedisBackend:
         :return: List of keys in bucket that match the given prefix.
         :rtype: list of str
         """
-        prefix = prefix or ''
-        redis_prefix = self._format_key(bucket_name, prefix)
-
-        pdir = '/'.join(redis_prefix.split('/')[:-1]) + '/'
-        dir_keys = [key.decode() for key in self._client.smembers(pdir)]
-        key_list = []
-
-        for key in dir_keys:
-            full_key = pdir + key
-            if full_key.startswith(redis_prefix):
-                if full_key.endswith('/'):
-                    key_list.extend(self._walk(bucket_name, full_key))
-                else:
-                    key_list.append(full_key)
-
-        offset = len(bucket_name) + 1
-        return [key[offset:] for key in key_list]
+        index_key = INDEX_KEY.format(bucket_name)
+        if prefix:
+            # 0xff never appears in UTF-8 encoded keys
+            min_key, max_key = b'[' + prefix.encode(), b'(' + prefix.encode() + b'\xff'
+        else:
+            min_key, max_key = '-', '+'
 
-    def _walk(self, bucket_name, dir_key):
-        dir_keys = [key.decode() for key in self._client.smembers(dir_key)]
         key_list = []
-
-        for key in dir_keys:
-            full_key = dir_key + key
-            if full_key.endswith('/'):
-                key_list.extend(self._walk(bucket_name, full_key))
-            else:
-                key_list.append(full_key)
+        while True:
+            keys = self._client.zrangebylex(index_key, min_key, max_key, start=0, num=LIST_BATCH_SIZE)
+            key_list.extend(key.decode() for key in keys)
+            if len(keys) < LIST_BATCH_SIZE:
+                break
+            min_key = b'(' + keys[-1]
 
         return key_list
 
     def _format_key(self, bucket, key):
         return '/'.join([bucket, key])
 
-    def _parse_range(self, bytes_range):
-        if '--' in bytes_range:
-            bytes_range = bytes_range.replace('--', '-')
-            sign = -1
+    def _parse_range(self, bytes_range, size):
+        """
+        Returns the first and last bytes of a range in the formats
+        'start-end', 'start-' and '-suffix_length', clipped to the object size
+        """
+        start, end = bytes_range.split('-', 1)
+        if start == '':
+            start, end = size - int(end), size - 1
         else:
-            sign = 1
+            start, end = int(start), int(end) if end else size - 1
+        return max(start, 0), min(end, size - 1)
 
-        if '-' in bytes_range:
-            bytes_range = bytes_range.split('-')
-            if bytes_range[0] == '':
-                end = int(bytes_range[1]) * -1
-                start = end
-            else:
-                start = int(bytes_range[0])
-                end = int(bytes_range[1]) * sign
-        else:
-            start = end = int(bytes_range)
 
-        return start, end
+class RedisObjectStream(io.RawIOBase):
+    """
+    Reads a range of an object in blocks, as a file-like object
+    """
+
+    def __init__(self, backend, bucket_name, key, info, start, end):
+        self.backend = backend
+        self.bucket_name = bucket_name
+        self.key = key
+        self.info = info
+        self.pos = start
+        self.end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.end - self.pos + 1, STREAM_BLOCK_SIZE)
+        if size <= 0:
+            return 0
+        data = self.backend._get_range(self.bucket_name, self.key, self.info, self.pos, self.pos + size - 1)
+        buffer[:len(data)] = data
+        self.pos += len(data)
+        return len(data)
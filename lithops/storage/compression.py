@@ -0,0 +1,118 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import zlib
+import lzma
+
+
+# Compressed objects start with the magic bytes and the ID of their codec.
+# Objects without it are stored as they are, so readers detect the codec
+# of every object, and objects written without compression stay readable.
+MAGIC = b'\x1fLTZ'
+HEADER_SIZE = len(MAGIC) + 1
+
+
+def _import_zstd():
+    try:
+        import zstandard
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("Please install 'pip3 install lithops[compression]' to use the zstd compression codec")
+    return zstandard
+
+
+def _import_lz4():
+    try:
+        import lz4.frame
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("Please install 'pip3 install lithops[compression]' to use the lz4 compression codec")
+    return lz4.frame
+
+
+def _zstd_compress(data):
+    return _import_zstd().ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data):
+    return _import_zstd().ZstdDecompressor().decompressobj().decompress(data)
+
+
+def _lz4_compress(data):
+    return _import_lz4().compress(data)
+
+
+def _lz4_decompress(data):
+    return _import_lz4().decompress(data)
+
+
+# name: (ID, compress, decompress). IDs are written in the objects, never reuse them.
+CODECS = {
+    'zlib': (1, lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': (2, lzma.compress, lzma.decompress),
+    'zstd': (3, _zstd_compress, _zstd_decompress),
+    'lz4': (4, _lz4_compress, _lz4_decompress),
+}
+CODEC_IDS = {codec_id: name for name, (codec_id, _, _) in CODECS.items()}
+
+
+def check_codec(codec):
+    """
+    Checks that the codec exists and that its module is installed
+    """
+    if codec in (None, 'none'):
+        return
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec '{codec}'. "
+                         f"Options: none, {', '.join(CODECS)}")
+    if codec == 'zstd':
+        _import_zstd()
+    elif codec == 'lz4':
+        _import_lz4()
+
+
+def compress(data, codec, threshold=0):
+    """
+    Compresses data with the codec, and prepends the header of the codec.
+    Data smaller than threshold bytes, or that does not get smaller, is
+    returned as it is.
+    """
+    if codec in (None, 'none') or len(data) < threshold:
+        return data
+    if isinstance(data, str):
+        data = data.encode()
+
+    codec_id, compress_func, _ = CODECS[codec]
+    compressed = compress_func(data)
+    if len(compressed) + HEADER_SIZE >= len(data):
+        return data
+    return MAGIC + bytes([codec_id]) + compressed
+
+
+def decompress(data):
+    """
+    Decompresses data with the codec of its header. Data without a
+    header is returned as it is.
+    """
+    if not is_compressed(data):
+        return data
+    codec = CODEC_IDS.get(data[len(MAGIC)])
+    if codec is None:
+        raise ValueError(f'Unknown compression codec ID {data[len(MAGIC)]}')
+    _, _, decompress_func = CODECS[codec]
+    return decompress_func(memoryview(data)[HEADER_SIZE:])
+
+
+def is_compressed(data):
+    return not isinstance(data, str) and memoryview(data)[:len(MAGIC)] == MAGIC
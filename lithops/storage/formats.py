@@ -0,0 +1,424 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import io
+import re
+import csv
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Bytes read after a split point to find the beginning of the next record
+BOUNDARY_WINDOW = 128 * 1024
+# Bytes read per request when an object is scanned from the beginning
+SCAN_WINDOW = 8 * 1024 ** 2
+# Bytes read from the end of a Parquet object to get its footer in one request
+PARQUET_FOOTER_READ = 64 * 1024
+PARQUET_MAGIC = b'PAR1'
+# Bytes read from the partition stream at once to iterate its records
+READ_SIZE = 1024 ** 2
+
+
+def _import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("Please install 'pip3 install lithops[parquet]' to partition Parquet objects")
+    return pq
+
+
+def _iter_lines(stream, newline=b'\n'):
+    """
+    Iterates the lines of a stream, with their newline
+    """
+    pending = b''
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(newline)
+        pending = lines.pop()
+        for line in lines:
+            yield line + newline
+    if pending:
+        yield pending
+
+
+class PartitionFormat:
+    """
+    Strategy to split objects in partitions of whole records, and to parse
+    the records of a partition in the worker. It is selected per map call
+    with the obj_format argument, and the partitions get it as their
+    `format` attribute.
+    """
+    name = None
+
+    def split(self, obj_size, chunk_size, read_range):
+        """
+        Returns a list with the (first_byte, last_byte, attributes) of the
+        partitions of an object of obj_size bytes, of about chunk_size bytes
+        each. The attributes are set in the partition objects.
+        read_range(first_byte, last_byte) reads a byte range of the object.
+        """
+        raise NotImplementedError()
+
+    def wrap_stream(self, obj, stream):
+        """
+        Returns the data stream of a partition from the stream of its byte range
+        """
+        return stream
+
+    def records(self, obj):
+        """
+        Iterates the records of a partition
+        """
+        raise NotImplementedError()
+
+
+class LinesFormat(PartitionFormat):
+    """
+    Newline-terminated records. Partitions are aligned to the records on the
+    host with a small ranged read at every split point, so they neither
+    overlap nor have to be trimmed in the workers. Records are bytes without
+    the newline.
+    """
+    name = 'lines'
+
+    def __init__(self, newline='\n'):
+        self.newline = newline.encode()
+
+    def split(self, obj_size, chunk_size, read_range):
+        start = self._data_start(obj_size, read_range)
+        points = list(range(start + chunk_size, obj_size, chunk_size))
+        bounds = [start] + self._find_boundaries(points, obj_size, read_range) + [obj_size]
+        attributes = self._attributes(start, read_range)
+
+        partitions = []
+        for first_byte, end in zip(bounds, bounds[1:]):
+            if first_byte < end:
+                partitions.append((first_byte, end - 1, attributes))
+        return partitions
+
+    def _data_start(self, obj_size, read_range):
+        return 0
+
+    def _attributes(self, data_start, read_range):
+        return {}
+
+    def _find_boundaries(self, points, obj_size, read_range):
+        if not points:
+            return []
+        with ThreadPoolExecutor(min(len(points), 32)) as ex:
+            return list(ex.map(lambda pos: self._next_record(pos, obj_size, read_range), points))
+
+    def _next_record(self, pos, obj_size, read_range):
+        """
+        Returns the offset of the first record that starts at or after pos
+        """
+        # The record starts at pos if the previous byte ends a line
+        offset = pos - 1
+        while offset < obj_size:
+            data = read_range(offset, min(offset + BOUNDARY_WINDOW, obj_size) - 1)
+            if not data:
+                break
+            index = data.find(self.newline)
+            if index >= 0:
+                return offset + index + len(self.newline)
+            offset += len(data) - len(self.newline) + 1
+        return obj_size
+
+    def records(self, obj):
+        for line in _iter_lines(obj.data_stream, self.newline):
+            if line.endswith(self.newline):
+                line = line[:-len(self.newline)]
+            yield line
+
+
+class JSONLinesFormat(LinesFormat):
+    """
+    JSON Lines objects. Records are the decoded JSON values of the non-blank lines.
+    """
+    name = 'jsonl'
+
+    def __init__(self):
+        super().__init__('\n')
+
+    def records(self, obj):
+        for line in super().records(obj):
+            if line.strip():
+                yield json.loads(line)
+
+
+class CSVFormat(LinesFormat):
+    """
+    CSV objects. With header, the header row is read on the host and
+    prepended to the data stream of every partition, so each partition is a
+    valid CSV object, and the records are dicts keyed by the header columns.
+    Without header, the records are lists of fields.
+
+    Quoted fields with newlines need quoted_newlines=True. Record boundaries
+    then depend on the quotes since the beginning of the object, so the host
+    scans the whole object once to split it.
+    """
+    name = 'csv'
+
+    def __init__(self, header=True, delimiter=',', quotechar='"', quoted_newlines=False, encoding='utf-8'):
+        super().__init__('\n')
+        self.header = header
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.quoted_newlines = quoted_newlines
+        self.encoding = encoding
+
+    def _data_start(self, obj_size, read_range):
+        if not self.header:
+            return 0
+        if self.quoted_newlines:
+            return next(self._record_ends(obj_size, read_range), obj_size)
+        return self._next_record(1, obj_size, read_range)
+
+    def _attributes(self, data_start, read_range):
+        if not self.header:
+            return {}
+        return {'header': read_range(0, data_start - 1) if data_start else b''}
+
+    def _find_boundaries(self, points, obj_size, read_range):
+        if not self.quoted_newlines:
+            return super()._find_boundaries(points, obj_size, read_range)
+
+        boundaries = []
+        pending = iter(points)
+        point = next(pending, None)
+        for end in self._record_ends(obj_size, read_range):
+            while point is not None and end >= point:
+                boundaries.append(end)
+                point = next(pending, None)
+            if point is None:
+                break
+        return boundaries + [obj_size] * (len(points) - len(boundaries))
+
+    def _record_ends(self, obj_size, read_range):
+        """
+        Scans the object and yields the offsets after the newlines that are
+        not within quotes
+        """
+        tokens = re.compile(re.escape(self.quotechar.encode()) + b'|\n')
+        in_quotes = False
+        for offset in range(0, obj_size, SCAN_WINDOW):
+            data = read_range(offset, min(offset + SCAN_WINDOW, obj_size) - 1)
+            for match in tokens.finditer(data):
+                if match.group() != b'\n':
+                    in_quotes = not in_quotes
+                elif not in_quotes:
+                    yield offset + match.end()
+
+    def wrap_stream(self, obj, stream):
+        if not self.header:
+            return stream
+        return _PrefixedStream(obj.header, stream)
+
+    def records(self, obj):
+        lines = (line.decode(self.encoding) for line in _iter_lines(obj.data_stream))
+        if self.header:
+            return csv.DictReader(lines, delimiter=self.delimiter, quotechar=self.quotechar)
+        return csv.reader(lines, delimiter=self.delimiter, quotechar=self.quotechar)
+
+
+class FixedWidthFormat(PartitionFormat):
+    """
+    Records of record_size bytes. Partitions hold an exact multiple of the
+    records, so they need no reads on the host. Records are bytes, and a
+    trailing partial record is discarded.
+    """
+    name = 'fixed'
+
+    def __init__(self, record_size):
+        if not record_size or record_size < 1:
+            raise ValueError('record_size must be at least 1 byte')
+        self.record_size = record_size
+
+    def split(self, obj_size, chunk_size, read_range):
+        chunk_size = max(1, chunk_size // self.record_size) * self.record_size
+        return [(first_byte, min(first_byte + chunk_size, obj_size) - 1, {})
+                for first_byte in range(0, obj_size, chunk_size)]
+
+    def records(self, obj):
+        read_size = max(1, READ_SIZE // self.record_size) * self.record_size
+        pending = b''
+        while True:
+            chunk = obj.data_stream.read(read_size)
+            if not chunk:
+                break
+            data = pending + chunk
+            end = len(data) - len(data) % self.record_size
+            for i in range(0, end, self.record_size):
+                yield data[i:i + self.record_size]
+            pending = data[end:]
+
+
+class ParquetFormat(PartitionFormat):
+    """
+    Parquet objects, partitioned by row groups. The host reads the footer
+    with a ranged read, and every partition holds consecutive row groups of
+    up to chunk_size bytes, at least one. Partitions get the footer, so the
+    workers only read their own row groups. Records are dicts of the row
+    values, and `columns` limits the columns read. Requires pyarrow.
+    """
+    name = 'parquet'
+
+    def __init__(self, columns=None, batch_size=65536):
+        self.columns = columns
+        self.batch_size = batch_size
+
+    def split(self, obj_size, chunk_size, read_range):
+        pq = _import_parquet()
+        footer = self._read_footer(obj_size, read_range)
+        metadata = pq.read_metadata(io.BytesIO(PARQUET_MAGIC + footer))
+        attributes = {'footer': footer, 'object_size': obj_size}
+
+        partitions = []
+        row_groups = []
+        for index in range(metadata.num_row_groups):
+            first_byte, last_byte = self._row_group_range(metadata.row_group(index))
+            if row_groups and last_byte - partitions[-1][0] + 1 > chunk_size:
+                row_groups = []
+            if not row_groups:
+                partitions.append([first_byte, last_byte, dict(attributes, row_groups=row_groups)])
+            row_groups.append(index)
+            partitions[-1][1] = max(partitions[-1][1], last_byte)
+
+        return [tuple(partition) for partition in partitions]
+
+    @staticmethod
+    def _read_footer(obj_size, read_range):
+        """
+        Returns the footer of the object, with its length and magic bytes
+        """
+        tail = read_range(max(0, obj_size - PARQUET_FOOTER_READ), obj_size - 1)
+        if len(tail) < 8 or tail[-4:] != PARQUET_MAGIC:
+            raise ValueError('The object is not a Parquet file')
+        footer_size = int.from_bytes(tail[-8:-4], 'little') + 8
+        if footer_size > len(tail):
+            tail = read_range(obj_size - footer_size, obj_size - 1)
+        return bytes(tail[-footer_size:])
+
+    @staticmethod
+    def _row_group_range(row_group):
+        starts, ends = [], []
+        for index in range(row_group.num_columns):
+            column = row_group.column(index)
+            start = column.data_page_offset
+            if column.has_dictionary_page and column.dictionary_page_offset:
+                start = min(start, column.dictionary_page_offset)
+            starts.append(start)
+            ends.append(start + column.total_compressed_size)
+        return min(starts), max(ends) - 1
+
+    def records(self, obj):
+        pq = _import_parquet()
+        data = obj.data_stream.read()
+        segments = [(obj.data_byte_range[0], data), (obj.object_size - len(obj.footer), obj.footer)]
+        parquet_file = pq.ParquetFile(_SparseFile(obj.object_size, segments))
+        for batch in parquet_file.iter_batches(self.batch_size, obj.row_groups, self.columns):
+            yield from batch.to_pylist()
+
+
+class _PrefixedStream:
+    """
+    Data stream of a partition that starts with the header of the object
+    """
+
+    def __init__(self, prefix, stream):
+        self.prefix = prefix
+        self.stream = stream
+
+    def read(self, n=None):
+        if n is None or n < 0:
+            data, self.prefix = self.prefix + self.stream.read(), b''
+            return data
+        data, self.prefix = self.prefix[:n], self.prefix[n:]
+        if len(data) < n:
+            data += self.stream.read(n - len(data))
+        return data
+
+    def __getattr__(self, attr):
+        return getattr(self.stream, attr)
+
+
+class _SparseFile(io.RawIOBase):
+    """
+    Read-only file of size bytes with the data of some (offset, data)
+    segments. Other bytes are read as zeros, so readers can seek to any
+    offset, but only the segments are meaningful.
+    """
+
+    def __init__(self, size, segments):
+        self.size = size
+        self.segments = segments
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.pos = max(0, offset)
+        return self.pos
+
+    def readinto(self, buffer):
+        n = max(0, min(len(buffer), self.size - self.pos))
+        view = memoryview(buffer)[:n]
+        view[:] = bytes(n)
+        for start, data in self.segments:
+            low, high = max(self.pos, start), min(self.pos + n, start + len(data))
+            if low < high:
+                view[low - self.pos:high - self.pos] = data[low - start:high - start]
+        self.pos += n
+        return n
+
+
+FORMATS = {
+    LinesFormat.name: LinesFormat,
+    JSONLinesFormat.name: JSONLinesFormat,
+    CSVFormat.name: CSVFormat,
+    ParquetFormat.name: ParquetFormat,
+}
+
+
+def get_format(obj_format):
+    """
+    Returns the PartitionFormat of the obj_format argument of a map call:
+    a PartitionFormat instance, or the name of a format with its default
+    options
+    """
+    if obj_format is None or isinstance(obj_format, PartitionFormat):
+        return obj_format
+    if obj_format == FixedWidthFormat.name:
+        raise ValueError("The 'fixed' format needs the record size, use obj_format=FixedWidthFormat(record_size)")
+    if obj_format not in FORMATS:
+        raise ValueError(f"Unknown object format '{obj_format}'. Options: {', '.join(FORMATS)}")
+    return FORMATS[obj_format]()
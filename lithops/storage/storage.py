@@ -16,15 +16,20 @@
 #
 
 import os
+import zlib
 import json
+import base64
+import hashlib
 import logging
 import itertools
 import importlib
 from typing import Optional, List, Union, Dict, TextIO, BinaryIO, Any
 
-from lithops.constants import CACHE_DIR, RUNTIMES_PREFIX, JOBS_PREFIX, TEMP_PREFIX
-from lithops.utils import is_lithops_worker
+from lithops.constants import CACHE_DIR, RUNTIMES_PREFIX, JOBS_PREFIX, TEMP_PREFIX, \
+    LITHOPS_DEFAULT_CONFIG_KEYS
+from lithops.utils import is_lithops_worker, read_into_buffer
 from lithops.storage import utils
+from lithops.storage import compression
 from lithops.config import extract_storage_config, default_storage_config
 
 logger = logging.getLogger(__name__)
@@ -33,6 +38,21 @@ logger = logging.getLogger(__name__)
 RUNTIME_META_CACHE = {}
 COBJECTS_INDEX = itertools.count()
 
+# Process-wide registry of storage backend clients, by storage config hash.
+# Each entry records the pid that created it, so that a forked process never
+# shares the connection pools of its parent
+STORAGE_HANDLERS = {}
+# Buckets already verified (or created), by storage config hash
+CHECKED_BUCKETS = set()
+
+
+def get_storage_config_hash(storage_config):
+    """
+    Returns a hash that identifies a storage configuration
+    """
+    config_str = json.dumps(storage_config, sort_keys=True, default=str)
+    return hashlib.sha1(config_str.encode()).hexdigest()
+
 
 class Storage:
     """
@@ -40,12 +60,14 @@ class Storage:
     underlying storage backend without exposing the implementation details.
     """
 
-    def __init__(self, config=None, backend=None, storage_config=None):
+    def __init__(self, config=None, backend=None, storage_config=None, reuse_client=False):
         """ Creates an Storage instance
 
         :param config: lithops configuration dict
         :param backend: storage backend name
         :param storage_config: storage configuration dict
+        :param reuse_client: reuse the backend client (and its connection pool)
+            created by this process for the same storage configuration
 
         :return: Storage instance.
         """
@@ -58,19 +80,57 @@ class Storage:
             self.config = extract_storage_config(storage_config)
 
         self.backend = self.config['backend']
+        self.config_hash = get_storage_config_hash(self.config)
+        self.reuse_client = reuse_client
+
+        if reuse_client:
+            self.storage_handler = self._get_shared_storage_handler()
+        else:
+            self.storage_handler = self._create_storage_handler()
 
+        bucket = self.config[self.backend].get('storage_bucket')
+        self.bucket = bucket or self.storage_handler.generate_bucket_name()
+
+    def _create_storage_handler(self):
+        """
+        Creates a new storage backend client
+        """
         try:
             module_location = f'lithops.storage.backends.{self.backend}'
             sb_module = importlib.import_module(module_location)
             StorageBackend = getattr(sb_module, 'StorageBackend')
-            self.storage_handler = StorageBackend(self.config[self.backend])
+            return StorageBackend(self.config[self.backend])
         except Exception as e:
             logger.error("An exception was produced trying to create the "
                          f"'{self.backend}' storage backend")
             raise e
 
-        bucket = self.config[self.backend].get('storage_bucket')
-        self.bucket = bucket or self.storage_handler.generate_bucket_name()
+    def _get_shared_storage_handler(self):
+        """
+        Gets the storage backend client of this process from the registry,
+        creating it if it does not exist yet
+        """
+        pid = os.getpid()
+        if self.config_hash in STORAGE_HANDLERS:
+            handler_pid, storage_handler = STORAGE_HANDLERS[self.config_hash]
+            if handler_pid == pid:
+                return storage_handler
+
+        storage_handler = self._create_storage_handler()
+        STORAGE_HANDLERS[self.config_hash] = (pid, storage_handler)
+
+        return storage_handler
+
+    def reset_client(self):
+        """
+        Discards the current backend client, for example after a process that
+        shared its connections was killed, and creates a new one.
+        """
+        if self.reuse_client:
+            STORAGE_HANDLERS.pop(self.config_hash, None)
+            self.storage_handler = self._get_shared_storage_handler()
+        else:
+            self.storage_handler = self._create_storage_handler()
 
     def get_client(self) -> object:
         """
@@ -335,22 +395,38 @@ class InternalStorage:
     underlying storage backend without exposing the the implementation details.
     """
 
-    def __init__(self, storage_config):
+    def __init__(self, storage_config, reuse_client=False):
         """ Creates an InternalStorage instance
         :param storage_config: Storage config dictionary
+        :param reuse_client: reuse the backend client of this process for the
+            same storage config, and skip the bucket check if already done
 
         :return: InternalStorage instance
         """
-        self.storage = Storage(storage_config=storage_config)
+        self.storage = Storage(storage_config=storage_config, reuse_client=reuse_client)
         self.backend = self.storage.backend
         self.bucket = self.storage.bucket
+        self.compression = storage_config.get(
+            'compression', LITHOPS_DEFAULT_CONFIG_KEYS['compression'])
+        self.compression_threshold = storage_config.get(
+            'compression_threshold', LITHOPS_DEFAULT_CONFIG_KEYS['compression_threshold'])
+        compression.check_codec(self.compression)
 
         if not self.bucket:
             raise Exception(
                 f"'storage_bucket' is mandatory under '{self.backend}'"
                 " section of the configuration")
 
-        self.storage.create_bucket(self.bucket)
+        bucket_id = (self.storage.config_hash, self.bucket)
+        if not reuse_client or bucket_id not in CHECKED_BUCKETS:
+            self.storage.create_bucket(self.bucket)
+            CHECKED_BUCKETS.add(bucket_id)
+
+    def reset_client(self):
+        """
+        Discards the current backend client and creates a new one
+        """
+        self.storage.reset_client()
 
     def get_client(self):
         """
@@ -366,6 +442,22 @@ class InternalStorage:
         """
         return self.storage.get_storage_config()
 
+    def compress(self, data):
+        """
+        Compresses a Lithops-internal object with the configured codec.
+        :param data: object content
+        :return: compressed object content, or data if it is not worth compressing
+        """
+        return compression.compress(data, self.compression, self.compression_threshold)
+
+    def decompress(self, data):
+        """
+        Decompresses a Lithops-internal object with the codec of its header.
+        :param data: object content
+        :return: decompressed object content
+        """
+        return compression.decompress(data)
+
     def put_data(self, key, data):
         """
         Put data object into storage.
@@ -382,7 +474,34 @@ class InternalStorage:
         :param func: serialized function
         :return: None
         """
-        return self.storage.put_object(self.bucket, key, func)
+        return self.storage.put_object(self.bucket, key, self.compress(func))
+
+    def put_job_manifest(self, key, manifest):
+        """
+        Put the job manifest into storage.
+        :param key: job manifest key
+        :param manifest: serialized job manifest
+        :return: None
+        """
+        return self.storage.put_object(self.bucket, key, manifest)
+
+    def put_call_status(self, key, status):
+        """
+        Put the status of a call into storage.
+        :param key: status key
+        :param status: serialized call status
+        :return: None
+        """
+        return self.storage.put_object(self.bucket, key, self.compress(status))
+
+    def put_call_output(self, key, output):
+        """
+        Put the output of a call into storage.
+        :param key: output key
+        :param output: serialized output
+        :return: None
+        """
+        return self.storage.put_object(self.bucket, key, self.compress(output))
 
     def get_data(self, key, stream=False, extra_get_args={}):
         """
@@ -399,6 +518,14 @@ class InternalStorage:
         :param key: function key
         :return: serialized function
         """
+        return self.decompress(self.storage.get_object(self.bucket, key))
+
+    def get_job_manifest(self, key):
+        """
+        Get the job manifest from storage.
+        :param key: job manifest key
+        :return: serialized job manifest
+        """
         return self.storage.get_object(self.bucket, key)
 
     def del_data(self, key):
@@ -439,11 +566,29 @@ class InternalStorage:
         """
         status_key = utils.create_status_key(executor_id, job_id, call_id)
         try:
-            data = self.storage.get_object(self.bucket, status_key)
+            data = self.decompress(self.storage.get_object(self.bucket, status_key))
             return json.loads(data.decode('ascii'))
         except utils.StorageNoSuchKeyError:
             return None
 
+    def get_call_logs(self, call_status):
+        """
+        Get the execution logs of a call, either inlined in its status or
+        stored in a separate object.
+        :param call_status: status of the call
+        :return: The execution logs, or None if the call has no logs
+        """
+        if 'logs' in call_status:
+            logs = base64.b64decode(call_status['logs'].encode())
+        elif 'logs_key' in call_status:
+            try:
+                logs = self.storage.get_object(self.bucket, call_status['logs_key'])
+            except utils.StorageNoSuchKeyError:
+                return None
+        else:
+            return None
+        return zlib.decompress(logs).decode(errors='replace')
+
     def get_call_output(self, executor_id, job_id, call_id):
         """
         Get the output of a call.
@@ -453,7 +598,10 @@ class InternalStorage:
         """
         output_key = utils.create_output_key(executor_id, job_id, call_id)
         try:
-            return self.storage.get_object(self.bucket, output_key)
+            # Read into a writable buffer, so the arrays of the result are
+            # rebuilt over it without copies
+            stream = self.storage.get_object(self.bucket, output_key, stream=True)
+            return self.decompress(read_into_buffer(stream))
         except utils.StorageNoSuchKeyError:
             return None
 
@@ -19,6 +19,7 @@ import os
 import time
 import logging
 from lithops.constants import JOBS_PREFIX
+from lithops.storage.formats import LinesFormat
 
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,11 @@ data_key_suffix = "data.pickle"
 output_key_suffix = "output.pickle"
 status_key_suffix = "status.json"
 init_key_suffix = ".init"
+manifest_key_suffix = "manifest.json"
+logs_key_suffix = "execution.log"
+profile_key_suffix = "profile.pickle"
+shuffle_key_suffix = "shuffle.pickle"
+broadcast_key_suffix = "broadcast.pickle"
 
 
 class StorageNoSuchKeyError(Exception):
@@ -44,7 +50,17 @@ class StorageConfigMismatchError(Exception):
         super(StorageConfigMismatchError, self).__init__(msg)
 
 
-class CloudObject:
+class CloudObjectBase:
+    def records(self):
+        """
+        Iterates the records of a partition in the worker, parsed with the
+        obj_format of the map call, or as lines without it
+        """
+        obj_format = getattr(self, 'format', None) or LinesFormat(getattr(self, 'newline', None) or '\n')
+        return obj_format.records(self)
+
+
+class CloudObject(CloudObjectBase):
     def __init__(self, backend, bucket, key):
         self.backend = backend
         self.bucket = bucket
@@ -55,7 +71,7 @@ class CloudObject:
         return f'<CloudObject at {path}>'
 
 
-class CloudObjectUrl:
+class CloudObjectUrl(CloudObjectBase):
     def __init__(self, url):
         self.url = url
 
@@ -63,7 +79,7 @@ class CloudObjectUrl:
         return f'<CloudObject at {self.url}>'
 
 
-class CloudObjectLocal:
+class CloudObjectLocal(CloudObjectBase):
     def __init__(self, path):
         self.path = path
         self.bucket = os.path.dirname(path)
@@ -125,6 +141,17 @@ def create_data_key(executor_id, job_id):
     return '/'.join([JOBS_PREFIX, job_key, agg_data_key_suffix])
 
 
+def create_job_manifest_key(executor_id, job_id):
+    """
+    Create job manifest key
+    :param executor_id: callset's ID
+    :param job_id: Job's ID
+    :return: a key for the job manifest
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, manifest_key_suffix])
+
+
 def create_output_key(executor_id, job_id, call_id):
     """
     Create output key
@@ -151,6 +178,52 @@ def create_status_key(executor_id, job_id, call_id):
     return '/'.join([JOBS_PREFIX, job_key, call_id, status_key_suffix])
 
 
+def create_logs_key(executor_id, job_id, call_id):
+    """
+    Create logs key
+    :param executor_id: prefix
+    :param job_id: Job's ID
+    :param call_id: call's ID
+    :return: logs key
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, call_id, logs_key_suffix])
+
+
+def create_profile_key(executor_id, job_id, call_id):
+    """
+    Create profile key
+    :param executor_id: prefix
+    :param job_id: Job's ID
+    :param call_id: call's ID
+    :return: profile key
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, call_id, profile_key_suffix])
+
+
+def create_shuffle_key(executor_id, job_id, call_id):
+    """
+    Create shuffle key
+    :param executor_id: prefix
+    :param job_id: Job's ID
+    :param call_id: call's ID
+    :return: a key for the partitioned output of a shuffle map call
+    """
+    job_key = create_job_key(executor_id, job_id)
+    return '/'.join([JOBS_PREFIX, job_key, call_id, shuffle_key_suffix])
+
+
+def create_broadcast_key(executor_id, digest):
+    """
+    Create broadcast key
+    :param executor_id: Executor's ID
+    :param digest: hash of the serialized object
+    :return: a key for a broadcast object, cleaned with the functions of the executor
+    """
+    return '/'.join([JOBS_PREFIX, executor_id, f'{digest}.{broadcast_key_suffix}'])
+
+
 def create_init_key(executor_id, job_id, call_id, act_id):
     """
     Create init key
@@ -193,3 +193,43 @@ class SideEffect:
 
 def passthrough_function(x):
     return x.result
+
+
+def add_one(x):
+    return x + 1
+
+
+def double(x):
+    return x * 2
+
+
+def double_with_id(x, id):
+    return x * 2
+
+
+def count_words(text):
+    counts = {}
+    for word in text.split():
+        counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def sum_counts(word, counts):
+    return sum(counts)
+
+
+def lookup(x, table):
+    return table.value[x]
+
+
+def sum_results(results):
+    return sum(results)
+
+
+def mark_buffer(data):
+    data[0] = 255
+    return pickle.PickleBuffer(data)
+
+
+def add_length(x, data):
+    return x + len(data)
@@ -0,0 +1,27 @@
+#
+# Tests for the `lithops benchmark` scenarios.
+#
+
+import json
+import pytest
+
+from lithops.scripts.benchmark import run_benchmark, scale_params
+
+
+class TestBenchmark:
+
+    def test_scale_params(self):
+        params = {'calls': 1000, 'payload_mb': 1, 'chunk_mb': 64}
+        assert scale_params(params, 0.01) == {'calls': 10, 'payload_mb': 1, 'chunk_mb': 64}
+
+    def test_run_benchmark(self):
+        results = run_benchmark(['noop_map_1k', 'large_results'], {'config': pytest.lithops_config}, scale=0.005)
+        json.dumps(results)
+
+        noop_map = results['scenarios']['noop_map_1k']
+        assert noop_map['params'] == {'calls': 5}
+        run, = noop_map['runs']
+        assert run['calls'] == 5
+        assert 0 < run['submit_latency'] <= run['time_to_first_result'] <= run['makespan']
+        assert noop_map['median']['calls_per_sec'] == run['calls_per_sec']
+        assert results['scenarios']['large_results']['runs'][0]['calls'] == 1
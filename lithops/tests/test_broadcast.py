@@ -0,0 +1,85 @@
+#
+# Tests for the broadcast objects of FunctionExecutor.broadcast().
+#
+
+import io
+import pickle
+import pytest
+
+from lithops import FunctionExecutor
+from lithops import broadcast
+from lithops.broadcast import Broadcast, BROADCAST_CACHE
+from lithops.tests.functions import lookup, sum_results
+
+
+class MemoryStorage:
+    backend = 'memory'
+    bucket = 'bucket'
+
+    def __init__(self):
+        self.objects = {}
+        self.gets = 0
+
+    def put_data(self, key, data):
+        self.objects[key] = data
+
+    def get_object(self, bucket, key, stream=False):
+        self.gets += 1
+        return io.BytesIO(self.objects[key]) if stream else self.objects[key]
+
+
+class TestBroadcast:
+
+    def test_handle(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(broadcast, 'BROADCAST_DIR', str(tmp_path))
+        storage = MemoryStorage()
+        table = {i: str(i) for i in range(1000)}
+        handle = Broadcast.create(storage, 'ex-test', table)
+        assert Broadcast.create(storage, 'ex-test', dict(table)).key == handle.key
+        assert list(storage.objects) == [f'lithops.jobs/ex-test/{handle.digest}.broadcast.pickle']
+        assert handle.value is table
+
+        worker_handle = pickle.loads(pickle.dumps(handle))
+        assert len(pickle.dumps(worker_handle)) < handle.size
+        BROADCAST_CACHE.pop(handle.digest, None)
+        monkeypatch.setattr(broadcast, '_storage', storage)
+        assert worker_handle.value == table
+        assert pickle.loads(pickle.dumps(handle)).value == table
+        assert storage.gets == 1
+
+        # Other processes of the container read the object from disk
+        BROADCAST_CACHE.pop(handle.digest)
+        assert pickle.loads(pickle.dumps(handle)).value == table
+        assert storage.gets == 1
+        assert (tmp_path / handle.digest).is_file()
+
+    def test_calls_get_their_own_copy(self, monkeypatch, tmp_path):
+        np = pytest.importorskip('numpy')
+        monkeypatch.setattr(broadcast, 'BROADCAST_DIR', str(tmp_path))
+        storage = MemoryStorage()
+        monkeypatch.setattr(broadcast, '_storage', storage)
+        handle = Broadcast.create(storage, 'ex-test', {'data': np.zeros(100000)})
+        BROADCAST_CACHE.pop(handle.digest, None)
+
+        first = pickle.loads(pickle.dumps(handle))
+        first.value['data'] += 1
+        first.value['new'] = True
+        second = pickle.loads(pickle.dumps(handle))
+        assert not second.value['data'].any() and 'new' not in second.value
+        assert second.load() is not second.value
+        assert storage.gets == 1
+
+    def test_broadcast_map(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        table = fexec.broadcast({i: i * i for i in range(10000)})
+        fexec.map(lookup, [1, 2, 3, 4], extra_args=(table,))
+        result = fexec.get_result()
+        assert result == [1, 4, 9, 16]
+
+    def test_broadcast_map_reduce(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        table = fexec.broadcast({i: i * i for i in range(10000)})
+        iterdata = [{'table': table, 'x': x} for x in range(10)]
+        fexec.map_reduce(lookup, iterdata, sum_results)
+        result = fexec.get_result()
+        assert result == 285
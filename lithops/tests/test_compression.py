@@ -0,0 +1,62 @@
+#
+# Tests for the compression codecs of the Lithops-internal objects.
+#
+
+import os
+import copy
+import pickle
+import pytest
+
+from lithops import FunctionExecutor
+from lithops.storage import compression
+from lithops.storage.utils import create_output_key, create_data_key
+from lithops.tests.functions import passthrough_function, SideEffect
+
+
+class TestCompression:
+
+    @pytest.mark.parametrize('codec', ['zlib', 'lzma'])
+    def test_codecs(self, codec):
+        data = b'lithops ' * 1000
+        compressed = compression.compress(data, codec)
+        assert compressed.startswith(compression.MAGIC)
+        assert len(compressed) < len(data)
+        assert compression.decompress(compressed) == data
+
+    def test_optional_codecs(self):
+        pytest.importorskip('zstandard')
+        data = b'lithops ' * 1000
+        assert compression.decompress(compression.compress(data, 'zstd')) == data
+
+    def test_uncompressed_objects(self):
+        data = b'lithops ' * 1000
+        assert compression.compress(data, 'none') is data
+        assert compression.compress(data, 'zlib', threshold=len(data) + 1) is data
+        # Incompressible data is stored as it is
+        random_data = os.urandom(1024)
+        assert compression.compress(random_data, 'lzma') is random_data
+        assert compression.decompress(data) is data
+        assert compression.decompress('{"type": "__end__"}') == '{"type": "__end__"}'
+
+    def test_invalid_codec(self):
+        with pytest.raises(ValueError):
+            compression.check_codec('brotli')
+        with pytest.raises(ValueError):
+            compression.decompress(compression.MAGIC + bytes([255]) + b'data')
+
+    def test_compressed_job(self):
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['compression'] = 'zlib'
+        config['lithops']['compression_threshold'] = 1024
+        fexec = FunctionExecutor(config=config)
+        big_result = SideEffect()
+        big_result.result = 'lithops ' * 10000
+        fs = fexec.map(passthrough_function, [big_result, big_result])
+        assert fexec.get_result(fs) == [big_result.result] * 2
+
+        bucket = fexec.storage.bucket
+        data = fexec.storage.get_object(bucket, create_data_key(fexec.executor_id, fs[0].job_id))
+        assert data.startswith(compression.MAGIC)
+        output = fexec.storage.get_object(bucket, create_output_key(fexec.executor_id, fs[0].job_id, '00000'))
+        assert output.startswith(compression.MAGIC)
+        assert pickle.loads(compression.decompress(output)) == big_result.result
@@ -0,0 +1,174 @@
+#
+# Tests for the format-aware object partitioning.
+#
+
+import io
+import json
+import pytest
+
+from lithops import FunctionExecutor
+from lithops.storage.utils import CloudObject
+from lithops.storage.formats import LinesFormat, JSONLinesFormat, CSVFormat, \
+    FixedWidthFormat, ParquetFormat, get_format
+
+
+def _reader(data):
+    return lambda first_byte, last_byte: data[first_byte:last_byte + 1]
+
+
+def _partitions(obj_format, data, chunk_size):
+    """
+    Returns the partition objects of data, as the worker gets them
+    """
+    partitions = []
+    for first_byte, last_byte, attributes in obj_format.split(len(data), chunk_size, _reader(data)):
+        obj = CloudObject('localhost', 'bucket', 'key')
+        obj.data_byte_range = (first_byte, last_byte)
+        obj.format = obj_format
+        for name, value in attributes.items():
+            setattr(obj, name, value)
+        obj.data_stream = obj_format.wrap_stream(obj, io.BytesIO(data[first_byte:last_byte + 1]))
+        partitions.append(obj)
+    return partitions
+
+
+def _records(obj_format, data, chunk_size):
+    return [list(obj.records()) for obj in _partitions(obj_format, data, chunk_size)]
+
+
+def count_records(obj):
+    return len(list(obj.records()))
+
+
+def sum_csv_column(obj):
+    return sum(int(row['value']) for row in obj.records())
+
+
+def parquet_row_groups(obj):
+    return obj.row_groups, [row['id'] for row in obj.records()]
+
+
+class TestFormats:
+
+    def test_lines(self):
+        data = b''.join(f'line{i}\n'.encode() for i in range(100))
+        records = _records(LinesFormat(), data, 64)
+
+        assert len(records) > 1
+        assert sum(records, []) == [f'line{i}'.encode() for i in range(100)]
+
+    def test_lines_longer_than_chunk(self):
+        data = b'a' * 100 + b'\nb\n' + b'c' * 100
+        records = _records(LinesFormat(), data, 10)
+
+        assert records == [[b'a' * 100], [b'b', b'c' * 100]]
+
+    def test_jsonl(self):
+        rows = [{'id': i, 'text': 'a\nb'} for i in range(50)]
+        data = b''.join(json.dumps(row).encode() + b'\n' for row in rows)
+
+        assert sum(_records(JSONLinesFormat(), data, 100), []) == rows
+
+    def test_csv_header(self):
+        data = b'id,value\n' + b''.join(f'{i},{i * 2}\n'.encode() for i in range(100))
+        partitions = _partitions(CSVFormat(), data, 128)
+
+        assert len(partitions) > 1
+        for obj in partitions:
+            assert obj.header == b'id,value\n'
+            assert obj.data_stream.read().startswith(b'id,value\n')
+        records = _records(CSVFormat(), data, 128)
+        assert [row['value'] for row in sum(records, [])] == [str(i * 2) for i in range(100)]
+
+    def test_csv_quoted_newlines(self):
+        rows = [[str(i), f'line {i}\nwith "quotes" and, commas'] for i in range(100)]
+        data = b'id,text\n' + b''.join(f'{i},"{text.replace(chr(34), chr(34) * 2)}"\n'.encode() for i, text in rows)
+        records = _records(CSVFormat(quoted_newlines=True), data, 200)
+
+        assert len(records) > 1
+        assert [[row['id'], row['text']] for row in sum(records, [])] == rows
+
+    def test_csv_without_header(self):
+        data = b'a;1\nb;2\nc;3\n'
+        records = _records(CSVFormat(header=False, delimiter=';'), data, 4)
+
+        assert sum(records, []) == [['a', '1'], ['b', '2'], ['c', '3']]
+
+    def test_fixed_width(self):
+        data = b''.join(f'{i:04d}'.encode() for i in range(100)) + b'xy'
+        partitions = FixedWidthFormat(4).split(len(data), 30, _reader(data))
+
+        assert all((last - first + 1) % 4 == 0 for first, last, _ in partitions[:-1])
+        records = _records(FixedWidthFormat(4), data, 30)
+        assert sum(records, []) == [f'{i:04d}'.encode() for i in range(100)]
+
+    def test_parquet(self):
+        pa = pytest.importorskip('pyarrow')
+        pq = pytest.importorskip('pyarrow.parquet')
+        table = pa.table({'id': list(range(1000)), 'name': [f'name{i}' for i in range(1000)]})
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, row_group_size=100)
+        data = buffer.getvalue()
+
+        partitions = _partitions(ParquetFormat(), data, 2048)
+        assert len(partitions) > 1
+        assert sum((obj.row_groups for obj in partitions), []) == list(range(10))
+        rows = sum((list(obj.records()) for obj in partitions), [])
+        assert rows == table.to_pylist()
+
+        columns = _records(ParquetFormat(columns=['id']), data, 2048)
+        assert sum(columns, []) == [{'id': i} for i in range(1000)]
+
+    def test_get_format(self):
+        assert isinstance(get_format('csv'), CSVFormat)
+        assert get_format(None) is None
+        fixed = FixedWidthFormat(10)
+        assert get_format(fixed) is fixed
+        with pytest.raises(ValueError):
+            get_format('fixed')
+        with pytest.raises(ValueError):
+            get_format('xml')
+
+
+class TestFormatsMap:
+
+    def test_map_csv(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        bucket = fexec.storage.bucket
+        data = b'id,value\n' + b''.join(f'{i},{i}\n'.encode() for i in range(2000))
+        fexec.storage.put_object(bucket, 'test_formats/input.csv', data)
+
+        fs = fexec.map(sum_csv_column, [f'{bucket}/test_formats/input.csv'],
+                       obj_chunk_size=4096, obj_format='csv')
+        results = fexec.get_result(fs)
+
+        assert len(results) > 1
+        assert sum(results) == sum(range(2000))
+
+    def test_map_fixed_width(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        bucket = fexec.storage.bucket
+        fexec.storage.put_object(bucket, 'test_formats/input.bin', b'0123456789' * 1000)
+
+        fs = fexec.map(count_records, [f'{bucket}/test_formats/input.bin'],
+                       obj_chunk_size=1234, obj_format=FixedWidthFormat(10))
+        results = fexec.get_result(fs)
+
+        assert len(results) == 9
+        assert sum(results) == 1000
+
+    def test_map_parquet(self):
+        pa = pytest.importorskip('pyarrow')
+        pq = pytest.importorskip('pyarrow.parquet')
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        bucket = fexec.storage.bucket
+        buffer = io.BytesIO()
+        pq.write_table(pa.table({'id': list(range(1000))}), buffer, row_group_size=250)
+        fexec.storage.put_object(bucket, 'test_formats/input.parquet', buffer.getvalue())
+
+        fs = fexec.map(parquet_row_groups, [f'{bucket}/test_formats/input.parquet'],
+                       obj_chunk_size=1, obj_format='parquet')
+        results = fexec.get_result(fs)
+
+        assert [row_groups for row_groups, _ in results] == [[0], [1], [2], [3]]
+        assert sum((ids for _, ids in results), []) == list(range(1000))
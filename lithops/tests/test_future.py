@@ -1,6 +1,9 @@
+import os
 import pytest
 
 import lithops
+from lithops.constants import LOGS_DIR
+from lithops.future import LOGS_WRITER
 
 
 class HasAmbiguousTruthValue:
@@ -24,3 +27,44 @@ def test_fn_returns_obj_with_ambiguous_truth_value():
     future = fexec.call_async(returns_obj_with_ambiguous_truth_value, "Hello World!")
     result = future.result()
     assert result.data == "Hello World!"
+
+
+def print_random_data(size):
+    import os
+    print('BEGIN')
+    print(os.urandom(size).hex())
+    print('END')
+    return size
+
+
+def test_logs_are_fetched_lazily():
+    fexec = lithops.FunctionExecutor(config=pytest.lithops_config, log_level=None)
+    small, large = fexec.map(print_random_data, [10, 4096])
+    fexec.wait()
+
+    assert 'logs' in small._call_status
+    assert 'logs_key' in large._call_status and 'logs' not in large._call_status
+    assert 'BEGIN' in large.logs and 'END' in large.logs
+    assert large._call_status['logs_size'] > 8192
+
+
+def test_large_logs_are_written_to_the_job_log_file():
+    fexec = lithops.FunctionExecutor(config=pytest.lithops_config, log_level=None)
+    future = fexec.call_async(print_random_data, 4096)
+    fexec.wait()
+    LOGS_WRITER.queue.join()
+
+    assert 'logs_key' in future._call_status
+    with open(os.path.join(LOGS_DIR, future.job_key + '.log')) as lf:
+        job_logs = lf.read()
+    assert 'BEGIN' in job_logs and 'END' in job_logs
+
+
+def test_logs_are_truncated():
+    config = {**pytest.lithops_config, 'lithops': {**pytest.lithops_config['lithops'], 'max_log_size': 0.001}}
+    fexec = lithops.FunctionExecutor(config=config, log_level=None)
+    future = fexec.call_async(print_random_data, 4096)
+    fexec.wait()
+
+    assert 'BEGIN' not in future.logs
+    assert future.logs.startswith('[...') and 'END' in future.logs
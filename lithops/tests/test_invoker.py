@@ -0,0 +1,409 @@
+#
+# Unit tests for the FaaS invoker. No compute backend required;
+# invocations are run against a simulated backend that enforces a
+# concurrency quota, and the localhost storage backend.
+#
+
+import json
+import pytest
+import time
+import queue
+import pickle
+import threading
+from types import SimpleNamespace
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from lithops.config import extract_storage_config
+from lithops.storage import InternalStorage
+from lithops.serverless import ServerlessHandler
+from lithops.utils import create_executor_id
+from lithops.future import ResponseFuture
+from lithops import invokers
+from lithops.invokers import InvocationController, FaaSInvoker, ChunksizeTuner
+from lithops.worker import handler
+
+
+class SimulatedBackend:
+    """FaaS backend that throttles invocations above `quota` running workers"""
+
+    def __init__(self, controller, quota, duration=0.02):
+        self.controller = controller
+        self.quota = quota
+        self.duration = duration
+        self.running = 0
+        self.peak_running = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _finish(self):
+        with self.lock:
+            self.running -= 1
+        self.controller.release()
+
+    def invoke(self):
+        with self.lock:
+            if self.running >= self.quota:
+                self.throttled += 1
+                return None
+            self.running += 1
+            self.peak_running = max(self.peak_running, self.running)
+        self.controller.on_worker_started()
+        threading.Timer(self.duration, self._finish).start()
+        return 'activation-id'
+
+
+def _run_tasks(controller, backend, total_tasks):
+    pending = queue.Queue()
+    for i in range(total_tasks):
+        pending.put(i)
+    done = []
+
+    def invoke_task(task):
+        start = time.time()
+        if backend.invoke():
+            controller.on_invoked(time.time() - start)
+            done.append(task)
+        else:
+            controller.on_throttled(start)
+            pending.put(task)
+
+    with ThreadPoolExecutor(16) as executor:
+        while len(done) < total_tasks:
+            try:
+                task = pending.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            assert controller.acquire(timeout=10)
+            executor.submit(invoke_task, task)
+
+    return done
+
+
+class TestInvocationController:
+
+    def test_starts_at_max_limit(self):
+        controller = InvocationController(max_limit=100)
+        assert controller.current_limit == 100
+        assert controller.free_slots() == 100
+
+    def test_multiplicative_decrease_on_throttle(self):
+        controller = InvocationController(max_limit=100)
+        for _ in range(40):
+            assert controller.try_acquire()
+        controller.on_throttled()
+        assert controller.current_limit == 19
+        assert controller.in_flight == 39
+
+    def test_throttles_of_same_congestion_event_decrease_once(self):
+        controller = InvocationController(max_limit=100)
+        for _ in range(80):
+            controller.try_acquire()
+        invoke_tstamp = time.time()
+        for _ in range(10):
+            controller.on_throttled(invoke_tstamp)
+        assert controller.current_limit == 39
+        controller.on_throttled()
+        assert controller.current_limit == 19
+
+    def test_additive_increase_on_worker_start(self):
+        controller = InvocationController(max_limit=100, initial_limit=10)
+        controller.on_worker_started(10)
+        assert controller.current_limit == 10
+        controller.on_worker_started(2)
+        assert controller.current_limit == 11
+
+    def test_no_increase_when_latency_degraded(self):
+        controller = InvocationController(max_limit=100, initial_limit=10)
+        controller.on_invoked(0.01)
+        for _ in range(20):
+            controller.on_invoked(1)
+        controller.on_worker_started(50)
+        assert controller.current_limit == 10
+
+    def test_backoff_after_throttle(self):
+        controller = InvocationController(max_limit=10, max_backoff=0.2)
+        controller.try_acquire()
+        controller.on_throttled()
+        assert not controller.try_acquire()
+        start = time.time()
+        assert controller.acquire(timeout=2)
+        assert time.time() - start >= 0.05
+
+    def test_stop_unblocks_acquire(self):
+        controller = InvocationController(max_limit=1)
+        controller.try_acquire()
+        threading.Timer(0.1, controller.stop).start()
+        assert controller.acquire() is False
+
+    def test_limit_change_is_exposed(self):
+        changes = []
+        controller = InvocationController(max_limit=50, on_limit_change=changes.append)
+        for _ in range(50):
+            controller.try_acquire()
+        controller.on_throttled()
+        assert changes == [24]
+        metrics = controller.get_metrics()
+        assert metrics['concurrency_limit'] == 24
+        assert metrics['throttled'] == 1
+
+    def test_adapts_to_backend_quota(self):
+        controller = InvocationController(max_limit=200, max_backoff=0.5)
+        backend = SimulatedBackend(controller, quota=10)
+
+        done = _run_tasks(controller, backend, total_tasks=300)
+
+        assert sorted(done) == list(range(300))
+        assert backend.peak_running <= backend.quota
+        # the controller converges around the quota instead of
+        # hammering the backend with throttled invocations
+        assert backend.throttled < 60
+        assert controller.current_limit <= 2 * backend.quota
+
+
+class PayloadBackend:
+    """FaaS backend that records the JSON-encoded payloads"""
+
+    def __init__(self):
+        self.type = 'faas'
+        self.payloads = []
+
+    def invoke(self, runtime_name, runtime_memory, payload):
+        self.payloads.append(json.loads(json.dumps(payload)))
+        return 'activation-id'
+
+    def get_runtime_info(self):
+        return {'runtime_name': 'test-runtime', 'runtime_memory': 256,
+                'runtime_timeout': 600, 'max_workers': 10}
+
+
+class FailingBackend(PayloadBackend):
+    """
+    FaaS backend whose first `failures` invocations raise an exception.
+    The activations finish right away, and free their slots in the controller
+    """
+
+    def __init__(self, failures, controller, error=None):
+        super().__init__()
+        self.failures = failures
+        self.controller = controller
+        self.error = error or ConnectionError('Connection reset by peer')
+
+    def invoke(self, runtime_name, runtime_memory, payload):
+        if self.failures > 0:
+            self.failures -= 1
+            raise self.error
+        activation_id = super().invoke(runtime_name, runtime_memory, payload)
+        threading.Timer(0.01, self.controller.release).start()
+        return activation_id
+
+
+class NoMonitor:
+    def start(self, *args, **kwargs):
+        pass
+
+
+def _create_invoker_and_job(total_calls, **job_args):
+    config = {
+        'lithops': {'mode': 'serverless', 'backend': 'test', 'storage': 'localhost'},
+        'test': {'invoke_pool_threads': 4, 'secret': 'x' * 1000},
+        'localhost': {'storage_bucket': 'storage'}
+    }
+    internal_storage = InternalStorage(extract_storage_config(config))
+    backend = PayloadBackend()
+    compute_handler = ServerlessHandler.__new__(ServerlessHandler)
+    compute_handler.backend = backend
+
+    executor_id = create_executor_id()
+    invoker = FaaSInvoker(config, executor_id, internal_storage, compute_handler, NoMonitor())
+    invoker.sync = True
+
+    job_key = f'{executor_id}-M000'
+    func_key = f'lithops.jobs/{executor_id}/test.func.pickle'
+    data_key = f'lithops.jobs/{job_key}/aggdata.pickle'
+    internal_storage.put_func(func_key, pickle.dumps({'func': 'test-func'}))
+    internal_storage.put_data(data_key, b''.join(b'%03d' % i for i in range(total_calls)))
+
+    job = SimpleNamespace(
+        executor_id=executor_id, job_id='M000', job_key=job_key,
+        function_name='test', func_key=func_key, data_key=data_key,
+        data_byte_ranges=[(i * 3, i * 3 + 2) for i in range(total_calls)],
+        extra_env={}, total_calls=total_calls, chunksize=2, execution_timeout=600,
+        runtime_name='test-runtime', runtime_memory=256, worker_processes=1, profile=None,
+        trace_context=None, metadata={}
+    )
+    job.__dict__.update(job_args)
+
+    return config, backend, invoker, job
+
+
+class TestJobManifest:
+
+    def _invoke(self, total_calls):
+        config, backend, invoker, job = _create_invoker_and_job(total_calls)
+        invoker._invoke_job(job)
+        invoker.stop()
+
+        return config, backend.payloads
+
+    def test_payloads_do_not_carry_the_config(self):
+        config, payloads = self._invoke(total_calls=6)
+        assert len(payloads) == 3
+        for payload in payloads:
+            assert 'config' not in payload
+            assert 'secret' not in json.dumps(payload)
+            assert len(payload['call_ids']) == 2
+
+    def test_worker_rebuilds_job_from_manifest(self):
+        config, payloads = self._invoke(total_calls=4)
+        payload = sorted(payloads, key=lambda p: p['call_ids'])[1]
+
+        job = handler.create_job(payload)
+
+        assert job.config == config
+        assert job.call_ids == ['00002', '00003']
+        assert job.func == 'test-func'
+        assert job.data == [b'002', b'003']
+        assert job.total_calls == 4
+        assert payload['manifest_key'] in handler.JOB_MANIFEST_CACHE
+
+    def test_manifest_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(handler, 'JOB_MANIFEST_CACHE', OrderedDict())
+        storage = SimpleNamespace(get_job_manifest=lambda key: json.dumps({'key': key}))
+
+        for i in range(handler.JOB_MANIFEST_CACHE_SIZE + 2):
+            handler.get_job_manifest('manifest-0', storage)
+            handler.get_job_manifest(f'manifest-{i}', storage)
+
+        assert len(handler.JOB_MANIFEST_CACHE) == handler.JOB_MANIFEST_CACHE_SIZE
+        assert 'manifest-0' in handler.JOB_MANIFEST_CACHE
+        assert 'manifest-1' not in handler.JOB_MANIFEST_CACHE
+
+
+class TestInvokeErrors:
+
+    def test_failed_invocations_are_retried(self):
+        config, backend, invoker, job = _create_invoker_and_job(total_calls=6)
+        failing_backend = FailingBackend(failures=2, controller=invoker.invocation_controller)
+        invoker.compute_handler.backend = failing_backend
+        invoker._invoke_job(job)
+
+        deadline = time.time() + 10
+        while len(failing_backend.payloads) < 3 and time.time() < deadline:
+            time.sleep(0.05)
+        invoker.stop()
+
+        call_ids = sorted(sum((p['call_ids'] for p in failing_backend.payloads), []))
+        assert call_ids == ['{:05d}'.format(i) for i in range(6)]
+        time.sleep(0.1)
+        # The slots of the failed invocations were returned
+        assert invoker.invocation_controller.in_flight == 0
+        assert invoker.invocation_controller.total_throttled == 2
+
+    def test_permanent_errors_fail_the_calls(self):
+        config, backend, invoker, job = _create_invoker_and_job(total_calls=2, chunksize=1)
+        job.futures = [ResponseFuture(f'{i:05d}', job, {}, extract_storage_config(config)) for i in range(2)]
+        error = ValueError('Runtime not found')
+        invoker.compute_handler.backend = FailingBackend(1, invoker.invocation_controller, error)
+        invoker._invoke_job(job)
+        invoker.stop()
+
+        failed = [f for f in job.futures if f.ready]
+        assert len(failed) == 1
+        with pytest.raises(ValueError):
+            failed[0].status()
+        assert invoker.invocation_controller.total_throttled == 0
+
+    def test_transient_errors_are_retried_a_limited_number_of_times(self, monkeypatch):
+        monkeypatch.setattr(invokers, 'INVOKE_RETRIES', 2)
+        config, backend, invoker, job = _create_invoker_and_job(total_calls=2, chunksize=1)
+        job.futures = [ResponseFuture(f'{i:05d}', job, {}, extract_storage_config(config)) for i in range(2)]
+        invoker.compute_handler.backend = FailingBackend(100, invoker.invocation_controller)
+        invoker._invoke_job(job)
+
+        deadline = time.time() + 10
+        while not all(f.ready for f in job.futures) and time.time() < deadline:
+            time.sleep(0.05)
+        invoker.stop()
+
+        for f in job.futures:
+            with pytest.raises(ConnectionError):
+                f.status()
+        assert invoker.invocation_controller.total_throttled == 4
+        assert invoker.invocation_controller.in_flight == 0
+
+
+def _probe_call_status(overhead, exec_time):
+    return {'host_submit_tstamp': 100, 'worker_end_tstamp': 100 + overhead + exec_time,
+            'worker_func_exec_time': exec_time}
+
+
+class TestChunksizeAuto:
+
+    def test_choose_chunksize(self):
+        job = SimpleNamespace(total_calls=1000)
+        tuner = ChunksizeTuner(job, target_duration=5, max_workers=10)
+        assert tuner.probe_calls == ChunksizeTuner.PROBE_CALLS
+
+        # (5s target - 1s overhead) / 0.5s per call
+        probes = [_probe_call_status(1, 0.5), _probe_call_status(1, 0.5), _probe_call_status(3, 2)]
+        assert tuner.choose_chunksize(probes, 996) == 8
+        assert tuner.decision['host_job_chunksize'] == 8
+        assert tuner.decision['host_job_chunksize_activation_overhead'] == 1
+        assert tuner.decision['host_job_chunksize_call_exec_time'] == 0.5
+
+        # Chunks are not bigger than the calls per worker
+        assert tuner.choose_chunksize([_probe_call_status(0.5, 0.001)], 996) == 100
+        # Slow calls, or no probe finished, run one call per activation
+        assert tuner.choose_chunksize([_probe_call_status(1, 10)], 996) == 1
+        assert tuner.choose_chunksize([], 996) == 1
+        assert tuner.decision['host_job_chunksize_probes_done'] == 0
+
+    def test_probe_wave_and_rechunk(self):
+        config, backend, invoker, job = _create_invoker_and_job(40, auto_chunksize=True)
+        config['lithops']['chunksize_target_duration'] = 5
+        invoker._invoke_job(job)
+
+        # Only the probe wave is invoked, one call per activation
+        probes = ChunksizeTuner.PROBE_CALLS
+        assert sorted(p['call_ids'][0] for p in backend.payloads) == ['{:05d}'.format(i) for i in range(probes)]
+        assert all(p['chunksize'] == 1 for p in backend.payloads)
+
+        # The probes finish, and the monitor frees their slots
+        job.futures = [SimpleNamespace(_call_status=None, stats={}) for _ in range(job.total_calls)]
+        for f in job.futures[:probes]:
+            f._call_status = _probe_call_status(1, 0.5)
+        invoker.invocation_controller.release(probes)
+
+        deadline = time.time() + 10
+        while len(backend.payloads) < probes + 9 and time.time() < deadline:
+            time.sleep(0.05)
+        invoker.stop()
+
+        # The target duration allows 8 calls per activation, but the
+        # remaining 36 calls are spread over the 10 workers
+        chunks = sorted(p['call_ids'] for p in backend.payloads[probes:])
+        assert [len(c) for c in chunks] == [4] * 9
+        assert sorted(sum(chunks, [])) == ['{:05d}'.format(i) for i in range(probes, 40)]
+        assert job.metadata['host_job_chunksize'] == 4
+        assert job.futures[0].stats['host_job_chunksize'] == 4
+        assert invoker.chunksize_tuners[job.job_key].chunksizes['00039'] == 4
+
+    def test_tuning_keeps_the_pending_queue_order(self):
+        config, backend, invoker, job = _create_invoker_and_job(40, auto_chunksize=True)
+        tuner = ChunksizeTuner(job, target_duration=5, max_workers=10)
+        other_job = SimpleNamespace(job_key='other')
+        queued = [(other_job, [0, 1]), (job, range(3, 4)), (other_job, [2, 3])]
+        for item in queued:
+            invoker.pending_calls_q.put(item)
+
+        job.futures = [SimpleNamespace(_call_status=None, stats={}) for _ in range(job.total_calls)]
+        for f in job.futures[:tuner.probe_calls]:
+            f._call_status = _probe_call_status(1, 0.5)
+        invoker.should_run = True
+        invoker._tune_chunksize(job, tuner)
+
+        pending = list(invoker.pending_calls_q.queue)
+        assert pending[:3] == queued
+        assert all(pending_job is job for pending_job, _ in pending[3:])
+        assert sorted(sum((list(r) for _, r in pending[3:]), [])) == list(range(tuner.probe_calls, 40))
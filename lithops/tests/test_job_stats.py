@@ -0,0 +1,110 @@
+#
+# Tests for the columnar job stats table.
+#
+
+import csv
+import json
+import sys
+import math
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from lithops import FunctionExecutor
+from lithops.job.stats import JobStatsTable, get_job_stats
+from lithops.tests.functions import simple_map_function
+
+
+def call_stats(i, exec_time, cold_start):
+    return {
+        'host_submit_tstamp': 100.0,
+        'worker_start_tstamp': 100.0 + i,
+        'worker_func_start_tstamp': 100.5 + i,
+        'worker_func_exec_time': exec_time,
+        'worker_end_tstamp': 101.0 + i + exec_time,
+        'worker_cold_start': cold_start,
+        'func_result_size': 10
+    }
+
+
+@pytest.fixture
+def stats_table():
+    table = JobStatsTable()
+    for i in range(10):
+        table.add('A000-M000', f'{i:05d}', call_stats(i, 10.0 if i == 9 else 1.0, i < 2))
+    return table
+
+
+class TestJobStatsTable:
+
+    def test_columns(self, stats_table):
+        assert len(stats_table) == 10
+        assert list(stats_table.column('worker_start_tstamp')) == [100.0 + i for i in range(10)]
+        assert all(math.isnan(v) for v in stats_table.column('host_status_done_tstamp'))
+
+    def test_rows_are_updated(self, stats_table):
+        stats_table.add('A000-M000', '00003', {'host_status_done_tstamp': 200.0})
+        stats_table.add('A000-M000', '00010', {'host_status_done_tstamp': 300.0})
+
+        assert len(stats_table) == 11
+        assert stats_table.column('worker_start_tstamp')[3] == 103.0
+        assert stats_table.column('host_status_done_tstamp')[3] == 200.0
+        assert math.isnan(stats_table.column('worker_start_tstamp')[10])
+
+    def test_summary(self, stats_table):
+        summary = stats_table.summary(percentiles=(50, 100))
+
+        assert summary['calls'] == 10
+        assert summary['latencies']['queueing_delay'] == {50: 4.5, 100: 9.0}
+        assert summary['latencies']['exec_time'] == {50: 1.0, 100: 10.0}
+        assert summary['stragglers'] == 1
+        assert stats_table.stragglers() == [('A000-M000', '00009')]
+        assert summary['cold_starts']['cold']['count'] == 2
+        assert summary['cold_starts']['cold']['queueing_delay'][100] == 1.0
+        assert summary['cold_starts']['warm']['count'] == 8
+
+    def test_exports(self, stats_table, tmp_path):
+        stats_table.to_csv(tmp_path / 'stats.csv')
+        with open(tmp_path / 'stats.csv') as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 10
+        assert rows[2]['call_id'] == '00002'
+        assert float(rows[2]['worker_start_tstamp']) == 102.0
+
+        stats_table.to_json(tmp_path / 'stats.json')
+        with open(tmp_path / 'stats.json') as f:
+            data = json.load(f)
+        assert data['worker_func_exec_time'][9] == 10.0
+
+    def test_concurrent_add(self):
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            def add_call(i):
+                stats = {f'stat_{i % 50}': float(i), 'call': float(i)}
+                get_job_stats('A000-M001').add('A000-M001', f'{i:05d}', stats)
+
+            with ThreadPoolExecutor(16) as pool:
+                list(pool.map(add_call, range(2000)))
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+        table = get_job_stats('A000-M001')
+        assert len(table) == 2000
+        assert all(len(column) == 2000 for column in table.columns.values())
+        calls = table.column('call')
+        assert all(calls[table.index[('A000-M001', f'{i:05d}')]] == i for i in range(2000))
+
+
+class TestExecutorJobStats:
+
+    def test_job_stats(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        fexec.map(simple_map_function, [(1, 2), (3, 4), (5, 6)])
+        fexec.get_result()
+
+        stats_table = fexec.job_stats()
+        assert len(stats_table) == 3
+        assert stats_table is fexec.job_stats(fexec.futures)
+        summary = stats_table.summary()
+        assert summary['calls'] == 3
+        assert not math.isnan(summary['latencies']['status_fetch_latency'][50])
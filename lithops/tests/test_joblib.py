@@ -0,0 +1,60 @@
+#
+# Tests for the joblib backend.
+#
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+from lithops.tests.functions import add_length
+
+lithops_backend = pytest.importorskip('lithops.util.joblib.lithops_backend')
+SHARE_MIN_SIZE = lithops_backend.SHARE_MIN_SIZE
+
+
+class TestJoblib:
+
+    def test_find_shared_objects(self):
+        data = b'x' * SHARE_MIN_SIZE
+        small = b'small'
+        calls = [(add_length, (i, data, small), {'other': bytes(bytearray(data))}) for i in range(3)]
+        calls.append((add_length, (3, b'y' * SHARE_MIN_SIZE, small), {}))
+
+        broadcasted = []
+
+        def broadcast(obj):
+            broadcasted.append(obj)
+            return f'handle-{len(broadcasted)}'
+
+        with ThreadPoolExecutor(2) as thread_pool:
+            calls = lithops_backend.find_shared_objects(calls, broadcast, thread_pool)
+
+        # The same object and the objects with the same content are broadcast
+        # once, the small and the unique objects are passed as they are
+        assert broadcasted == [data]
+        assert calls[0][1] == (0, 'handle-1', small)
+        assert calls[0][2] == {'other': 'handle-1'}
+        assert calls[0][3] == [1, 'other']
+        assert calls[3] == (add_length, (3, b'y' * SHARE_MIN_SIZE, small), {})
+
+    def test_batch_size(self):
+        backend = lithops_backend.LithopsBackend(target_batch_duration=5)
+        backend._n_jobs = 10
+        assert backend.get_batch_size(100) == 10
+        backend.batch_completed_calls(10, 10)
+        assert backend.get_batch_size(100) == 5
+        backend.batch_completed_calls(10, 1000)
+        assert backend.get_batch_size(100) == 1
+
+    def test_parallel(self):
+        import joblib
+        from lithops.multiprocessing import config as mp_config
+
+        lithops_backend.register_lithops()
+        mp_config.set_parameter(mp_config.LITHOPS_CONFIG, {'config': pytest.lithops_config})
+        data = b'x' * SHARE_MIN_SIZE
+        try:
+            with joblib.parallel_backend('lithops'):
+                results = joblib.Parallel(n_jobs=2)(joblib.delayed(add_length)(i, data) for i in range(10))
+            assert results == [i + len(data) for i in range(10)]
+        finally:
+            mp_config.set_parameter(mp_config.LITHOPS_CONFIG, {})
@@ -0,0 +1,138 @@
+#
+# Tests for the worker JobRunner modes (jobrunner_mode config key).
+#
+
+import os
+import copy
+import time
+import pytest
+from types import SimpleNamespace
+
+from lithops import FunctionExecutor
+from lithops.worker import handler
+from lithops.tests.functions import simple_map_function
+
+
+def raise_exception(x):
+    raise ValueError(f'Error in call {x}')
+
+
+def sleep_function(x):
+    time.sleep(x)
+    return x
+
+
+@pytest.mark.parametrize("jobrunner_mode", ['process', 'reuse', 'thread'])
+class TestJobRunnerModes:
+
+    def _create_executor(self, jobrunner_mode):
+        config = copy.deepcopy(pytest.lithops_config)
+        config['lithops']['jobrunner_mode'] = jobrunner_mode
+        return FunctionExecutor(config=config)
+
+    def test_map(self, jobrunner_mode):
+        fexec = self._create_executor(jobrunner_mode)
+        fexec.map(simple_map_function, [(1, 2), (3, 4), (5, 6)])
+        assert fexec.get_result() == [3, 7, 11]
+
+        stats = fexec.futures[0].stats
+        assert 'worker_peak_memory_delta' in stats
+        assert 'worker_func_cpu_usage' in stats
+
+    def test_exception(self, jobrunner_mode):
+        fexec = self._create_executor(jobrunner_mode)
+        fexec.call_async(raise_exception, 1)
+        with pytest.raises(ValueError):
+            fexec.get_result()
+
+    def test_timeout(self, jobrunner_mode):
+        fexec = self._create_executor(jobrunner_mode)
+        fexec.call_async(sleep_function, 10, timeout=1)
+        with pytest.raises(TimeoutError):
+            fexec.get_result()
+
+
+class FakeCallStatus:
+
+    def add(self, key, value):
+        pass
+
+
+class FakeReusableJobRunner:
+    instances = []
+
+    def __init__(self, job_key):
+        self.job_key = job_key
+        self.terminated = False
+        self.tasks = []
+        self.process = SimpleNamespace(pid=os.getpid())
+        self.instances.append(self)
+
+    def is_alive(self):
+        return not self.terminated
+
+    def terminate(self):
+        self.terminated = True
+
+    def run(self, task):
+        self.tasks.append(task)
+        return True
+
+
+def test_reused_process_is_not_shared_across_jobs(monkeypatch):
+    monkeypatch.setattr(handler, 'ReusableJobRunner', FakeReusableJobRunner)
+    monkeypatch.setattr(handler, 'REUSABLE_JOBRUNNER', None)
+
+    for job_key in ['exec-M000', 'exec-M000', 'exec-M001']:
+        handler.run_jobrunner_reused_process(SimpleNamespace(job_key=job_key), FakeCallStatus())
+
+    first, second = FakeReusableJobRunner.instances
+    assert (first.job_key, len(first.tasks), first.terminated) == ('exec-M000', 2, True)
+    assert (second.job_key, len(second.tasks), second.terminated) == ('exec-M001', 1, False)
+
+
+def test_reused_process_is_monitored(monkeypatch):
+    monitored = []
+
+    class FakeSystemMonitor(handler.SystemMonitor):
+        def start(self):
+            monitored.append(self.process_id)
+            super().start()
+
+    def start_child_process(job_key):
+        jobrunner = FakeReusableJobRunner(job_key)
+        jobrunner.process = handler._MP_CTX.Process(target=time.sleep, args=(5,), daemon=True)
+        jobrunner.process.start()
+        return jobrunner
+
+    monkeypatch.setattr(handler, 'SystemMonitor', FakeSystemMonitor)
+    monkeypatch.setattr(handler, 'ReusableJobRunner', start_child_process)
+    monkeypatch.setattr(handler, 'REUSABLE_JOBRUNNER', None)
+
+    handler.run_jobrunner_reused_process(SimpleNamespace(job_key='exec-M000'), FakeCallStatus())
+    child = handler.REUSABLE_JOBRUNNER.process
+    child.terminate()
+
+    assert monitored == [child.pid] and child.pid != os.getpid()
+
+
+class FakeInternalStorage:
+
+    def __init__(self):
+        self.client = 'parent'
+
+    def reset_client(self):
+        self.client = f'child-{os.getpid()}'
+
+
+def test_forked_jobrunner_has_its_own_client():
+    handler_conn, jobrunner_conn = handler._MP_CTX.Pipe()
+    jobrunner = SimpleNamespace(internal_storage=FakeInternalStorage())
+    jobrunner.run = lambda: jobrunner_conn.send(jobrunner.internal_storage.client)
+
+    process = handler._MP_CTX.Process(target=handler.run_forked_jobrunner, args=(jobrunner,))
+    process.start()
+    process.join()
+
+    assert handler_conn.recv() == f'child-{process.pid}'
+    assert jobrunner.internal_storage.client == 'parent'
@@ -25,6 +25,9 @@ from lithops.tests.functions import (
     lithops_return_futures_call_async,
     lithops_return_futures_map_multiple,
     concat,
+    add_one,
+    double,
+    double_with_id,
 )
 
 
@@ -44,6 +47,13 @@ class TestMap:
         result = fexec.get_result()
         assert result == [2, 4, 6, 8]
 
+    def test_chunksize_auto(self):
+        iterdata = [(1, 1), (2, 2), (3, 3), (4, 4)]
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fexec.map(simple_map_function, iterdata, chunksize='auto')
+        result = fexec.get_result()
+        assert result == [2, 4, 6, 8]
+
     def test_range_iterdata(self):
         fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
         generator_iterdata = range(2)
@@ -126,6 +136,31 @@ class TestMap:
         result = fexec.get_result()
         assert result == [1, 2, 3, 1, 2, 3]
 
+    def test_lazy_pipeline(self):
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fs = fexec.map(simple_map_function, [(1, 1), (2, 2), (3, 3)], lazy=True).map(add_one).map(double)
+        assert len(fs) == 0
+        result = fs.get_result()
+        assert result == [6, 10, 14]
+        assert len(fexec.futures) == 3
+        assert fexec.futures[0].function_name == 'simple_map_function+add_one+double'
+
+    def test_lazy_pipeline_boundaries(self):
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fs = fexec.map(add_one, [1, 2], lazy=True).map(double).map(double_with_id) \
+            .map(add_one).map(double, runtime_memory=512)
+        result = fexec.get_result(fs)
+        assert result == [18, 26]
+        assert [f.function_name for f in fexec.futures[::2]] == ['add_one+double', 'double_with_id+add_one', 'double']
+
+    def test_map_over_lazy_futures(self):
+        fexec = lithops.FunctionExecutor(config=pytest.lithops_config)
+        fs = fexec.map(add_one, [1, 2, 3], lazy=True)
+        gs = fexec.map(double, fs)
+        assert len(gs) == 3
+        assert fexec.get_result(gs) == [4, 6, 8]
+        assert fexec.get_result() == [4, 6, 8]
+
     def test_lithops_return_futures_map_over_decorator(self):
         def doubled(f):
             def wrapper(*args, **kwargs):
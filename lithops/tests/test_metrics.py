@@ -0,0 +1,97 @@
+#
+# Unit tests for the buffered Prometheus metrics exporter.
+#
+
+import os
+import time
+import multiprocessing as mp
+
+from lithops.util import metrics
+from lithops.util.metrics import MetricsFlusher, PrometheusExporter, send_samples
+
+
+def read_metrics(textfile):
+    with open(textfile) as f:
+        return [line for line in f.read().splitlines() if not line.startswith('#')]
+
+
+def send_and_exit(textfile_dir):
+    flusher = MetricsFlusher(textfile_dir=textfile_dir, flush_interval=60)
+    flusher.add('function_end', 1, 'gauge', (('job', 'lithops'),))
+
+
+class TestMetricsFlusher:
+
+    def test_aggregates_counters_and_gauges(self, tmp_path):
+        flusher = MetricsFlusher(textfile_dir=str(tmp_path), flush_interval=60)
+        labels = (('job', 'lithops'), ('job_id', 'A000-M000'))
+        for i in range(5):
+            flusher.add('calls_done', 1, 'counter', labels)
+            flusher.add('last_call', i, 'gauge', labels)
+        flusher.flush()
+        flusher.add('calls_done', 2, 'counter', labels)
+        flusher.close()
+
+        metrics = read_metrics(flusher.textfile)
+        assert 'calls_done{job="lithops",job_id="A000-M000"} 7' in metrics
+        assert 'last_call{job="lithops",job_id="A000-M000"} 4' in metrics
+        assert 'lithops_metrics_dropped_samples_total 0' in metrics
+
+    def test_full_buffer_drops_samples(self, tmp_path):
+        flusher = MetricsFlusher(textfile_dir=str(tmp_path), flush_interval=60, max_queue_size=2)
+        start = time.time()
+        for i in range(1000):
+            flusher.add('function_start', i, 'gauge', (('call_id', str(i)),))
+        assert time.time() - start < 1
+        flusher.close()
+
+        metrics = read_metrics(flusher.textfile)
+        assert len(metrics) == 3
+        assert 'lithops_metrics_dropped_samples_total 998' in metrics
+
+    def test_flushes_in_background(self, tmp_path):
+        flusher = MetricsFlusher(textfile_dir=str(tmp_path), flush_interval=0.1)
+        flusher.add('function_start', 1, 'gauge', ())
+        time.sleep(0.5)
+        assert read_metrics(flusher.textfile) == ['function_start{} 1', 'lithops_metrics_dropped_samples_total 0']
+        flusher.close()
+
+    def test_flushes_on_process_exit(self, tmp_path):
+        p = mp.get_context('fork').Process(target=send_and_exit, args=(str(tmp_path),))
+        p.start()
+        p.join()
+        assert read_metrics(os.path.join(tmp_path, f'lithops-{p.pid}.prom'))[0] == 'function_end{job="lithops"} 1'
+
+    def test_exporters_share_the_flusher(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('__LITHOPS_SESSION_ID', 'A000-0')
+        config = {'textfile_dir': str(tmp_path)}
+        exporter1 = PrometheusExporter(True, config)
+        exporter2 = PrometheusExporter(True, config)
+        assert exporter1.flusher is exporter2.flusher
+        assert PrometheusExporter(False, config).flusher is None
+
+    def test_pushes_counter_totals(self, monkeypatch):
+        pushed = []
+        monkeypatch.setattr(metrics.requests, 'post', lambda url, data, timeout: pushed.append(data))
+        flusher = MetricsFlusher(apigateway='http://gateway', flush_interval=60)
+        labels = (('job', 'lithops'),)
+        flusher.add('calls_done', 2, 'counter', labels)
+        flusher.flush()
+        flusher.add('calls_done', 3, 'counter', labels)
+        flusher.close()
+
+        assert pushed == ['# TYPE calls_done counter\ncalls_done 2\n', '# TYPE calls_done counter\ncalls_done 5\n']
+
+    def test_forwarded_samples(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('__LITHOPS_SESSION_ID', 'A000-0')
+        config = {'textfile_dir': str(tmp_path)}
+        exporter = PrometheusExporter(True, config, forward=True)
+        exporter.send_metric('function_end', 1, 'gauge', (('job_id', 'A000-M000'),))
+        assert exporter.flusher is None
+        assert exporter.samples == [('function_end', 1, 'gauge', (('job', 'lithops'), ('instance', 'A000'), ('job_id', 'A000-M000')))]
+        assert PrometheusExporter(False, config, forward=True).samples == []
+
+        send_samples(config, exporter.samples)
+        flusher = metrics.get_metrics_flusher(config)
+        flusher.flush()
+        assert read_metrics(flusher.textfile)[0] == 'function_end{job="lithops",instance="A000",job_id="A000-M000"} 1'
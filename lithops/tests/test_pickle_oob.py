@@ -0,0 +1,59 @@
+#
+# Tests for the serialization with out-of-band buffers.
+#
+
+import io
+import pickle
+import pytest
+
+from lithops import FunctionExecutor
+from lithops.utils import dumps_oob, loads_oob, read_into_buffer, PICKLE_OOB_MIN_SIZE
+from lithops.tests.functions import mark_buffer
+
+
+class TestPickleOOB:
+
+    def test_round_trip(self):
+        data = bytearray(b'lithops' * PICKLE_OOB_MIN_SIZE)
+        small = bytearray(b'small')
+        segments = dumps_oob({'data': pickle.PickleBuffer(data), 'small': pickle.PickleBuffer(small)})
+        # Header, pickle stream and the large buffer, the small one is in-band
+        assert len(segments) == 3
+        assert segments[2].nbytes == len(data)
+        obj = loads_oob(b''.join(segments))
+        assert obj['data'] == data
+        assert obj['small'] == small
+
+    def test_zero_copy(self):
+        data = bytearray(b'lithops' * PICKLE_OOB_MIN_SIZE)
+        serialized = bytearray(b''.join(dumps_oob(pickle.PickleBuffer(data))))
+        obj = loads_oob(serialized)
+        # The buffer is unpickled as a view of the serialized data
+        assert obj.obj is serialized
+        assert obj == data
+        # Read-only data is copied, so the buffer is writable
+        obj = loads_oob(bytes(serialized))
+        obj[0] = 0
+        assert obj[1:] == data[1:]
+
+    def test_plain_pickle(self):
+        obj = {'a': [1, 2, 3], 'b': b'small'}
+        segments = dumps_oob(obj)
+        assert len(segments) == 1
+        assert pickle.loads(segments[0]) == obj
+        assert loads_oob(pickle.dumps(obj)) == obj
+
+    def test_read_into_buffer(self):
+        data = b'lithops' * 1000
+        assert read_into_buffer(io.BytesIO(data), len(data), chunk_size=100) == data
+        assert read_into_buffer(io.BytesIO(data), chunk_size=100) == data
+        assert read_into_buffer(io.BytesIO(data), len(data) + 10) == data
+
+    def test_large_buffers_job(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        iterdata = [bytearray(b'%d' % i * 4 * PICKLE_OOB_MIN_SIZE) for i in range(3)]
+        fs = fexec.map(mark_buffer, [pickle.PickleBuffer(data) for data in iterdata])
+        results = fexec.get_result(fs)
+        for data, result in zip(iterdata, results):
+            assert result[0] == 255
+            assert result[1:] == data[1:]
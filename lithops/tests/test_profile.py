@@ -0,0 +1,78 @@
+#
+# Tests for the distributed profiling of function calls.
+#
+
+import pstats
+import pytest
+
+from lithops import FunctionExecutor
+from lithops.job.profile import JobProfile
+from lithops.worker.utils import CallProfiler, PROFILER_DISABLE_FUNC
+
+
+def inner(n):
+    return sum(range(n))
+
+
+def outer(n):
+    data = [bytes(1024) for _ in range(100)]
+    return inner(n) + len(data)
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+class TestJobProfile:
+
+    def test_merge_profiles(self):
+        job_profile = JobProfile()
+        for n in (1000, 2000):
+            profiler = CallProfiler(memory_top=5)
+            assert profiler.runcall(outer, n) == sum(range(n)) + 100
+            job_profile.add(profiler.dumps())
+
+        assert job_profile.calls == 2
+        functions = {func[2]: stats for func, stats in job_profile.stats.stats.items()}
+        assert functions['outer'][1] == 2 and functions['inner'][1] == 2
+        assert job_profile.memory_peak >= 100 * 1024
+        assert len(job_profile.memory_top(100)) <= 10
+
+        collapsed = job_profile.to_collapsed().splitlines()
+        assert any(line.startswith('outer (test_profile.py:17);inner (test_profile.py:13) ') for line in collapsed)
+        assert all(int(line.rsplit(' ', 1)[1]) > 0 for line in collapsed)
+        assert PROFILER_DISABLE_FUNC not in job_profile.stats.stats
+
+    def test_recursive_function(self):
+        job_profile = JobProfile()
+        profiler = CallProfiler()
+        assert profiler.runcall(fib, 15) == 610
+        job_profile.add(profiler.dumps())
+
+        collapsed = job_profile.to_collapsed().splitlines()
+        assert collapsed
+        assert all(line.startswith('fib (test_profile.py:') for line in collapsed)
+
+
+class TestExecutorJobProfile:
+
+    def test_job_profile(self, tmp_path):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        fexec.map(outer, [1000, 2000, 3000], profile=True)
+        fexec.get_result()
+
+        job_profile = fexec.job_profile()
+        assert job_profile.calls == 3
+        assert job_profile.memory_top() == []
+
+        job_profile.dump_stats(tmp_path / 'job.prof')
+        stats = pstats.Stats(str(tmp_path / 'job.prof'))
+        assert any(func[2] == 'inner' and func_stats[1] == 3 for func, func_stats in stats.stats.items())
+
+    def test_profile_disabled(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        future = fexec.call_async(outer, 1000)
+        future.result()
+
+        assert 'worker_profile_key' not in future.stats
+        assert fexec.job_profile().calls == 0
@@ -0,0 +1,64 @@
+#
+# Tests for the hash-partitioned shuffle of map_shuffle_reduce().
+#
+
+import pytest
+
+from lithops import FunctionExecutor
+from lithops.job.shuffle import ShuffleMapFunction, ShuffleReduceFunction, \
+    hash_partitioner, shuffle_partition_sizes
+from lithops.tests.functions import count_words, sum_counts
+
+
+class MemoryStorage:
+    bucket = 'bucket'
+
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket, key, body):
+        self.objects[key] = body
+
+    def get_object(self, bucket, key, extra_get_args={}):
+        start, end = map(int, extra_get_args['Range'][6:].split('-'))
+        return self.objects[key][start:end + 1]
+
+
+class TestShuffle:
+
+    def test_hash_partitioner(self):
+        assert hash_partitioner('word') == hash_partitioner(b'word') == 3287381265
+        assert hash_partitioner(('a', 1)) == hash_partitioner(('a', 1))
+        assert hash_partitioner(7) == 7
+
+    def test_shuffle_functions(self):
+        storage = MemoryStorage()
+        texts = ['a b c a', 'b c d', 'a a e']
+        map_function = ShuffleMapFunction(count_words, 2, hash_partitioner, 'ex', 'M000')
+        map_results = [map_function(text, storage=storage, id=i) for i, text in enumerate(texts)]
+
+        assert len(storage.objects) == 3
+        assert map_results[0]['key'] == 'lithops.jobs/ex-M000/00000/shuffle.pickle'
+        sizes = shuffle_partition_sizes(map_results, 2)
+        assert sum(sizes) == sum(len(obj) for obj in storage.objects.values())
+
+        reduce_function = ShuffleReduceFunction(sum_counts)
+        result = {}
+        for partition in range(2):
+            reduced = reduce_function(map_results, partition, storage)
+            assert all(hash_partitioner(word) % 2 == partition for word in reduced)
+            result.update(reduced)
+        assert result == {'a': 4, 'b': 2, 'c': 2, 'd': 1, 'e': 1}
+
+    def test_map_shuffle_reduce(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        texts = ['a b c a', 'b c d', 'a a e', 'f g a']
+        fs = fexec.map_shuffle_reduce(count_words, texts, sum_counts, num_partitions=3)
+        results = fexec.get_result(fs)
+
+        assert len(fs) == 7
+        assert len(results) == 3
+        word_counts = {}
+        for result in results:
+            word_counts.update(result)
+        assert word_counts == {'a': 5, 'b': 2, 'c': 2, 'd': 1, 'e': 1, 'f': 1, 'g': 1}
@@ -0,0 +1,71 @@
+#
+# Tests for the sample-based distributed sort.
+#
+
+import io
+import random
+import pytest
+from types import SimpleNamespace
+
+from lithops import FunctionExecutor
+from lithops.job import sort
+from lithops.job.sort import RecordFormat, SortSampleFunction, compute_splits
+
+
+class TestSortUtils:
+
+    def test_compute_splits(self):
+        assert compute_splits(list(range(100)), 4) == [25, 50, 75]
+        assert compute_splits([3, 1, 2], 1) == []
+        assert compute_splits([], 4) == []
+
+    def test_record_formats(self):
+        lines = RecordFormat(objects=True)
+        assert lines.parse(b'b\na\n\nc') == [b'b', b'a', b'', b'c']
+        assert lines.dump([b'a', b'b']) == b'a\nb\n'
+
+        fixed = RecordFormat(objects=True, record_size=3)
+        assert fixed.parse(b'abcdefgh') == [b'abc', b'def']
+        assert fixed.dump([b'abc', b'def']) == b'abcdef'
+
+        keys = RecordFormat(objects=False)
+        assert keys.parse(keys.dump([3, 1])) == [3, 1]
+
+    @pytest.mark.parametrize("record_size", [None, 6])
+    def test_sample_whole_chunk(self, monkeypatch, record_size):
+        monkeypatch.setattr(sort, 'SORT_SAMPLE_BYTES', 100)
+        data = b''.join(f'{i:05d}\n'.encode() for i in range(1000))
+        obj = SimpleNamespace(data_stream=io.BytesIO(data.rstrip(b'\n')))
+        sample = SortSampleFunction(None, RecordFormat(objects=True, record_size=record_size), 100)(obj)
+
+        records = set(data.split(b'\n')) if not record_size else \
+            {data[i:i + record_size] for i in range(0, len(data), record_size)}
+        assert len(sample) == 100 and set(sample) <= records
+        assert max(sample) > b'00500'
+
+
+class TestSort:
+
+    def test_sort_keys(self):
+        keys = [random.randint(0, 10000) for _ in range(500)]
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        fs = fexec.sort(keys, 3)
+        results = fexec.get_result(fs)
+
+        assert len(results) == 3
+        assert [k for result in results for k in result] == sorted(keys)
+
+    def test_sort_objects(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        bucket = fexec.storage.bucket
+        records = [f'{random.randint(0, 99999):05d},{i}'.encode() for i in range(2000)]
+        fexec.storage.put_object(bucket, 'test_sort/input.csv', b'\n'.join(records) + b'\n')
+
+        fs = fexec.sort([f'{bucket}/test_sort/input.csv'], 2, key=lambda r: r[:5],
+                        output_prefix='test_sort/output', obj_chunk_size=8192)
+        results = fexec.get_result(fs)
+
+        assert [r['key'] for r in results] == ['test_sort/output/part-00000', 'test_sort/output/part-00001']
+        assert sum(r['records'] for r in results) == 2000
+        output = b''.join(fexec.storage.get_object(bucket, r['key']) for r in results)
+        assert output.split(b'\n')[:-1] == sorted(records, key=lambda r: r[:5])
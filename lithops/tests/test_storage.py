@@ -19,6 +19,7 @@ import logging
 import lithops
 from io import BytesIO
 from lithops.config import extract_storage_config
+from lithops.storage import storage as storage_module
 from lithops.storage.utils import CloudObject, StorageNoSuchKeyError
 from lithops.tests.conftest import TESTS_PREFIX
 from lithops.tests.functions import my_map_function_storage, \
@@ -288,3 +289,47 @@ class TestStorage:
         self.storage.delete_cloudobjects(cloudobjects)
         all_bucket_keys = self.storage.list_keys(self.bucket)
         assert all(key not in all_bucket_keys for key in keys_to_delete)
+
+
+class TestStorageClientRegistry:
+
+    @classmethod
+    def setup_class(cls):
+        cls.storage_config = extract_storage_config(pytest.lithops_config)
+
+    def test_reuse_client(self):
+        storage1 = lithops.Storage(storage_config=self.storage_config, reuse_client=True)
+        storage2 = lithops.Storage(storage_config=self.storage_config, reuse_client=True)
+        storage3 = lithops.Storage(storage_config=self.storage_config)
+        assert storage1.storage_handler is storage2.storage_handler
+        assert storage3.storage_handler is not storage1.storage_handler
+
+    def test_bucket_checked_once(self, monkeypatch):
+        storage_module.CHECKED_BUCKETS.clear()
+        calls = []
+        original_create_bucket = storage_module.Storage.create_bucket
+
+        def create_bucket(storage, bucket):
+            calls.append(bucket)
+            return original_create_bucket(storage, bucket)
+
+        monkeypatch.setattr(storage_module.Storage, 'create_bucket', create_bucket)
+        for _ in range(3):
+            lithops.storage.InternalStorage(self.storage_config, reuse_client=True)
+        assert len(calls) == 1
+        lithops.storage.InternalStorage(self.storage_config)
+        assert len(calls) == 2
+
+    def test_forked_process_gets_its_own_client(self, monkeypatch):
+        storage1 = lithops.Storage(storage_config=self.storage_config, reuse_client=True)
+        monkeypatch.setattr(storage_module.os, 'getpid', lambda: -1)
+        storage2 = lithops.Storage(storage_config=self.storage_config, reuse_client=True)
+        assert storage2.storage_handler is not storage1.storage_handler
+
+    def test_reset_client(self):
+        storage1 = lithops.Storage(storage_config=self.storage_config, reuse_client=True)
+        handler = storage1.storage_handler
+        storage1.reset_client()
+        storage2 = lithops.Storage(storage_config=self.storage_config, reuse_client=True)
+        assert storage1.storage_handler is not handler
+        assert storage2.storage_handler is storage1.storage_handler
@@ -0,0 +1,80 @@
+#
+# Tests for the end-to-end tracing of jobs.
+#
+
+import os
+import json
+import pytest
+
+from lithops import FunctionExecutor
+
+
+def get_traceparent(x):
+    return os.environ.get('TRACEPARENT')
+
+
+def large_result(x):
+    return os.urandom(16 * 1024)
+
+
+def read_traces(trace_file):
+    with open(trace_file) as f:
+        return [json.loads(line) for line in f]
+
+
+def read_spans(trace_file):
+    return [span for trace in read_traces(trace_file)
+            for span in trace['resourceSpans'][0]['scopeSpans'][0]['spans']]
+
+
+class TestTracing:
+
+    def test_job_spans(self, tmp_path):
+        config = {**pytest.lithops_config,
+                  'lithops': {**pytest.lithops_config['lithops'], 'trace': True, 'trace_dir': str(tmp_path)}}
+        fexec = FunctionExecutor(config=config)
+        traceparents = fexec.map(get_traceparent, [1, 2]).get_result()
+
+        spans = read_spans(os.path.join(tmp_path, f'{fexec.executor_id}.json'))
+        job, = [span for span in spans if span['name'] == 'job']
+        calls = {span['spanId']: span for span in spans if span['name'] == 'call'}
+        assert len(calls) == 2
+        assert all(span['traceId'] == job['traceId'] for span in spans)
+        assert all(span['parentSpanId'] == job['spanId'] for span in calls.values())
+        assert {f"00-{job['traceId']}-{span_id}-01" for span_id in calls} == set(traceparents)
+
+        for call_span_id in calls:
+            names = {span['name'] for span in spans if span['parentSpanId'] == call_span_id}
+            assert {'invoke', 'queueing', 'function_download', 'data_download', 'worker_cold_start',
+                    'execution', 'status_detection'} <= names
+        assert int(job['endTimeUnixNano']) >= max(int(span['endTimeUnixNano']) for span in spans)
+
+    def test_jobs_are_written_once(self, tmp_path):
+        config = {**pytest.lithops_config,
+                  'lithops': {**pytest.lithops_config['lithops'], 'trace': True, 'trace_dir': str(tmp_path)}}
+        fexec = FunctionExecutor(config=config)
+        trace_file = os.path.join(tmp_path, f'{fexec.executor_id}.json')
+
+        fs = fexec.map(large_result, [1, 2])
+        fexec.get_result(fs)
+        fexec.tracer.add_futures(fs)
+        assert len(read_traces(trace_file)) == 1
+
+        # Result bigger than the ones inlined in the status, not done until downloaded
+        f = fexec.call_async(large_result, 3)
+        fexec.wait([f], download_results=False)
+        fexec.wait([f], download_results=False)
+        assert len(read_traces(trace_file)) == 1
+
+        fexec.tracer.close()
+        assert len(read_traces(trace_file)) == 2
+        assert len([span for span in read_spans(trace_file) if span['name'] == 'call']) == 3
+
+    def test_tracing_disabled(self):
+        fexec = FunctionExecutor(config=pytest.lithops_config)
+        future = fexec.call_async(get_traceparent, 1)
+
+        assert future.result() is None
+        assert future.trace_context is None
+        assert 'worker_func_download_tstamp' not in future.stats
+        assert fexec.tracer.trace_file is None
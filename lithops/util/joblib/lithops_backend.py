@@ -14,26 +14,37 @@
 # limitations under the License.
 #
 
-import logging
 import os
-import pickle
-import diskcache
-from numpy import ndarray
-from multiprocessing.pool import ThreadPool
+import sys
+import time
+import math
+import hashlib
+import logging
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Optional
 
+import cloudpickle
 from joblib import Parallel
 from joblib._parallel_backends import MultiprocessingBackend
 from joblib.pool import PicklingPool
 from joblib.parallel import register_parallel_backend
 
 from lithops.multiprocessing import Pool, cpu_count
-from lithops.constants import LITHOPS_TEMP_DIR
-from lithops.storage import Storage
+from lithops.utils import dumps_oob
 
 logger = logging.getLogger(__name__)
 
+# Arguments of this estimated size or bigger are shared with
+# broadcast objects if more than one call uses them
+SHARE_MIN_SIZE = 64 * 1024
+# Threads to upload the shared objects in the host, and to run
+# the calls of a batch in the workers with prefer="threads"
+MAX_THREADS = min(32, (os.cpu_count() or 1) + 4)
+
+_thread_pool = None
+_thread_pool_lock = threading.Lock()
+
 
 def register_lithops():
     """ Register Lithops Backend to be called with parallel_backend("lithops"). """
@@ -45,6 +56,10 @@ class LithopsBackend(MultiprocessingBackend):
     Will introduce some communication and memory overhead when exchanging
     input and output data with the with the worker Python processes.
     However, does not suffer from the Python Global Interpreter Lock.
+
+    The calls of every dispatch are grouped in batches, one per function
+    invocation, sized from the measured duration of the previous calls to
+    run about target_batch_duration seconds each.
     """
 
     supports_timeout = True
@@ -56,11 +71,16 @@ class LithopsBackend(MultiprocessingBackend):
         nesting_level: Optional[int] = None,
         inner_max_num_threads: Optional[int] = None,
         lithops_args: Optional[Dict[str, Any]] = None,
+        target_batch_duration: float = 5,
         **kwargs
     ):
         self.lithops_args = lithops_args
         self.eff_n_jobs = None
         self.prefer = None
+        self.target_batch_duration = target_batch_duration
+        self._n_jobs = 1
+        self._task_duration = None
+        self._upload_pool = None
         super().__init__(
             nesting_level=nesting_level,
             inner_max_num_threads=inner_max_num_threads,
@@ -93,6 +113,7 @@ class LithopsBackend(MultiprocessingBackend):
             require,
             **memmappingpool_args
         )
+        self._n_jobs = eff_n_jobs
         return eff_n_jobs
 
     def effective_n_jobs(self, n_jobs):
@@ -112,77 +133,183 @@ class LithopsBackend(MultiprocessingBackend):
     def compute_batch_size(self):
         return int(1e6)
 
+    def terminate(self):
+        super(LithopsBackend, self).terminate()
+        if self._upload_pool is not None:
+            self._upload_pool.shutdown()
+            self._upload_pool = None
+
+    def submit(self, func, callback=None):
+        """Schedule a func to be run (joblib >= 1.3)"""
+        return self.apply_async(func, callback=callback)
+
     def apply_async(self, func, callback=None):
         """Schedule a func to be run"""
-        mem_opt_calls = find_shared_objects(func.items)
+        pool = self._get_pool()
+        if self._upload_pool is None:
+            self._upload_pool = ThreadPoolExecutor(max_workers=MAX_THREADS)
+        mem_opt_calls = find_shared_objects(func.items, pool.broadcast, self._upload_pool)
         if self.prefer == "threads":
-            return self._get_pool().apply_async(handle_call_threads, (mem_opt_calls, ), callback=callback)
+            batches = [mem_opt_calls]
+            async_result = pool.map_async(handle_call_threads, batches, callback=callback)
+            return BatchedResult(async_result)
+        else:
+            batch_size = self.get_batch_size(len(mem_opt_calls))
+            batches = [mem_opt_calls[i:i + batch_size] for i in range(0, len(mem_opt_calls), batch_size)]
+            logger.debug(f'Dispatching {len(mem_opt_calls)} calls in {len(batches)} batches')
+            async_result = pool.map_async(handle_batch, batches, callback=callback)
+            return BatchedResult(async_result, self.batch_completed_calls)
+
+    def get_batch_size(self, num_calls):
+        """
+        Number of calls per function invocation. Without a measured call
+        duration, the calls are spread evenly over n_jobs invocations.
+        """
+        batch_size = math.ceil(num_calls / self._n_jobs)
+        if self._task_duration:
+            target_size = int(self.target_batch_duration / self._task_duration)
+            batch_size = min(batch_size, target_size)
+        return max(1, batch_size)
+
+    def batch_completed_calls(self, num_calls, duration):
+        """
+        Updates the smoothed duration of one call from a completed batch
+        """
+        task_duration = duration / num_calls
+        if self._task_duration is None:
+            self._task_duration = task_duration
         else:
-            return self._get_pool().starmap_async(handle_call_process, mem_opt_calls, callback=callback)
+            self._task_duration = 0.8 * self._task_duration + 0.2 * task_duration
 
 
-def find_shared_objects(calls):
-    # find and annotate repeated arguments
+class BatchedResult:
+    """
+    Result of a dispatch: flattens the results of its batches in
+    the order of the calls
+    """
+
+    def __init__(self, async_result, on_batch_completed=None):
+        self._async_result = async_result
+        self._on_batch_completed = on_batch_completed
+
+    def ready(self):
+        return self._async_result.ready()
+
+    def wait(self, timeout=None):
+        self._async_result.wait(timeout)
+
+    def get(self, timeout=None):
+        results = []
+        for batch_results, duration in self._async_result.get(timeout=timeout):
+            results.extend(batch_results)
+            if self._on_batch_completed is not None and batch_results:
+                self._on_batch_completed(len(batch_results), duration)
+        return results
+
+
+def estimate_size(obj):
+    """
+    Estimates the size of an object without serializing it
+    """
+    nbytes = getattr(obj, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, (list, tuple, set, frozenset, dict)) and len(obj) > 0:
+        # Extrapolated from the first items
+        items = obj.values() if isinstance(obj, dict) else obj
+        sample = [item for _, item in zip(range(10), items)]
+        size += len(obj) * sum(estimate_size(item) for item in sample) // len(sample)
+    return size
+
+
+def content_hash(obj):
+    digest = hashlib.sha256()
+    for segment in dumps_oob(obj, cloudpickle.dumps):
+        digest.update(segment)
+    return digest.hexdigest()
+
+
+def find_shared_objects(calls, broadcast, thread_pool):
+    """
+    Replaces the arguments used by more than one call, the same object or
+    objects with the same content, with a broadcast handle. Only arguments
+    with an estimated size of SHARE_MIN_SIZE or more are shared, and the
+    content is only hashed for the arguments of the same type and size.
+    """
     logger.info('Optimizing shared data between tasks')
 
     record = {}
     for i, call in enumerate(calls):
         for j, arg in enumerate(call[1]):
-            if id(arg) in record:
-                record[id(arg)].append((i, j))
-            else:
-                record[id(arg)] = [arg, (i, j)]
-
+            record.setdefault(id(arg), [arg]).append((i, j))
         for k, v in call[2].items():
-            if id(v) in record:
-                record[id(v)].append((i, k))
-            else:
-                record[id(v)] = [v, (i, k)]
+            record.setdefault(id(v), [v]).append((i, k))
+
+    candidates = {}
+    for positions in record.values():
+        obj = positions[0]
+        size = estimate_size(obj)
+        if size >= SHARE_MIN_SIZE:
+            candidates.setdefault((type(obj), size), []).append(positions)
+
+    shared = []
+    for group in candidates.values():
+        if len(group) > 1:
+            by_content = {}
+            for positions in group:
+                by_content.setdefault(content_hash(positions[0]), [positions[0]]).extend(positions[1:])
+            group = by_content.values()
+        shared.extend(positions for positions in group if len(positions) > 2)
+
+    def broadcast_arg_obj(positions):
+        logger.debug('Broadcasting {}'.format(type(positions[0])))
+        return broadcast(positions[0]), positions[1:]
 
     # If we found multiple occurrences of one object, then
-    # store it in shared memory, pass a proxy as a value
+    # broadcast it, and pass its handle as a value
     calls = [list(item) for item in calls]
 
-    storage = Storage()
-    thread_pool = ThreadPoolExecutor(max_workers=len(record))
-
-    def put_arg_obj(positions):
-        obj = positions.pop(0)
-        if len(positions) > 1 and consider_sharing(obj):
-            logger.debug('Proxying {}'.format(type(obj)))
-            obj_bin = pickle.dumps(obj)
-            cloud_object = storage.put_cloudobject(obj_bin)
-
-            for pos in positions:
-                call_n, idx_or_key = pos
-                call = calls[call_n]
-
-                if isinstance(idx_or_key, str):
-                    call[2][idx_or_key] = cloud_object
-                else:
-                    args_as_list = list(call[1])
-                    args_as_list[idx_or_key] = cloud_object
-                    call[1] = tuple(args_as_list)
-
-                try:
-                    call[3].append(idx_or_key)
-                except IndexError:
-                    call.append([idx_or_key])
-
-    fut = []
-    for positions in record.values():
-        f = thread_pool.submit(put_arg_obj, positions)
-        fut.append(f)
-    [f.result() for f in fut]
+    for handle, positions in thread_pool.map(broadcast_arg_obj, shared):
+        for call_n, idx_or_key in positions:
+            call = calls[call_n]
+
+            if isinstance(idx_or_key, str):
+                call[2][idx_or_key] = handle
+            else:
+                args_as_list = list(call[1])
+                args_as_list[idx_or_key] = handle
+                call[1] = tuple(args_as_list)
+
+            try:
+                call[3].append(idx_or_key)
+            except IndexError:
+                call.append([idx_or_key])
 
     return [tuple(item) for item in calls]
 
 
-def handle_call_threads(mem_opt_calls):
-    with ThreadPool(processes=len(mem_opt_calls)) as pool:
-        results = pool.starmap(handle_call_process, mem_opt_calls)
+def get_thread_pool():
+    """
+    Thread pool of the worker, reused by all the batches it runs
+    """
+    global _thread_pool
+    with _thread_pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=MAX_THREADS)
+        return _thread_pool
+
+
+def handle_batch(mem_opt_calls):
+    start = time.time()
+    results = [handle_call_process(*call) for call in mem_opt_calls]
+    return results, time.time() - start
 
-    return list(results)
+
+def handle_call_threads(mem_opt_calls):
+    start = time.time()
+    results = get_thread_pool().map(lambda call: handle_call_process(*call), mem_opt_calls)
+    return list(results), time.time() - start
 
 
 def handle_call_process(func, args, kwargs, proxy_positions=[]):
@@ -193,40 +320,14 @@ def handle_call_process(func, args, kwargs, proxy_positions=[]):
 
 
 def replace_with_values(args, kwargs, proxy_positions):
+    # Broadcast objects are cached per container, so only
+    # the first call that runs in each container downloads them.
+    # The calls of a batch share the handles, so each call loads
+    # its own copy of the objects
     args_as_list = list(args)
-    thread_pool = ThreadPoolExecutor(max_workers=len(proxy_positions))
-    cache = diskcache.Cache(os.path.join(LITHOPS_TEMP_DIR, 'cache'))
-
-    def get_arg_obj(idx_or_key):
-        if isinstance(idx_or_key, str):
-            obj_id = kwargs[idx_or_key]
-        else:
-            obj_id = args_as_list[idx_or_key]
-
-        if obj_id in cache:
-            logger.debug('Get {} (arg {}) from cache'.format(obj_id, idx_or_key))
-            obj = cache[obj_id]
-        else:
-            logger.debug('Get {} (arg {}) from storage'.format(obj_id, idx_or_key))
-            storage = Storage()
-            obj_bin = storage.get_cloudobject(obj_id)
-            obj = pickle.loads(obj_bin)
-            cache[obj_id] = obj
-
+    for idx_or_key in proxy_positions:
         if isinstance(idx_or_key, str):
-            kwargs[idx_or_key] = obj
+            kwargs[idx_or_key] = kwargs[idx_or_key].load()
         else:
-            args_as_list[idx_or_key] = obj
-
-    fut = []
-    for idx_or_key in proxy_positions:
-        f = thread_pool.submit(get_arg_obj, idx_or_key)
-        fut.append(f)
-    [f.result() for f in fut]
+            args_as_list[idx_or_key] = args_as_list[idx_or_key].load()
     return args_as_list, kwargs
-
-
-def consider_sharing(obj):
-    if isinstance(obj, (ndarray, list)):  # TODO: some heuristic
-        return True
-    return False
@@ -1,31 +1,230 @@
-import requests
-import logging
 import os
+import json
+import queue
+import logging
+import requests
+import threading
+import multiprocessing.util
 
 logger = logging.getLogger(__name__)
 
+METRICS_FLUSH_INTERVAL = 1
+METRICS_MAX_QUEUE_SIZE = 10000
+METRICS_PUSH_TIMEOUT = 5
+
+# Metrics flushers of this process, by exporter config
+METRICS_FLUSHERS = {}
+
+
+def get_metrics_flusher(config):
+    """
+    Returns the metrics flusher of this process for the given config,
+    so all the exporters with the same config share a single flusher thread
+    """
+    key = json.dumps(config, sort_keys=True, default=str)
+    pid, flusher = METRICS_FLUSHERS.get(key, (None, None))
+    if pid != os.getpid():
+        # Not created yet, or inherited from the parent process after a fork
+        flusher = MetricsFlusher(
+            apigateway=config.get('apigateway'),
+            textfile_dir=config.get('textfile_dir'),
+            flush_interval=config.get('flush_interval', METRICS_FLUSH_INTERVAL),
+            max_queue_size=config.get('max_queue_size', METRICS_MAX_QUEUE_SIZE)
+        )
+        METRICS_FLUSHERS[key] = (os.getpid(), flusher)
+    return flusher
+
+
+def _format_labels(labels):
+    return ','.join(f'{key}="{val}"' for key, val in labels)
+
+
+class MetricsFlusher:
+    """
+    Buffers metric samples and sends them in batches from a background
+    thread, either to a Prometheus pushgateway, or to a local file in the
+    Prometheus text exposition format, or both. Every process writes its
+    own `lithops-<pid>.prom` file in the text file directory, as expected
+    by the node exporter textfile collector.
+
+    Samples are aggregated per metric name and labels: counters are summed
+    across flushes, since a push replaces the values of its group in the
+    pushgateway, and gauges keep their last value. Adding a sample
+    never blocks; when the buffer is full the sample is dropped and
+    counted in the `lithops_metrics_dropped_samples_total` metric.
+    """
+
+    def __init__(self, apigateway=None, textfile_dir=None,
+                 flush_interval=METRICS_FLUSH_INTERVAL,
+                 max_queue_size=METRICS_MAX_QUEUE_SIZE):
+        self.apigateway = apigateway
+        self.textfile = None
+        if textfile_dir:
+            os.makedirs(textfile_dir, exist_ok=True)
+            self.textfile = os.path.join(textfile_dir, f'lithops-{os.getpid()}.prom')
+        self.flush_interval = flush_interval
+
+        self.samples = queue.Queue(maxsize=max_queue_size)
+        self.dropped_samples = 0
+        self.pushed_dropped_samples = 0
+        self.metrics = {}  # all the metrics flushed so far, with the counter totals
+        self.job_labels = ()  # job and instance labels of the samples
+
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+        # Flush the pending samples when the process exits, also in
+        # multiprocessing child processes, where atexit does not run
+        multiprocessing.util.Finalize(None, self.close, exitpriority=10)
+
+    def add(self, name, value, type, labels):
+        try:
+            self.samples.put_nowait((name, value, type, tuple(labels)))
+        except queue.Full:
+            with self.lock:
+                self.dropped_samples += 1
+
+    def _drain(self):
+        """
+        Takes all the buffered samples, aggregated by metric name and labels
+        """
+        batch = {}
+        while True:
+            try:
+                name, value, type, labels = self.samples.get_nowait()
+            except queue.Empty:
+                break
+            self.job_labels = labels[:2]
+            key = (name, labels)
+            if type == 'counter' and key in batch:
+                value += batch[key][1]
+            batch[key] = (type, value)
+        return batch
+
+    def _accumulate(self, batch):
+        """
+        Adds the batch to the metrics flushed so far, and returns the totals
+        of the metrics in the batch
+        """
+        for key, (type, value) in batch.items():
+            if type == 'counter' and key in self.metrics:
+                value += self.metrics[key][1]
+            self.metrics[key] = (type, value)
+        return {key: self.metrics[key] for key in batch}
+
+    def _push(self, batch, dropped_samples):
+        """
+        Sends the batch to the pushgateway, one request per group of labels
+        """
+        groups = {}
+        for (name, labels), (type, value) in batch.items():
+            groups.setdefault(labels, []).append(f'# TYPE {name} {type}\n{name} {value}\n')
+
+        if dropped_samples:
+            groups.setdefault(self.job_labels, []).append(
+                '# TYPE lithops_metrics_dropped_samples_total counter\n'
+                f'lithops_metrics_dropped_samples_total {dropped_samples}\n'
+            )
+
+        for labels, lines in groups.items():
+            dim = '/'.join(f'{key}/{val}' for key, val in labels)
+            url = '/'.join([self.apigateway, 'metrics', dim])
+            logger.debug(f'Sending {len(lines)} metrics to {url}')
+            try:
+                requests.post(url, data=''.join(lines), timeout=METRICS_PUSH_TIMEOUT)
+            except Exception as e:
+                logger.error(e)
+
+    def _write_textfile(self):
+        """
+        Writes all the metrics flushed so far to the text file, atomically
+        """
+        lines, types = [], {}
+        for (name, labels), (type, value) in sorted(self.metrics.items()):
+            if name not in types:
+                types[name] = type
+                lines.append(f'# TYPE {name} {type}')
+            lines.append(f'{name}{{{_format_labels(labels)}}} {value}')
+        lines.append('# TYPE lithops_metrics_dropped_samples_total counter')
+        lines.append(f'lithops_metrics_dropped_samples_total {self.dropped_samples}')
+
+        tmp_file = f'{self.textfile}.tmp'
+        try:
+            with open(tmp_file, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.replace(tmp_file, self.textfile)
+        except Exception as e:
+            logger.error(e)
+
+    def flush(self):
+        """
+        Sends the buffered samples
+        """
+        with self.flush_lock:
+            batch = self._drain()
+            with self.lock:
+                dropped_samples = self.dropped_samples
+            if not batch and dropped_samples == self.pushed_dropped_samples:
+                return
+
+            batch = self._accumulate(batch)
+            if self.apigateway:
+                self._push(batch, dropped_samples)
+            if self.textfile:
+                self._write_textfile()
+            self.pushed_dropped_samples = dropped_samples
+
+    def _run(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(e)
+
+    def close(self):
+        self.stop_event.set()
+        self.flush()
+
 
 class PrometheusExporter():
 
-    def __init__(self, enabled, config):
-        """ Prometheus exporter for sending metrics to an API Gateway"""
+    def __init__(self, enabled, config, forward=False):
+        """
+        Prometheus exporter for sending metrics to an API Gateway or a text file.
+        With forward=True, the samples are kept in `samples` instead, to be
+        sent by another process with send_samples()
+        """
         self.enabled = enabled
+        self.config = config
         self.apigateway = config.get('apigateway') if config else None
+        self.textfile_dir = config.get('textfile_dir') if config else None
 
         self.job = 'lithops'
         self.instance = os.environ['__LITHOPS_SESSION_ID'].split('-')[0]
 
+        self.flusher = None
+        self.samples = []
+        self.forward = forward
+        if self.enabled and (self.apigateway or self.textfile_dir) and not forward:
+            self.flusher = get_metrics_flusher(config)
+
     def send_metric(self, name, value, type, labels):
-        """Send a metric to prometheus"""
+        """Send a metric to prometheus. The metric is buffered and sent in background"""
+        labels = (('job', self.job), ('instance', self.instance), *labels)
+        if self.flusher:
+            self.flusher.add(name, value, type, labels)
+        elif self.forward and self.enabled and (self.apigateway or self.textfile_dir):
+            self.samples.append((name, value, type, labels))
 
-        if self.enabled and self.apigateway:
-            dim = 'job/{}/instance/{}'.format(self.job, self.instance)
-            for key, val in labels:
-                dim += '/%s/%s' % (key, val)
-            url = '/'.join([self.apigateway, 'metrics', dim])
-            logger.debug('Sending metric "{} {} ({})" to {}'.format(name, value, type, url))
 
-            try:
-                requests.post(url, data='# TYPE %s %s\n%s %s\n' % (name, type, name, value))
-            except Exception as e:
-                logger.error(e)
+def send_samples(config, samples):
+    """
+    Sends in background the samples forwarded by an exporter of another process
+    """
+    if samples:
+        flusher = get_metrics_flusher(config)
+        for sample in samples:
+            flusher.add(*sample)
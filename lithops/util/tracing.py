@@ -0,0 +1,261 @@
+#
+# (C) Copyright Cloudlab URV 2020
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import os
+import json
+import atexit
+import hashlib
+import logging
+import threading
+
+from lithops.version import __version__
+from lithops.constants import LOGS_DIR
+
+logger = logging.getLogger(__name__)
+
+TRACES_DIR = os.path.join(LOGS_DIR, 'traces')
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+# Spans of the job creation, from the host job metadata, in the order
+# they run: (span name, duration key)
+JOB_SPANS = (
+    ('partition_planning', 'host_job_create_partitions_time'),
+    ('serialization', 'host_job_serialize_time'),
+    ('function_upload', 'host_func_upload_time'),
+    ('data_upload', 'host_data_upload_time')
+)
+
+# Spans of a call, from the call stats: (span name, start key, end key)
+CALL_SPANS = (
+    ('invoke', 'host_job_created_tstamp', 'host_submit_tstamp'),
+    ('queueing', 'host_submit_tstamp', 'worker_func_download_tstamp'),
+    ('function_download', 'worker_func_download_tstamp', 'worker_data_download_tstamp'),
+    ('data_download', 'worker_data_download_tstamp', 'worker_data_download_end_tstamp'),
+    ('worker_cold_start', 'worker_start_tstamp', 'worker_func_start_tstamp'),
+    ('execution', 'worker_func_start_tstamp', 'worker_func_end_tstamp'),
+    ('result_upload', 'worker_func_end_tstamp', 'worker_result_upload_end_tstamp'),
+    ('status_detection', 'worker_end_tstamp', 'host_status_done_tstamp'),
+    ('result_download', 'host_status_done_tstamp', 'host_result_done_tstamp')
+)
+
+
+def create_trace_context():
+    """
+    Creates the trace context of a new job, propagated to the workers in
+    the job payload
+    """
+    return {'trace_id': os.urandom(16).hex(), 'span_id': os.urandom(8).hex()}
+
+
+def get_call_span_id(trace_context, call_id):
+    """
+    Span ID of a call, derived from the trace context of its job so the
+    host and the workers agree on it without exchanging it
+    """
+    return hashlib.sha256(f"{trace_context['trace_id']}/{call_id}".encode()).hexdigest()[:16]
+
+
+def get_traceparent(trace_context, call_id):
+    """
+    W3C traceparent of a call, exposed to the functions in the TRACEPARENT
+    environment variable
+    """
+    return f"00-{trace_context['trace_id']}-{get_call_span_id(trace_context, call_id)}-01"
+
+
+def _attributes(attributes):
+    otlp_attributes = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            otlp_value = {'boolValue': value}
+        elif isinstance(value, int):
+            otlp_value = {'intValue': str(value)}
+        elif isinstance(value, float):
+            otlp_value = {'doubleValue': value}
+        else:
+            otlp_value = {'stringValue': str(value)}
+        otlp_attributes.append({'key': key, 'value': otlp_value})
+    return otlp_attributes
+
+
+def _span(trace_id, span_id, parent_span_id, name, start, end, kind=SPAN_KIND_INTERNAL, attributes=None):
+    return {
+        'traceId': trace_id,
+        'spanId': span_id,
+        'parentSpanId': parent_span_id or '',
+        'name': name,
+        'kind': kind,
+        'startTimeUnixNano': str(int(start * 1e9)),
+        'endTimeUnixNano': str(int(end * 1e9)),
+        'attributes': _attributes(attributes or {})
+    }
+
+
+class Tracer:
+    """
+    Builds the spans of the jobs of an executor from the timestamps already
+    collected by the host, the invoker and the workers, and exports them to
+    a local file in the OTLP JSON Lines format. Every job is a trace, with
+    one child span for each job creation phase and for each call, and the
+    phases of a call as children of its span. The spans of a job are
+    appended to the file once, when all its calls are done, and the spans
+    of the jobs not done yet are appended when the executor is closed or
+    at exit.
+    """
+
+    def __init__(self, enabled, executor_id, config):
+        self.enabled = enabled
+        self.executor_id = executor_id
+        self.trace_file = None
+        if not self.enabled:
+            return
+
+        trace_dir = config.get('trace_dir') or TRACES_DIR
+        os.makedirs(trace_dir, exist_ok=True)
+        self.trace_file = os.path.join(trace_dir, f'{executor_id}.json')
+
+        self.jobs = {}  # spans of the jobs not written yet, by job key
+        self.written_jobs = set()
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _add_job(self, future):
+        stats = future.stats
+        trace_id, job_span_id = future.trace_context['trace_id'], future.trace_context['span_id']
+        start = stats['host_job_create_tstamp']
+        created = start + stats.get('host_job_created_time', 0)
+
+        spans = []
+        span_start = start
+        for name, duration_key in JOB_SPANS:
+            if stats.get(duration_key):
+                spans.append(_span(trace_id, os.urandom(8).hex(), job_span_id, name,
+                                   span_start, span_start + stats[duration_key]))
+                span_start += stats[duration_key]
+
+        root = _span(trace_id, job_span_id, None, 'job', start, created, attributes={
+            'lithops.executor_id': future.executor_id,
+            'lithops.job_key': future.job_key,
+            'lithops.function_name': future.function_name
+        })
+        self.jobs[future.job_key] = {
+            'root': root, 'spans': spans, 'created': created,
+            'calls': {},  # call spans, by call id and span name
+            'done': set(), 'total_calls': future.total_calls
+        }
+
+    def _add_call(self, future):
+        job = self.jobs[future.job_key]
+        stats = {**future.stats, 'host_job_created_tstamp': job['created']}
+        if 'worker_func_download_tstamp' not in stats:
+            # Traced worker timestamps not available, the call queues until the worker starts
+            stats['worker_func_download_tstamp'] = stats.get('worker_start_tstamp')
+        if 'worker_result_upload_time' in stats and 'worker_func_end_tstamp' in stats:
+            stats['worker_result_upload_end_tstamp'] = stats['worker_func_end_tstamp'] + stats['worker_result_upload_time']
+
+        trace_id = future.trace_context['trace_id']
+        call_span_id = get_call_span_id(future.trace_context, future.call_id)
+        call_end = job['created']
+        spans = job['calls'].setdefault(future.call_id, {})
+
+        for name, start_key, end_key in CALL_SPANS:
+            start, end = stats.get(start_key), stats.get(end_key)
+            if not start or not end or end < start:
+                continue
+            call_end = max(call_end, end)
+            if name not in spans:
+                kind = SPAN_KIND_CLIENT if name == 'invoke' else SPAN_KIND_INTERNAL
+                spans[name] = _span(trace_id, os.urandom(8).hex(), call_span_id, name, start, end, kind)
+
+        attributes = {
+            'lithops.call_id': future.call_id,
+            'lithops.activation_id': future.activation_id or '',
+            'lithops.worker_cold_start': bool(stats.get('worker_cold_start')),
+            'lithops.success': not future.error
+        }
+        spans['call'] = _span(trace_id, call_span_id, future.trace_context['span_id'], 'call',
+                              job['created'], call_end, attributes=attributes)
+
+        root = job['root']
+        root['endTimeUnixNano'] = str(max(int(root['endTimeUnixNano']), int(call_end * 1e9)))
+
+        if future.done:
+            job['done'].add(future.call_id)
+
+    def add_futures(self, fs):
+        """
+        Adds the spans of the finished calls, and writes the spans of the
+        jobs whose calls are all done
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            job_keys = set()
+            for f in fs:
+                if not f.trace_context or not f.stats.get('worker_end_tstamp') \
+                   or f.job_key in self.written_jobs:
+                    continue
+                if f.job_key not in self.jobs:
+                    self._add_job(f)
+                self._add_call(f)
+                job_keys.add(f.job_key)
+
+            done_jobs = [job_key for job_key in job_keys
+                         if len(self.jobs[job_key]['done']) == self.jobs[job_key]['total_calls']]
+            self._write(done_jobs)
+
+    def close(self):
+        """
+        Writes the spans of the jobs not done yet
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self._write(list(self.jobs))
+
+    def to_otlp(self, job):
+        spans = [job['root']] + job['spans']
+        for call_spans in job['calls'].values():
+            spans.extend(call_spans.values())
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': _attributes({
+                    'service.name': 'lithops',
+                    'lithops.executor_id': self.executor_id
+                })},
+                'scopeSpans': [{
+                    'scope': {'name': 'lithops', 'version': __version__},
+                    'spans': spans
+                }]
+            }]
+        }
+
+    def _write(self, job_keys):
+        if not job_keys:
+            return
+        try:
+            with open(self.trace_file, 'a') as f:
+                for job_key in job_keys:
+                    f.write(json.dumps(self.to_otlp(self.jobs[job_key])) + '\n')
+        except Exception as e:
+            logger.error(f'Unable to write the trace file {self.trace_file}: {e}')
+        for job_key in job_keys:
+            del self.jobs[job_key]
+            self.written_jobs.add(job_key)
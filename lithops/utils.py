@@ -24,6 +24,7 @@ import json
 import socket
 import shutil
 import base64
+import pickle
 import inspect
 import struct
 import lithops
@@ -41,6 +42,11 @@ from lithops.version import __version__
 
 logger = logging.getLogger(__name__)
 
+# Objects pickled with out-of-band buffers start with these magic bytes
+PICKLE_OOB_MAGIC = b'\x1fLTP'
+# Contiguous buffers of at least this size are pickled out-of-band
+PICKLE_OOB_MIN_SIZE = 64 * 1024
+
 
 def uuid_str():
     return str(uuid.uuid4())
@@ -89,6 +95,89 @@ def agg_data(data_strs):
     return b"".join(data_strs), ranges
 
 
+def dumps_oob(obj, dumps=pickle.dumps):
+    """
+    Pickles an object with protocol 5, writing its large contiguous buffers,
+    such as the data of NumPy arrays, out-of-band instead of copying them into
+    the pickle stream. Returns the segments of the serialized object: a header
+    with the size of the pickle stream and of every buffer, the pickle stream,
+    and the buffers. An object without large buffers is a plain pickle.
+    """
+    buffers = []
+
+    def buffer_callback(pickle_buffer):
+        try:
+            buffer = pickle_buffer.raw()
+        except BufferError:
+            return True
+        if buffer.nbytes < PICKLE_OOB_MIN_SIZE:
+            return True
+        buffers.append(buffer)
+        return False
+
+    data = dumps(obj, protocol=5, buffer_callback=buffer_callback)
+    if not buffers:
+        return [data]
+
+    sizes = [len(data)] + [buffer.nbytes for buffer in buffers]
+    header = PICKLE_OOB_MAGIC + struct.pack(f'<I{len(sizes)}Q', len(sizes), *sizes)
+    return [header, data] + buffers
+
+
+def loads_oob(data):
+    """
+    Unpickles an object serialized with dumps_oob(), or a plain pickle.
+    The out-of-band buffers are passed to the unpickler as views of data,
+    so NumPy arrays are rebuilt over it without copying them. Read-only
+    data is copied once, so that the arrays are writable.
+    """
+    view = memoryview(data)
+    if view[:len(PICKLE_OOB_MAGIC)] != PICKLE_OOB_MAGIC:
+        return pickle.loads(data)
+    if view.readonly:
+        view = memoryview(bytearray(view))
+
+    pos = len(PICKLE_OOB_MAGIC)
+    num_segments, = struct.unpack_from('<I', view, pos)
+    sizes = struct.unpack_from(f'<{num_segments}Q', view, pos + 4)
+    pos += 4 + 8 * num_segments
+
+    segments = []
+    for size in sizes:
+        segments.append(view[pos:pos + size])
+        pos += size
+    return pickle.loads(segments[0], buffers=segments[1:])
+
+
+def read_into_buffer(stream, size=None, chunk_size=64 * 1024**2):
+    """
+    Reads a file-like object into a writable buffer, without holding the
+    data twice in memory. The buffer is preallocated if its size is known.
+    """
+    if size is None:
+        buffer = bytearray()
+        chunk = stream.read(chunk_size)
+        while chunk:
+            buffer += chunk
+            chunk = stream.read(chunk_size)
+        return buffer
+
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    pos = 0
+    while pos < size:
+        if hasattr(stream, 'readinto'):
+            read = stream.readinto(view[pos:pos + chunk_size])
+        else:
+            chunk = stream.read(min(chunk_size, size - pos))
+            read = len(chunk)
+            view[pos:pos + read] = chunk
+        if not read:
+            break
+        pos += read
+    return buffer if pos == size else buffer[:pos]
+
+
 def create_futures_list(futures, executor):
     """creates a new FuturesList an initiates its attrs"""
     fl = FuturesList(futures)
@@ -115,16 +204,61 @@ class FuturesList(list):
         self.clear()
         self.extend(fs)
 
-    def map(self, map_function, sync=False, **kwargs):
+    def _set_pipeline(self, map_function, iterdata, map_kwargs):
+        """
+        Defers a map stage until the futures are needed, so the next
+        element-wise map stages can be fused into it
+        """
+        self.pipeline = {'functions': [map_function], 'iterdata': iterdata, 'kwargs': map_kwargs}
+        if not any(fl is self for fl in self.executor.pipelines):
+            self.executor.pipelines.append(self)
+
+    def _is_fusible(self, map_function, map_kwargs):
+        """
+        A map stage can run in the same activations as the pending one if
+        it is element-wise and runs with the same runtime settings
+        """
+        if set(inspect.signature(map_function).parameters) & RESERVED_PARAMS:
+            return False
+        if any(map_kwargs.get(arg) is not None for arg in PARTITION_MAP_ARGS):
+            return False
+        pending_kwargs = self.pipeline['kwargs']
+        return all(map_kwargs.get(arg, default) == pending_kwargs.get(arg, default)
+                   for arg, default in FUSIBLE_MAP_ARGS.items())
+
+    def _run_pipeline(self):
+        """
+        Runs the pending map stage of a lazy pipeline, if any
+        """
+        pipeline = getattr(self, 'pipeline', None)
+        if not pipeline:
+            return
+        self.pipeline = None
+        functions = pipeline['functions']
+        map_function = functions[0] if len(functions) == 1 else FusedFunction(functions)
+        fs = self.executor.map(map_function, pipeline['iterdata'], **pipeline['kwargs'])
+        self._extend_futures(fs)
+
+    def map(self, map_function, sync=False, lazy=False, **kwargs):
         self._create_executor()
+        pipeline = getattr(self, 'pipeline', None)
+        lazy = lazy or pipeline is not None
+        if pipeline and not sync and self._is_fusible(map_function, kwargs):
+            pipeline['functions'].append(map_function)
+            return self
+        self._run_pipeline()
         if sync:
             self.executor.wait(self)
+        if lazy:
+            self._set_pipeline(map_function, create_futures_list(list(self), self.executor), kwargs)
+            return self
         fs = self.executor.map(map_function, self, **kwargs)
         self._extend_futures(fs)
         return self
 
     def map_reduce(self, map_function, reduce_function, sync=False, **kwargs):
         self._create_executor()
+        self._run_pipeline()
         if sync:
             self.executor.wait(self)
         fs = self.executor.map_reduce(map_function, self, reduce_function, **kwargs)
@@ -133,11 +267,13 @@ class FuturesList(list):
 
     def wait(self, **kwargs):
         self._create_executor()
+        self._run_pipeline()
         fs_tt = self.alt_list if hasattr(self, 'alt_list') else self
         return self.executor.wait(fs_tt, **kwargs)
 
     def get_result(self, **kwargs):
         self._create_executor()
+        self._run_pipeline()
         fs_tt = self.alt_list if hasattr(self, 'alt_list') else self
         return self.executor.get_result(fs_tt, **kwargs)
 
@@ -146,6 +282,48 @@ class FuturesList(list):
         return super().__reduce__()
 
 
+# Function params filled by the worker, which are not element-wise
+RESERVED_PARAMS = {'ibm_cos', 'storage', 'id', 'rabbitmq', 'obj', 'url'}
+# map() params that define the partitions of the input data of a stage
+PARTITION_MAP_ARGS = ('chunksize', 'extra_args', 'obj_chunk_size', 'obj_chunk_number')
+# map() params that must match to fuse two stages, and their default values
+FUSIBLE_MAP_ARGS = {'runtime_memory': None, 'timeout': None, 'extra_env': None,
+                    'include_modules': [], 'exclude_modules': [], 'profile': False}
+
+
+class FunctionWrapper:
+    """
+    Base class of the callables that Lithops runs in the workers on behalf
+    of the user's functions. The user's functions are in `functions`, so
+    their module dependencies are also serialized.
+    """
+
+    def __init__(self, functions):
+        self.functions = functions
+        self.__name__ = '+'.join(getattr(func, '__name__', type(func).__name__) for func in functions)
+
+
+class FusedFunction(FunctionWrapper):
+    """
+    Functions of consecutive map stages of a lazy pipeline, run one after
+    the other in the same function activation. The result of every
+    function is passed to the next one as in function chaining, and only
+    the result of the last one is stored.
+    """
+
+    def __init__(self, functions):
+        super().__init__(functions)
+        # The data and the reserved params are those of the first function
+        self.__signature__ = inspect.signature(functions[0])
+
+    def __call__(self, *args, **kwargs):
+        result = self.functions[0](*args, **kwargs)
+        for func in self.functions[1:]:
+            args, kwargs = prepare_args(func, verify_args(func, [result], None)[0])
+            result = func(*args, **kwargs)
+        return result
+
+
 def get_default_backend(mode):
     """ Return lithops execution backend """
 
@@ -577,6 +755,33 @@ def verify_args(func, iterdata, extra_args):
     return new_data
 
 
+def prepare_args(func, data):
+    """
+    Converts the "data" envelope into normal *args/**kwargs,
+    respecting the actual var-length parameter names of `func`
+    """
+    func_sig = inspect.signature(func)
+    var_pos_name = None
+    var_kw_name = None
+
+    for name, param in func_sig.parameters.items():
+        if param.kind == inspect.Parameter.VAR_POSITIONAL:
+            var_pos_name = name
+        elif param.kind == inspect.Parameter.VAR_KEYWORD:
+            var_kw_name = name
+
+    payload = dict(data)
+
+    # Extract var-positional argument value if present
+    args = payload.pop(var_pos_name) or () if var_pos_name in payload else ()
+    # Extract var-keyword argument value if present
+    kwargs = payload.pop(var_kw_name) or {} if var_kw_name in payload else {}
+    # Any remaining keys become normal keyword arguments
+    kwargs.update(payload)
+
+    return args, kwargs
+
+
 class WrappedStreamingBody:
     """
     Wrap boto3's StreamingBody object to provide enough Python fileobj functionality.
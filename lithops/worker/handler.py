@@ -27,6 +27,7 @@ import logging
 import traceback
 import multiprocessing as mp
 from queue import Queue, Empty
+from collections import OrderedDict
 from threading import Thread
 from tblib import pickling_support
 from types import SimpleNamespace
@@ -38,10 +39,13 @@ from lithops.storage import InternalStorage
 from lithops.worker.jobrunner import JobRunner
 from lithops.worker.utils import LogStream, custom_redirection, \
     get_function_and_modules, get_function_data
-from lithops.constants import JOBS_PREFIX, LITHOPS_TEMP_DIR, MODULES_DIR
+from lithops.constants import JOBS_PREFIX, LITHOPS_TEMP_DIR, MODULES_DIR, MAX_LOG_SIZE
+from lithops.storage.utils import create_logs_key
+from lithops.util.tracing import get_traceparent
 from lithops.utils import setup_lithops_logger, is_unix_system
 from lithops.worker.status import create_call_status
 from lithops.worker.utils import SystemMonitor
+from lithops.util.metrics import send_samples
 
 pickling_support.install()
 
@@ -52,17 +56,55 @@ logger = logging.getLogger(__name__)
 _MP_CTX = mp.get_context('fork') if is_unix_system() else None
 
 
+# Compressed execution logs up to this size are inlined in the call status
+LOGS_INLINE_MAX_SIZE = 1024
+
+# JobRunner process reused across the tasks of a job when jobrunner_mode is 'reuse'
+REUSABLE_JOBRUNNER = None
+
+
 class ShutdownSentinel:
     """Put an instance of this class on the queue to shut it down"""
     pass
 
 
+# Job manifests last loaded by this container, by manifest key (LRU)
+JOB_MANIFEST_CACHE = OrderedDict()
+JOB_MANIFEST_CACHE_SIZE = 4
+
+
+def get_job_manifest(manifest_key, internal_storage):
+    """
+    Gets the job manifest from storage, only once per container while
+    it is among the last JOB_MANIFEST_CACHE_SIZE manifests used
+    """
+    if manifest_key in JOB_MANIFEST_CACHE:
+        JOB_MANIFEST_CACHE.move_to_end(manifest_key)
+    else:
+        logger.info(f"Loading job manifest {manifest_key} from storage")
+        manifest = internal_storage.get_job_manifest(manifest_key)
+        JOB_MANIFEST_CACHE[manifest_key] = json.loads(manifest)
+        while len(JOB_MANIFEST_CACHE) > JOB_MANIFEST_CACHE_SIZE:
+            JOB_MANIFEST_CACHE.popitem(last=False)
+
+    return JOB_MANIFEST_CACHE[manifest_key]
+
+
 def create_job(payload: dict) -> SimpleNamespace:
-    job = SimpleNamespace(**payload)
-    storage_config = extract_storage_config(job.config)
-    internal_storage = InternalStorage(storage_config)
+    if 'manifest_key' in payload:
+        # Slim payload: the job metadata is stored in the job manifest
+        internal_storage = InternalStorage(payload['storage_config'], reuse_client=True)
+        manifest = get_job_manifest(payload['manifest_key'], internal_storage)
+        job = SimpleNamespace(**{**manifest, **payload})
+    else:
+        job = SimpleNamespace(**payload)
+        storage_config = extract_storage_config(job.config)
+        internal_storage = InternalStorage(storage_config, reuse_client=True)
+    job.func_download_tstamp = time.time()
     job.func = get_function_and_modules(job, internal_storage)
+    job.data_download_tstamp = time.time()
     job.data = get_function_data(job, internal_storage)
+    job.data_download_end_tstamp = time.time()
 
     return job
 
@@ -90,9 +132,12 @@ def function_handler(payload):
         work_queue = manager.Queue()
         job_runners = []
 
-        for call_id in job.call_ids:
-            data = job.data.pop(0)
-            work_queue.put((job, call_id, data))
+        # The data of the calls are views of the downloaded buffer, they are
+        # copied to send them to the worker processes
+        call_data = job.data
+        job.data = None
+        for call_id, data in zip(job.call_ids, call_data):
+            work_queue.put((job, call_id, bytes(data)))
 
         for pid in range(worker_processes):
             work_queue.put(ShutdownSentinel())
@@ -183,10 +228,12 @@ def run_task(task):
     env = task.extra_env
     env['LITHOPS_CONFIG'] = json.dumps(task.config)
     env['__LITHOPS_SESSION_ID'] = '-'.join([task.job_key, task.call_id])
+    if getattr(task, 'trace_context', None):
+        env['TRACEPARENT'] = get_traceparent(task.trace_context, task.call_id)
     os.environ.update(env)
 
     storage_config = extract_storage_config(task.config)
-    internal_storage = InternalStorage(storage_config)
+    internal_storage = InternalStorage(storage_config, reuse_client=True)
     call_status = create_call_status(task, internal_storage)
 
     runtime_name = task.runtime_name
@@ -204,54 +251,14 @@ def run_task(task):
         # send init status event
         call_status.send_init_event()
 
-        handler_conn, jobrunner_conn = _MP_CTX.Pipe()
-        jobrunner = JobRunner(task, jobrunner_conn, internal_storage)
-        logger.debug('Starting JobRunner process')
-        jrp = _MP_CTX.Process(target=jobrunner.run) if is_unix_system() else Thread(target=jobrunner.run)
-
-        process_id = os.getpid() if is_unix_system() else mp.current_process().pid
-        sys_monitor = SystemMonitor(process_id)
-        sys_monitor.start()
-
-        jrp.start()
-        jrp.join(task.execution_timeout)
+        jobrunner_mode = task.config['lithops'].get('jobrunner_mode', 'process')
 
-        sys_monitor.stop()
-        logger.debug('JobRunner process finished')
-
-        cpu_info = sys_monitor.get_cpu_info()
-        call_status.add('worker_func_cpu_usage', cpu_info['usage'])
-        call_status.add('worker_func_cpu_system_time', round(cpu_info['system'], 8))
-        call_status.add('worker_func_cpu_user_time', round(cpu_info['user'], 8))
-
-        net_io = sys_monitor.get_network_io()
-        call_status.add('worker_func_sent_net_io', net_io['sent'])
-        call_status.add('worker_func_recv_net_io', net_io['recv'])
-
-        mem_info = sys_monitor.get_memory_info()
-        call_status.add('worker_func_rss', mem_info['rss'])
-        call_status.add('worker_func_vms', mem_info['vms'])
-        call_status.add('worker_func_uss', mem_info['uss'])
-
-        if jrp.is_alive():
-            # If process is still alive after jr.join(job_max_runtime), kill it
-            try:
-                jrp.terminate()
-            except Exception:
-                # thread does not have terminate method
-                pass
-            msg = ('Function exceeded maximum time of {} seconds and was '
-                   'killed'.format(task.execution_timeout))
-            raise TimeoutError('HANDLER', msg)
-
-        if not handler_conn.poll():
-            logger.error('No completion message received from JobRunner process')
-            logger.debug('Assuming memory overflow...')
-            # Only 1 message is returned by jobrunner when it finishes.
-            # If no message, this means that the jobrunner process was killed.
-            # 99% of times the jobrunner is killed due an OOM, so we assume here an OOM.
-            msg = 'Function exceeded maximum memory and was killed'
-            raise MemoryError('HANDLER', msg)
+        if jobrunner_mode == 'thread':
+            run_jobrunner_thread(task, internal_storage, call_status)
+        elif jobrunner_mode == 'reuse' and is_unix_system():
+            run_jobrunner_reused_process(task, call_status)
+        else:
+            run_jobrunner_process(task, internal_storage, call_status)
 
         if os.path.exists(task.stats_file):
             with open(task.stats_file, 'r') as fid:
@@ -283,13 +290,259 @@ def run_task(task):
         if not job_interruped:
             call_status.add('worker_end_tstamp', time.time())
 
-            # Flush log stream and save it to the call status
+            # Flush log stream and attach it to the call status
             task.log_stream.flush()
             if os.path.isfile(task.log_file):
-                with open(task.log_file, 'rb') as lf:
-                    log_str = base64.b64encode(zlib.compress(lf.read())).decode()
-                    call_status.add('logs', log_str)
+                add_logs(task, call_status, internal_storage)
 
             call_status.send_finish_event()
 
         logger.info("Finished")
+
+
+def add_logs(task, call_status, internal_storage):
+    """
+    Adds the execution logs to the call status. Only the tail of the logs
+    bigger than max_log_size is kept. Small logs are inlined in the status,
+    and bigger ones are uploaded as a separate object, so they are only
+    downloaded by the host when needed.
+    """
+    max_log_size = int(task.config['lithops'].get('max_log_size', MAX_LOG_SIZE) * 1024 ** 2)
+    log_size = os.path.getsize(task.log_file)
+
+    with open(task.log_file, 'rb') as lf:
+        if log_size > max_log_size:
+            lf.seek(log_size - max_log_size)
+            logs = f'[... {log_size - max_log_size} bytes truncated ...]\n'.encode() + lf.read()
+        else:
+            logs = lf.read()
+
+    logs = zlib.compress(logs)
+    call_status.add('logs_size', log_size)
+
+    if len(logs) > LOGS_INLINE_MAX_SIZE:
+        logs_key = create_logs_key(task.executor_id, task.job_id, task.call_id)
+        try:
+            internal_storage.put_data(logs_key, logs)
+            call_status.add('logs_key', logs_key)
+            return
+        except Exception as e:
+            logger.error(f'Unable to upload the execution logs: {e}')
+
+    call_status.add('logs', base64.b64encode(logs).decode())
+
+
+def start_sys_monitor(process_id=None):
+    """
+    Starts a system monitor of the given process, or of this process by default
+    """
+    if process_id is None:
+        process_id = os.getpid() if is_unix_system() else mp.current_process().pid
+    sys_monitor = SystemMonitor(process_id)
+    sys_monitor.start()
+    return sys_monitor
+
+
+def add_sys_monitor_stats(sys_monitor, call_status):
+    """
+    Stops the system monitor, and adds its resource usage stats to the call status
+    """
+    sys_monitor.stop()
+
+    cpu_info = sys_monitor.get_cpu_info()
+    call_status.add('worker_func_cpu_usage', cpu_info['usage'])
+    call_status.add('worker_func_cpu_system_time', round(cpu_info['system'], 8))
+    call_status.add('worker_func_cpu_user_time', round(cpu_info['user'], 8))
+
+    net_io = sys_monitor.get_network_io()
+    call_status.add('worker_func_sent_net_io', net_io['sent'])
+    call_status.add('worker_func_recv_net_io', net_io['recv'])
+
+    mem_info = sys_monitor.get_memory_info()
+    call_status.add('worker_func_rss', mem_info['rss'])
+    call_status.add('worker_func_vms', mem_info['vms'])
+    call_status.add('worker_func_uss', mem_info['uss'])
+
+
+def run_forked_jobrunner(jobrunner):
+    """
+    Runs a JobRunner in a forked process. The process creates its own storage
+    client, so the pooled connections of the parent are never used by both
+    """
+    jobrunner.internal_storage.reset_client()
+    jobrunner.run()
+
+
+def run_jobrunner_process(task, internal_storage, call_status):
+    """
+    Runs the JobRunner in a new process, monitoring its resource usage
+    """
+    handler_conn, jobrunner_conn = _MP_CTX.Pipe()
+    jobrunner = JobRunner(task, jobrunner_conn, internal_storage)
+    logger.debug('Starting JobRunner process')
+    jrp = _MP_CTX.Process(target=run_forked_jobrunner, args=(jobrunner,)) \
+        if is_unix_system() else Thread(target=jobrunner.run)
+
+    sys_monitor = start_sys_monitor()
+
+    jrp.start()
+    jrp.join(task.execution_timeout)
+
+    add_sys_monitor_stats(sys_monitor, call_status)
+    logger.debug('JobRunner process finished')
+
+    if jrp.is_alive():
+        # If process is still alive after jr.join(job_max_runtime), kill it
+        try:
+            jrp.terminate()
+        except Exception:
+            # thread does not have terminate method
+            pass
+        # The killed process may have left a shared connection in the middle of a request
+        internal_storage.reset_client()
+        msg = ('Function exceeded maximum time of {} seconds and was '
+               'killed'.format(task.execution_timeout))
+        raise TimeoutError('HANDLER', msg)
+
+    if not handler_conn.poll():
+        logger.error('No completion message received from JobRunner process')
+        logger.debug('Assuming memory overflow...')
+        # Only 1 message is returned by jobrunner when it finishes.
+        # If no message, this means that the jobrunner process was killed.
+        # 99% of times the jobrunner is killed due an OOM, so we assume here an OOM.
+        internal_storage.reset_client()
+        msg = 'Function exceeded maximum memory and was killed'
+        raise MemoryError('HANDLER', msg)
+
+    send_jobrunner_metrics(task, handler_conn)
+
+
+def send_jobrunner_metrics(task, handler_conn):
+    """
+    Receives the completion message of a JobRunner, and sends its metric
+    samples in background
+    """
+    _, samples = handler_conn.recv()
+    send_samples(task.config.get('prometheus', {}), samples)
+
+
+def run_jobrunner_thread(task, internal_storage, call_status):
+    """
+    Runs the JobRunner in a thread of the current process, avoiding the
+    fork per call. The function is not isolated: after a timeout it is
+    abandoned, and keeps running, instead of killed, and a memory overflow
+    kills the worker.
+    """
+    handler_conn, jobrunner_conn = mp.Pipe()
+    jobrunner = JobRunner(task, jobrunner_conn, internal_storage)
+    logger.debug('Starting JobRunner thread')
+    jrt = Thread(target=jobrunner.run, daemon=True)
+
+    sys_monitor = start_sys_monitor()
+
+    jrt.start()
+    jrt.join(task.execution_timeout)
+
+    add_sys_monitor_stats(sys_monitor, call_status)
+    logger.debug('JobRunner thread finished')
+
+    if jrt.is_alive():
+        msg = ('Function exceeded maximum time of {} seconds and was '
+               'abandoned'.format(task.execution_timeout))
+        raise TimeoutError('HANDLER', msg)
+
+    if handler_conn.poll():
+        send_jobrunner_metrics(task, handler_conn)
+
+
+class ReusableJobRunner:
+    """
+    JobRunner process kept alive to run all the tasks of a job in a worker
+    process, avoiding the fork per call while keeping the function isolated.
+    It is forked with the modules path of the job in sys.path, and with the
+    modules of the job imported, so it only runs the tasks of that job.
+    """
+
+    def __init__(self, job_key):
+        self.job_key = job_key
+        self.handler_conn, jobrunner_conn = _MP_CTX.Pipe()
+        self.process = _MP_CTX.Process(target=self._run_tasks, args=(jobrunner_conn,), daemon=True)
+        self.process.start()
+        # Only the child must hold this end, so that its death is noticed
+        jobrunner_conn.close()
+
+    @staticmethod
+    def _run_tasks(jobrunner_conn):
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+
+        while True:
+            try:
+                task, env = jobrunner_conn.recv()
+            except (EOFError, KeyboardInterrupt):
+                break
+
+            os.environ.clear()
+            os.environ.update(env)
+
+            storage_config = extract_storage_config(task.config)
+            internal_storage = InternalStorage(storage_config, reuse_client=True)
+
+            with open(task.log_file, 'a') as log_file:
+                with custom_redirection(LogStream(log_file)):
+                    setup_lithops_logger(task.log_level)
+                    JobRunner(task, jobrunner_conn, internal_storage).run()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def terminate(self):
+        self.process.terminate()
+        self.process.join()
+
+    def run(self, task):
+        """
+        Runs a task. Returns False if the process died before finishing it
+        """
+        task_state = {k: v for k, v in vars(task).items() if k != 'log_stream'}
+        task_state['data'] = bytes(task_state['data'])
+        self.handler_conn.send((SimpleNamespace(**task_state), dict(os.environ)))
+
+        if not self.handler_conn.poll(task.execution_timeout):
+            self.terminate()
+            msg = ('Function exceeded maximum time of {} seconds and was '
+                   'killed'.format(task.execution_timeout))
+            raise TimeoutError('HANDLER', msg)
+
+        try:
+            send_jobrunner_metrics(task, self.handler_conn)
+        except EOFError:
+            return False
+
+        return True
+
+
+def run_jobrunner_reused_process(task, call_status):
+    """
+    Runs the JobRunner in the reusable process of this worker process
+    """
+    global REUSABLE_JOBRUNNER
+
+    if REUSABLE_JOBRUNNER is not None and REUSABLE_JOBRUNNER.job_key != task.job_key:
+        logger.debug('Terminating the reusable JobRunner process of the previous job')
+        REUSABLE_JOBRUNNER.terminate()
+        REUSABLE_JOBRUNNER = None
+
+    if REUSABLE_JOBRUNNER is None or not REUSABLE_JOBRUNNER.is_alive():
+        logger.debug('Starting reusable JobRunner process')
+        REUSABLE_JOBRUNNER = ReusableJobRunner(task.job_key)
+
+    sys_monitor = start_sys_monitor(REUSABLE_JOBRUNNER.process.pid)
+    finished = REUSABLE_JOBRUNNER.run(task)
+    add_sys_monitor_stats(sys_monitor, call_status)
+
+    if not finished:
+        REUSABLE_JOBRUNNER = None
+        logger.error('No completion message received from JobRunner process')
+        logger.debug('Assuming memory overflow...')
+        msg = 'Function exceeded maximum memory and was killed'
+        raise MemoryError('HANDLER', msg)
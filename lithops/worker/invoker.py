@@ -86,7 +86,7 @@ class FaaSRemoteInvoker(FaaSInvoker):
             fs=futures,
             job_id=job.job_id,
             chunksize=job.chunksize,
-            generate_tokens=True
+            invocation_controller=self.invocation_controller
         )
 
         while self.pending_calls_q.qsize() > 0:
@@ -28,7 +28,7 @@ import requests
 import traceback
 from pydoc import locate
 
-from lithops.worker.utils import peak_memory
+from lithops.worker.utils import peak_memory, CallProfiler
 
 try:
     import numpy as np
@@ -40,10 +40,12 @@ from lithops.storage import Storage
 from lithops.wait import wait
 from lithops.future import ResponseFuture
 from lithops.utils import WrappedStreamingBody, sizeof_fmt, \
-    is_object_processing_function, FuturesList, verify_args
+    is_object_processing_function, FuturesList, FunctionWrapper, verify_args, prepare_args, \
+    dumps_oob, loads_oob
 from lithops.utils import WrappedStreamingBodyPartition
 from lithops.util.metrics import PrometheusExporter
-from lithops.storage.utils import create_output_key
+from lithops.broadcast import set_broadcast_storage
+from lithops.storage.utils import create_output_key, create_profile_key
 
 logger = logging.getLogger(__name__)
 
@@ -71,14 +73,16 @@ class JobRunner:
         self.lithops_config = job.config
 
         self.output_key = create_output_key(job.executor_id, job.job_id, job.call_id)
+        set_broadcast_storage(internal_storage.storage)
 
         # Setup stats class
         self.stats = JobStats(self.job.stats_file)
 
-        # Setup prometheus for live metrics
+        # Setup prometheus for live metrics. The samples are sent to the
+        # handler, which flushes them in background, out of the task path
         prom_enabled = self.lithops_config['lithops'].get('telemetry')
         prom_config = self.lithops_config.get('prometheus', {})
-        self.prometheus = PrometheusExporter(prom_enabled, prom_config)
+        self.prometheus = PrometheusExporter(prom_enabled, prom_config, forward=True)
 
     def _fill_optional_args(self, function, data):
         """
@@ -96,7 +100,7 @@ class JobRunner:
                 if self.internal_storage.backend == 'ibm_cos':
                     ibm_boto3_client = self.internal_storage.get_client()
                 else:
-                    ibm_boto3_client = Storage(config=self.lithops_config, backend='ibm_cos').get_client()
+                    ibm_boto3_client = Storage(config=self.lithops_config, backend='ibm_cos', reuse_client=True).get_client()
                 data['ibm_cos'] = ibm_boto3_client
             else:
                 raise Exception('Cannot create the ibm_cos client: missing configuration')
@@ -136,7 +140,7 @@ class JobRunner:
             if obj.backend == self.internal_storage.backend:
                 storage = self.internal_storage.storage
             else:
-                storage = Storage(config=self.lithops_config, backend=obj.backend)
+                storage = Storage(config=self.lithops_config, backend=obj.backend, reuse_client=True)
             if obj.data_byte_range is not None:
                 extra_get_args['Range'] = 'bytes={}-{}'.format(*obj.data_byte_range)
             stream = storage.get_object(obj.bucket, obj.key, stream=True, extra_get_args=extra_get_args)
@@ -166,6 +170,9 @@ class JobRunner:
             else:
                 stream_body = WrappedStreamingBodyPartition(stream, obj.chunk_size, obj.data_byte_range, obj.newline)
 
+        if getattr(obj, 'format', None) is not None:
+            stream_body = obj.format.wrap_stream(obj, stream_body)
+
         obj.data_stream = stream_body
 
         if obj.data_byte_range is not None:
@@ -180,6 +187,19 @@ class JobRunner:
 
         logger.info(f'Chunk: {obj.part}/{obj.total_parts} - Size: {obj.chunk_size} - Range: {first_byte}-{last_byte}')
 
+    def _upload_profile(self, profiler):
+        """
+        Uploads the profile of the function call to the storage backend
+        """
+        try:
+            profile_key = create_profile_key(self.job.executor_id, self.job.job_id, self.job.call_id)
+            profile_data = profiler.dumps()
+            logger.info(f"Storing function profile - Size: {sizeof_fmt(len(profile_data))}")
+            self.internal_storage.put_data(profile_key, profile_data)
+            self.stats.write('worker_profile_key', profile_key)
+        except Exception as e:
+            logger.error(f'Unable to upload the function profile: {e}')
+
     # Decorator to execute pre-run and post-run functions provided via environment variables
     def prepost(func):
         def call(envVar):
@@ -200,15 +220,17 @@ class JobRunner:
         Runs the function
         """
         # self.stats.write('worker_jobrunner_start_tstamp', time.time())
-        self.stats.write('worker_peak_memory_start', peak_memory())
+        peak_memory_start = peak_memory()
+        self.stats.write('worker_peak_memory_start', peak_memory_start)
         logger.debug("Process started")
         result = None
         exception = False
         fn_name = None
+        profiler = None
 
         try:
-            func = pickle.loads(self.job.func)
-            data = pickle.loads(self.job.data)
+            func = loads_oob(self.job.func)
+            data = loads_oob(self.job.data)
 
             if ast.literal_eval(os.environ.get('__LITHOPS_REDUCE_JOB', 'False')):
                 self._wait_futures(data)
@@ -217,8 +239,8 @@ class JobRunner:
 
             self._fill_optional_args(func, data)
 
-            fn_name = func.__name__ if inspect.isfunction(func) \
-                or inspect.ismethod(func) else type(func).__name__
+            fn_name = func.__name__ if inspect.isfunction(func) or inspect.ismethod(func) \
+                or isinstance(func, FunctionWrapper) else type(func).__name__
 
             self.prometheus.send_metric(
                 name='function_start',
@@ -234,8 +256,13 @@ class JobRunner:
             logger.info(f"Going to execute '{str(fn_name)}()'")
             print('---------------------- FUNCTION LOG ----------------------')
             function_start_tstamp = time.time()
-            args, kwargs = _prepare_args(func, data)
-            result = func(*args, **kwargs)
+            args, kwargs = prepare_args(func, data)
+            profile = getattr(self.job, 'profile', None)
+            if profile:
+                profiler = CallProfiler(**profile)
+                result = profiler.runcall(func, *args, **kwargs)
+            else:
+                result = func(*args, **kwargs)
             function_end_tstamp = time.time()
             print('----------------------------------------------------------')
             logger.info("Success function execution")
@@ -253,7 +280,7 @@ class JobRunner:
                     result = None
                 else:
                     logger.debug("Pickling result")
-                    pickled_output = pickle.dumps(result)
+                    pickled_output = b''.join(dumps_oob(result))
                     pickled_output_size = len(pickled_output)
                     self.stats.write('func_result_size', pickled_output_size)
                     if pickled_output_size < 8 * 1024:  # 8KB
@@ -291,7 +318,11 @@ class JobRunner:
 
         finally:
             # self.stats.write('worker_jobrunner_end_tstamp', time.time())
-            self.stats.write('worker_peak_memory_end', peak_memory())
+            peak_memory_end = peak_memory()
+            self.stats.write('worker_peak_memory_end', peak_memory_end)
+            if peak_memory_start is not None:
+                # Memory accounting of the jobrunner modes that reuse the process
+                self.stats.write('worker_peak_memory_delta', peak_memory_end - peak_memory_start)
             self.prometheus.send_metric(
                 name='function_end',
                 value=time.time(),
@@ -303,36 +334,14 @@ class JobRunner:
                 )
             )
 
+            if profiler is not None:
+                self._upload_profile(profiler)
+
             if result is not None and not exception:
                 output_upload_start_tstamp = time.time()
                 logger.info(f"Storing function result - Size: {sizeof_fmt(len(pickled_output))}")
-                self.internal_storage.put_data(self.output_key, pickled_output)
+                self.internal_storage.put_call_output(self.output_key, pickled_output)
                 output_upload_end_tstamp = time.time()
                 self.stats.write("worker_result_upload_time", round(output_upload_end_tstamp - output_upload_start_tstamp, 8))
-            self.jobrunner_conn.send("Finished")
+            self.jobrunner_conn.send(("Finished", self.prometheus.samples))
             logger.info("Process finished")
-
-
-def _prepare_args(func, data):
-    # Convert the "data" envelope into normal *args/**kwargs,
-    # respecting the actual var-length parameter names of `func`.
-    func_sig = inspect.signature(func)
-    var_pos_name = None
-    var_kw_name = None
-
-    for name, param in func_sig.parameters.items():
-        if param.kind == inspect.Parameter.VAR_POSITIONAL:
-            var_pos_name = name
-        elif param.kind == inspect.Parameter.VAR_KEYWORD:
-            var_kw_name = name
-
-    payload = dict(data)
-
-    # Extract var-positional argument value if present
-    args = payload.pop(var_pos_name) or () if var_pos_name in payload else ()
-    # Extract var-keyword argument value if present
-    kwargs = payload.pop(var_kw_name) or {} if var_kw_name in payload else {}
-    # Any remaining keys become normal keyword arguments
-    kwargs.update(payload)
-
-    return args, kwargs
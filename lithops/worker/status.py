@@ -45,6 +45,12 @@ class CallStatus:
             'chunksize': job.chunksize
         }
 
+        if getattr(job, 'trace_context', None):
+            self.status['trace_context'] = job.trace_context
+            self.status['worker_func_download_tstamp'] = job.func_download_tstamp
+            self.status['worker_data_download_tstamp'] = job.data_download_tstamp
+            self.status['worker_data_download_end_tstamp'] = job.data_download_end_tstamp
+
         if ast.literal_eval(os.environ.get('WARM_CONTAINER', 'False')):
             self.status['worker_cold_start'] = False
         else:
@@ -86,7 +92,7 @@ class StorageCallStatus(CallStatus):
             dmpd_response_status = json.dumps(self.status)
             drs = sizeof_fmt(len(dmpd_response_status))
             logger.info("Storing execution stats - Size: {}".format(drs))
-            self.internal_storage.put_data(status_key, dmpd_response_status)
+            self.internal_storage.put_call_status(status_key, dmpd_response_status)
 
 
 class RabbitmqCallStatus(StorageCallStatus):
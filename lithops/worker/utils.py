@@ -16,15 +16,18 @@
 
 import os
 import sys
+import zlib
 import pkgutil
 import logging
 import pickle
+import cProfile
 import platform
+import tracemalloc
 import subprocess
 from contextlib import contextmanager
 
 from lithops.version import __version__ as lithops_ver
-from lithops.utils import sizeof_fmt, is_unix_system, b64str_to_bytes
+from lithops.utils import sizeof_fmt, is_unix_system, b64str_to_bytes, read_into_buffer
 from lithops.constants import MODULES_DIR, SA_INSTALL_DIR, LITHOPS_TEMP_DIR
 
 try:
@@ -98,24 +101,29 @@ def get_function_data(job, internal_storage):
     """
     if job.data_key:
         extra_get_args = {}
+        data_size = None
         if job.data_byte_ranges is not None:
             init_byte = job.data_byte_ranges[0][0]
             last_byte = job.data_byte_ranges[-1][1]
             range_str = f'bytes={init_byte}-{last_byte}'
             extra_get_args['Range'] = range_str
+            data_size = last_byte - init_byte + 1
 
         logger.info("Loading function data parameters from storage")
-        data_obj = internal_storage.get_data(job.data_key, extra_get_args=extra_get_args)
+        # The data of every call is a view of the downloaded buffer, so the
+        # out-of-band buffers of its arguments are unpickled without copies
+        data_stream = internal_storage.get_data(job.data_key, stream=True, extra_get_args=extra_get_args)
+        data_obj = memoryview(read_into_buffer(data_stream, data_size))
 
         loaded_data = []
         offset = 0
         if job.data_byte_ranges is not None:
             for dbr in job.data_byte_ranges:
                 length = dbr[1] - dbr[0] + 1
-                loaded_data.append(data_obj[offset:offset + length])
+                loaded_data.append(internal_storage.decompress(data_obj[offset:offset + length]))
                 offset += length
         else:
-            loaded_data.append(data_obj)
+            loaded_data.append(internal_storage.decompress(data_obj))
     else:
         loaded_data = [eval(byte_str) for byte_str in job.data_byte_strs]
 
@@ -275,6 +283,58 @@ class LogStream:
         return self._stdout.fileno()
 
 
+# pstats key of the profiler's own Profile.disable() call
+PROFILER_DISABLE_FUNC = ('~', 0, "<method 'disable' of '_lsprof.Profiler' objects>")
+
+
+class CallProfiler:
+    """
+    Profiles a function call with cProfile and, if memory_top is set,
+    records the allocation sites of the memory still allocated when the
+    function returns with tracemalloc
+    """
+
+    def __init__(self, memory_top=0):
+        self.memory_top = memory_top
+        self.profiler = cProfile.Profile()
+        self.memory = []
+        self.memory_peak = 0
+        self.root = None
+
+    def runcall(self, func, *args, **kwargs):
+        # The pstats key of the profiled function, the root of its call stacks
+        code = getattr(func, '__code__', None)
+        if code is not None:
+            self.root = (code.co_filename, code.co_firstlineno, code.co_name)
+        if self.memory_top:
+            tracemalloc.start()
+        try:
+            return self.profiler.runcall(func, *args, **kwargs)
+        finally:
+            if self.memory_top:
+                snapshot = tracemalloc.take_snapshot().filter_traces((
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                    tracemalloc.Filter(False, cProfile.__file__),
+                    tracemalloc.Filter(False, '<frozen importlib._bootstrap*>')
+                ))
+                self.memory_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.memory = [(stat.traceback[0].filename, stat.traceback[0].lineno, stat.size, stat.count)
+                               for stat in snapshot.statistics('lineno')[:self.memory_top]]
+
+    def dumps(self):
+        """
+        Returns the profile as a compressed pickle of the pstats dict, the
+        profiled function and the memory allocation sites
+        """
+        self.profiler.create_stats()
+        # Drop the call to Profile.disable() made by runcall() itself
+        stats = {func: func_stats for func, func_stats in self.profiler.stats.items()
+                 if func != PROFILER_DISABLE_FUNC}
+        profile = {'stats': stats, 'root': self.root, 'memory': self.memory, 'memory_peak': self.memory_peak}
+        return zlib.compress(pickle.dumps(profile))
+
+
 class SystemMonitor:
 
     def __init__(self, process_id=None):
@@ -316,7 +376,11 @@ class SystemMonitor:
         self.cpu_usage = psutil.cpu_percent(interval=None, percpu=True)
         self.cpu_times = psutil.cpu_times()
         self.current_net_io = psutil.net_io_counters()
-        self.mem_info = self.process.memory_full_info()
+        try:
+            self.mem_info = self.process.memory_full_info()
+        except psutil.NoSuchProcess:
+            # The monitored process died before the end of the call
+            self.mem_info = None
 
     def get_cpu_info(self):
         """
@@ -342,7 +406,7 @@ class SystemMonitor:
         """
         Get memory usage information of the monitored process.
         """
-        if not psutil_found:
+        if not psutil_found or self.mem_info is None:
             return {"rss": 0, "vms": 0, "uss": 0}
 
         return {"rss": self.mem_info.rss, "vms": self.mem_info.vms, "uss": self.mem_info.uss}
@@ -68,9 +68,7 @@ extras_require = {
         'pynng'
     ],
     'joblib': [
-        'joblib',
-        'diskcache',
-        'numpy'
+        'joblib'
     ],
     'plotting': [
         'pandas',
@@ -81,6 +79,16 @@ extras_require = {
     'oracle': [
         'oci',
     ],
+    'async': [
+        'httpx[http2]',
+    ],
+    'compression': [
+        'zstandard',
+        'lz4'
+    ],
+    'parquet': [
+        'pyarrow'
+    ],
     'tests': [
         'pytest',
         'kubernetes',